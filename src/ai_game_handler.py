@@ -1,6 +1,11 @@
 import pygame
 import time
 from chess_ai import ChessAI
+from ai_worker import AIWorker
+from bitboard import SQUARE_POSITIONS
+from moves import move_to
+
+FRAME_RATE = 60 # Frames drawn per second, also while the AI is thinking
 
 class AIGameHandler:
     def __init__(self, game, gui):
@@ -11,13 +16,16 @@ class AIGameHandler:
         self.human_player_color = "white"
         self.ai_color = "white" if self.human_player_color == "black" else "black"
         self.ai = ChessAI(self.game, self.ai_color)
+        self.ai_worker = AIWorker(self.ai) # Searches in the background while the game loop keeps running
+        self.clock = pygame.time.Clock()
 
     def run(self):
-        """Runs the local multiplayer game loop"""
+        """Runs the AI opponent game loop"""
         self.gui.sound_effects["game_start"].play()
         while self.running:
             self.gui.draw_screen()
-            if self.display_game_status() == "terminal":
+            terminal = self.display_game_status() == "terminal"
+            if terminal:
                 pass # TODO Implement exit button
 
             if self.game.current_turn == self.human_player_color:
@@ -25,31 +33,47 @@ class AIGameHandler:
 
                 if self.gui.promotion_active:
                     self.gui.draw_promotion_dialog()
+            elif not terminal:
+                self.update_ai()
+
+            # Events are handled on every frame, also while the AI is thinking
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    self.ai_worker.cancel()
+                    self.running = False
+                elif event.type == pygame.MOUSEBUTTONDOWN:
+                    self.handle_mouse_click()
+                elif event.type == pygame.VIDEORESIZE:
+                    self.ai_worker.cancel() # Started again on the next frame
+                    self.gui.handle_resize(event.size) # TODO implement resize handling in the GUI
+
+            pygame.display.update()
+            self.clock.tick(FRAME_RATE)
+        self.ai_worker.cancel()
+        self.ai.close()
+        pygame.quit()
 
-                for event in pygame.event.get():
-                    if event.type == pygame.QUIT:
-                        self.running = False
-                    elif event.type == pygame.MOUSEBUTTONDOWN:
-                        self.handle_mouse_click()
-                    elif event.type == pygame.VIDEORESIZE:
-                        self.gui.handle_resize(event.size) # TODO implement resize handling in the GUI
+    def update_ai(self):
+        """Starts the AI search, shows its progress and plays its move once it is found"""
+        if not self.ai_worker.is_thinking():
+            move = self.ai_worker.poll(self.game)
+            if move is None:
+                self.ai_worker.start(self.game)
             else:
-                pygame.display.update()
-                self.ai.make_move()
+                self.game.play_move(move)
                 if (self.game.move_history[-1]["captured"]):
                     self.gui.sound_effects["capture"].play()
                 elif (self.game.current_turn == "black"):
                     self.gui.sound_effects["move_white"].play()
                 else:
                     self.gui.sound_effects["move_black"].play()
+                return
+        self.gui.draw_thinking_indicator(self.ai_worker.nodes_per_second(), self.ai_worker.depth())
 
-            pygame.display.update()
-        pygame.quit()
-    
     def highlight_possible_moves(self):
         """Highlights the selected piece's possible moves"""
-        for move in self.game.possible_moves:
-                rank, file = move
+        for move in self.game.selected_moves:
+                rank, file = SQUARE_POSITIONS[move_to(move)]
                 rank = abs(7 - rank)
                 pygame.draw.circle(self.gui.screen, (145, 145, 145), 
                                 (((self.gui.square_size * file) + (self.gui.square_size * 0.5)), 
@@ -102,13 +126,20 @@ class AIGameHandler:
         """Handles mouse clicks for the local game mode"""
         x, y = pygame.mouse.get_pos()
         if hasattr(self.gui, "undo_button_rect") and self.gui.undo_button_rect.collidepoint(x, y):
-            self.game.undo_move_ai_opp()
+            if self.ai_worker.has_pending_search():
+                # Take back only the player's move the AI is answering (also when its reply is found but not played yet)
+                self.ai_worker.cancel()
+                self.game.undo_move()
+            else:
+                self.game.undo_move_ai_opp()
             
             if (self.game.current_turn == "white"):
                 self.gui.sound_effects["move_white"].play()
             else:
                 self.gui.sound_effects["move_black"].play()
             return
+        elif self.game.current_turn != self.human_player_color:
+            return # The board is the AI's while it thinks
         elif (not self.gui.promotion_active) and (x > (self.gui.square_size * 8) or y > (self.gui.square_size * 8)):
             return
 
@@ -0,0 +1,70 @@
+import copy
+import threading
+import time
+
+class AIWorker:
+    def __init__(self, ai):
+        """
+        Runs ChessAI searches on a background thread so the game loop keeps running while the AI thinks.
+        The search works on a copy of the game; the move is only played on the real game by the caller.
+        """
+        self.ai = ai
+        self.thread = None
+        self.stop_signal = [0]
+        self.result = None
+        self.start_hash = None
+        self.start_time = 0
+
+    def start(self, game):
+        """Start searching the current position of game."""
+        self.cancel()
+        self.ai.game = copy.deepcopy(game)
+        self.stop_signal = [0] # A new flag per search, so a cancelled search can never stop the next one
+        self.ai.stop_signal = self.stop_signal
+        self.result = None
+        self.start_hash = game.hash
+        self.start_time = time.perf_counter()
+        self.thread = threading.Thread(target = self._run, args = (self.stop_signal,), daemon = True)
+        self.thread.start()
+
+    def _run(self, stop_signal):
+        move, value = self.ai.search()
+        if not stop_signal[0]:
+            self.result = move
+
+    def is_thinking(self):
+        return (self.thread is not None) and self.thread.is_alive()
+
+    def has_pending_search(self):
+        """Whether a search was started and its result not yet collected by poll (it may have finished already)."""
+        return self.thread is not None
+
+    def poll(self, game):
+        """
+        Return the move found once the search has finished, None while it is still running.
+        A result for a position that is no longer on the board is thrown away.
+        """
+        if (self.thread is None) or self.thread.is_alive():
+            return None
+        self.thread = None
+        move, self.result = self.result, None
+        if game.hash != self.start_hash:
+            return None
+        return move
+
+    def cancel(self):
+        """Abort the running search (if any) and wait for the thread to finish."""
+        if self.thread is not None:
+            self.stop_signal[0] = 1
+            self.thread.join()
+            self.thread = None
+        self.result = None
+
+    def nodes_per_second(self):
+        """Live search speed of the running search."""
+        elapsed = time.perf_counter() - self.start_time
+        return int(self.ai.nodes / elapsed) if elapsed > 0 else 0
+
+    def depth(self):
+        """Deepest iteration finished so far by the running search."""
+        return self.ai.completed_depth
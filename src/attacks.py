@@ -0,0 +1,118 @@
+"""
+Attack tables built once at import time.
+
+Knight, king and pawn attacks are stored per square. Sliding pieces use
+blocker-indexed tables: for every square the relevant occupancy mask (the
+squares on the piece's rays, excluding the board edge) is enumerated and the
+resulting attack set is stored under that blocker configuration. Looking up a
+rook or bishop is then a mask and a single dictionary access, the same idea
+as magic bitboards with the Python dict doing the perfect hashing.
+"""
+from bitboard import SQUARE_POSITIONS
+
+KNIGHT_DELTAS = [(2, 1), (2, -1), (-2, 1), (-2, -1), (1, 2), (1, -2), (-1, 2), (-1, -2)]
+KING_DELTAS = [(1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1)]
+ROOK_DIRECTIONS = [(1, 0), (-1, 0), (0, 1), (0, -1)]
+BISHOP_DIRECTIONS = [(1, 1), (1, -1), (-1, 1), (-1, -1)]
+
+
+def _step_attacks(square, deltas):
+    """Squares reached by a single step in each of the given directions."""
+    rank, file = SQUARE_POSITIONS[square]
+    attacks = 0
+    for delta_rank, delta_file in deltas:
+        r, f = rank + delta_rank, file + delta_file
+        if 0 <= r < 8 and 0 <= f < 8:
+            attacks |= 1 << ((r * 8) + f)
+    return attacks
+
+
+def _ray_attacks(square, occupied, directions):
+    """Squares reached along each ray, stopping at (and including) the first blocker."""
+    rank, file = SQUARE_POSITIONS[square]
+    attacks = 0
+    for delta_rank, delta_file in directions:
+        r, f = rank + delta_rank, file + delta_file
+        while 0 <= r < 8 and 0 <= f < 8:
+            square_bit = 1 << ((r * 8) + f)
+            attacks |= square_bit
+            if occupied & square_bit:
+                break
+            r += delta_rank
+            f += delta_file
+    return attacks
+
+
+def _relevant_mask(square, directions):
+    """Ray squares whose occupancy can change the attack set (the last square of each ray never does)."""
+    rank, file = SQUARE_POSITIONS[square]
+    mask = 0
+    for delta_rank, delta_file in directions:
+        r, f = rank + delta_rank, file + delta_file
+        while 0 <= r + delta_rank < 8 and 0 <= f + delta_file < 8:
+            mask |= 1 << ((r * 8) + f)
+            r += delta_rank
+            f += delta_file
+    return mask
+
+
+def _sliding_table(square, mask, directions):
+    """Attack set for every subset of the relevant mask (carry-rippler enumeration)."""
+    table = {}
+    blockers = 0
+    while True:
+        table[blockers] = _ray_attacks(square, blockers, directions)
+        blockers = (blockers - mask) & mask
+        if blockers == 0:
+            return table
+
+
+KNIGHT_ATTACKS = [_step_attacks(square, KNIGHT_DELTAS) for square in range(64)]
+KING_ATTACKS = [_step_attacks(square, KING_DELTAS) for square in range(64)]
+
+# Squares attacked by a pawn of the given color standing on each square
+PAWN_ATTACKS = {
+    "white": [_step_attacks(square, [(1, -1), (1, 1)]) for square in range(64)],
+    "black": [_step_attacks(square, [(-1, -1), (-1, 1)]) for square in range(64)]
+}
+
+ROOK_MASKS = [_relevant_mask(square, ROOK_DIRECTIONS) for square in range(64)]
+BISHOP_MASKS = [_relevant_mask(square, BISHOP_DIRECTIONS) for square in range(64)]
+ROOK_TABLES = [_sliding_table(square, ROOK_MASKS[square], ROOK_DIRECTIONS) for square in range(64)]
+BISHOP_TABLES = [_sliding_table(square, BISHOP_MASKS[square], BISHOP_DIRECTIONS) for square in range(64)]
+
+
+def rook_attacks(square, occupied):
+    """Squares attacked by a rook on the given square."""
+    return ROOK_TABLES[square][occupied & ROOK_MASKS[square]]
+
+
+def bishop_attacks(square, occupied):
+    """Squares attacked by a bishop on the given square."""
+    return BISHOP_TABLES[square][occupied & BISHOP_MASKS[square]]
+
+
+def queen_attacks(square, occupied):
+    """Squares attacked by a queen on the given square."""
+    return ROOK_TABLES[square][occupied & ROOK_MASKS[square]] | BISHOP_TABLES[square][occupied & BISHOP_MASKS[square]]
+
+
+def _between(start, end):
+    """Squares strictly between two squares on a shared rank, file or diagonal (empty otherwise)."""
+    start_rank, start_file = SQUARE_POSITIONS[start]
+    end_rank, end_file = SQUARE_POSITIONS[end]
+    delta_rank, delta_file = end_rank - start_rank, end_file - start_file
+    if (start == end) or ((delta_rank != 0) and (delta_file != 0) and (abs(delta_rank) != abs(delta_file))):
+        return 0
+    step_rank = (delta_rank > 0) - (delta_rank < 0)
+    step_file = (delta_file > 0) - (delta_file < 0)
+    squares = 0
+    r, f = start_rank + step_rank, start_file + step_file
+    while (r, f) != (end_rank, end_file):
+        squares |= 1 << ((r * 8) + f)
+        r += step_rank
+        f += step_file
+    return squares
+
+
+BETWEEN = [[_between(start, end) for end in range(64)] for start in range(64)]
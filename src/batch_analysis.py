@@ -0,0 +1,164 @@
+"""
+Headless batch analysis: run ChessAI over a file of positions and write one
+result per position.
+
+Input lines are FEN strings or EPD records ("<4 FEN fields> <opcode> <operand>;
+..."), blank lines and lines starting with "#" are skipped. The EPD opcodes
+acd (analysis depth) and acs (analysis seconds) override the search limits for
+their position, and id is copied to the output.
+
+Positions are read one line at a time and searched by a pool of worker
+processes. At most `window` positions are in flight at once, and results are
+written as soon as they are ready in input order, so memory use stays the same
+however long the input is.
+
+Usage: python batch_analysis.py positions.epd --depth 4 --workers 4 --output results.csv
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from game import Game
+from chess_ai import ChessAI, MAX_DEPTH
+from moves import move_to_uci
+
+# Output columns, in order (CSV header and JSONL keys)
+FIELDS = ["index", "id", "fen", "move", "score", "depth", "nodes", "quiescence_nodes", "time", "error"]
+
+
+def parse_line(line):
+    """
+    Split a FEN or EPD line into (fen, operations).
+    Returns None for blank and comment lines.
+    """
+    line = line.strip()
+    if not line or line.startswith("#"):
+        return None
+    head, separator, tail = line.partition(";")
+    fields = head.split()
+    # Plain FENs carry the two move counters, EPD records start with an opcode instead
+    fen_length = 6 if (len(fields) >= 6 and fields[4].isdigit() and fields[5].isdigit()) else 4
+    fen = " ".join(fields[:fen_length])
+    operations = {}
+    for operation in [" ".join(fields[fen_length:])] + tail.split(";"):
+        opcode, _, operand = operation.strip().partition(" ")
+        if opcode:
+            operations[opcode] = operand.strip().strip('"')
+    return fen, operations
+
+
+def read_positions(file):
+    """Yield (index, fen, operations) for every position line of an open file, one line at a time."""
+    index = 0
+    for line in file:
+        parsed = parse_line(line)
+        if parsed is not None:
+            yield index, parsed[0], parsed[1]
+            index += 1
+
+
+def analyze_position(index, fen, operations, depth = None, time_limit = None, node_limit = None,
+                     hash_size_mb = 4, quiescence_node_limit = 2000):
+    """
+    Worker task: search one position for the side to move.
+    Returns a result dictionary with the FIELDS keys; a position that cannot be
+    searched gets its error message instead of a move.
+    """
+    result = dict.fromkeys(FIELDS)
+    result.update(index = index, id = operations.get("id"), fen = fen)
+    try:
+        if "acd" in operations:
+            depth, time_limit = int(operations["acd"]), None
+        if "acs" in operations:
+            time_limit = float(operations["acs"])
+        game = Game.from_fen(fen)
+        ai = ChessAI(game, game.current_turn, hash_size_mb = hash_size_mb, node_limit = node_limit,
+                     quiescence_node_limit = quiescence_node_limit)
+        start_time = time.perf_counter()
+        move, value = ai.search(time_limit = time_limit or 0, max_depth = depth or MAX_DEPTH)
+        result.update(
+            move = move_to_uci(move) if move is not None else None,
+            score = value,
+            depth = ai.search_info["depth"],
+            nodes = ai.nodes,
+            quiescence_nodes = ai.quiescence_nodes,
+            time = round(time.perf_counter() - start_time, 4)
+        )
+    except ValueError as error:
+        result["error"] = str(error)
+    return result
+
+
+def analyze_stream(positions, workers = 1, window = None, **limits):
+    """
+    Search (index, fen, operations) positions and yield their results in input order.
+    With more than one worker, positions go to a process pool and at most window
+    (default 4 per worker) are submitted but not yet written out.
+    limits are passed on to analyze_position.
+    """
+    if workers <= 1:
+        for index, fen, operations in positions:
+            yield analyze_position(index, fen, operations, **limits)
+        return
+
+    window = window or (workers * 4)
+    with ProcessPoolExecutor(max_workers = workers) as executor:
+        pending = deque()
+        for index, fen, operations in positions:
+            pending.append(executor.submit(analyze_position, index, fen, operations, **limits))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def write_results(results, file, output_format = "jsonl"):
+    """Write results to an open file as they arrive, as JSON lines or CSV. Returns the number written."""
+    count = 0
+    writer = None
+    if output_format == "csv":
+        writer = csv.DictWriter(file, fieldnames = FIELDS)
+        writer.writeheader()
+    for result in results:
+        if writer:
+            writer.writerow(result)
+        else:
+            file.write(json.dumps(result) + "\n")
+        file.flush()
+        count += 1
+    return count
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Search every position of a FEN/EPD file")
+    parser.add_argument("input", nargs = "?", default = "-", help = "FEN/EPD file, - for standard input")
+    parser.add_argument("--output", default = "-", help = "result file, - for standard output")
+    parser.add_argument("--format", choices = ("jsonl", "csv"), help = "output format (default: from the output file extension, else jsonl)")
+    parser.add_argument("--depth", type = int, default = None, help = "search depth per position")
+    parser.add_argument("--time", type = float, default = None, help = "seconds per position (default 1 without --depth or --nodes)")
+    parser.add_argument("--nodes", type = int, default = None, help = "node budget per position")
+    parser.add_argument("--workers", type = int, default = os.cpu_count() or 1)
+    parser.add_argument("--window", type = int, default = None, help = "positions in flight at once (default 4 per worker)")
+    parser.add_argument("--hash", type = float, default = 4, help = "transposition table megabytes per worker")
+    args = parser.parse_args()
+
+    time_limit = args.time
+    if (time_limit is None) and (args.depth is None) and (args.nodes is None):
+        time_limit = 1.0
+    output_format = args.format or ("csv" if args.output.endswith(".csv") else "jsonl")
+
+    input_file = sys.stdin if args.input == "-" else open(args.input)
+    output_file = sys.stdout if args.output == "-" else open(args.output, "w", newline = "")
+    start_time = time.perf_counter()
+    results = analyze_stream(read_positions(input_file), args.workers, args.window, depth = args.depth,
+                             time_limit = time_limit, node_limit = args.nodes, hash_size_mb = args.hash)
+    count = write_results(results, output_file, output_format)
+    elapsed_time = time.perf_counter() - start_time
+    if output_file is not sys.stdout:
+        output_file.close()
+    if input_file is not sys.stdin:
+        input_file.close()
+    print(f"Analyzed {count} positions in {elapsed_time:.2f} seconds", file = sys.stderr)
@@ -0,0 +1,232 @@
+"""
+Vectorized evaluation of many positions at once with NumPy, for offline analysis.
+
+Positions are encoded as int8 arrays of 64 squares (index 0 is a1): 0 for an
+empty square, 1-6 for a white pawn, knight, bishop, rook, queen or king and
+-1 to -6 for the black pieces. Arrays of shape (N, 64) are used as they are;
+(N, 12, 64) one-hot piece planes (in PLANE_SYMBOLS order) are converted first.
+
+evaluate_batch gives, per position and from white's point of view:
+    score         material plus piece-square bonuses with the tapered phase,
+                  equal to evaluation.evaluate for the same board
+    material      the material part of the score alone
+    piece_square  the piece-square part of the score alone
+    mobility      pseudo-legal knight, bishop, rook, queen and king moves of
+                  white minus those of black (pins and checks are ignored)
+
+Large inputs are handled chunk_size positions at a time, which bounds the
+memory used by intermediate arrays. Needs NumPy (the rest of the engine does not).
+
+Usage: python batch_evaluation.py [positions]
+"""
+import os
+import sys
+import time
+import numpy as np
+from board import Board
+from evaluation import evaluate, MATERIAL, MAX_PHASE, PHASE_WEIGHTS, SQUARE_SCORES
+
+PIECE_CODES = {"P": 1, "N": 2, "B": 3, "R": 4, "Q": 5, "K": 6, "p": -1, "n": -2, "b": -3, "r": -4, "q": -5, "k": -6}
+PLANE_SYMBOLS = "PNBRQKpnbrqk"
+PLANE_CODES = np.array([PIECE_CODES[symbol] for symbol in PLANE_SYMBOLS], dtype = np.int8)
+CHUNK_SIZE = 65536
+
+# Lookup tables indexed by [code + 6, square]; row 6 (empty square) is all zero
+MIDDLEGAME_TABLE = np.zeros((13, 64), dtype = np.int32)
+ENDGAME_TABLE = np.zeros((13, 64), dtype = np.int32)
+MIDDLEGAME_MATERIAL = np.zeros(13, dtype = np.int32)
+ENDGAME_MATERIAL = np.zeros(13, dtype = np.int32)
+PHASE_TABLE = np.zeros(13, dtype = np.int32)
+for _symbol, _code in PIECE_CODES.items():
+    _sign = 1 if _symbol.isupper() else -1
+    MIDDLEGAME_TABLE[_code + 6] = [middlegame for middlegame, endgame in SQUARE_SCORES[_symbol]]
+    ENDGAME_TABLE[_code + 6] = [endgame for middlegame, endgame in SQUARE_SCORES[_symbol]]
+    MIDDLEGAME_MATERIAL[_code + 6] = _sign * MATERIAL[_symbol.upper()][0]
+    ENDGAME_MATERIAL[_code + 6] = _sign * MATERIAL[_symbol.upper()][1]
+    PHASE_TABLE[_code + 6] = PHASE_WEIGHTS[_symbol.upper()]
+SQUARE_INDEXES = np.arange(64)
+
+KNIGHT_STEPS = [(1, 2), (2, 1), (2, -1), (1, -2), (-1, -2), (-2, -1), (-2, 1), (-1, 2)]
+KING_STEPS = [(1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1), (0, -1), (1, -1)]
+DIAGONAL_STEPS = [(1, 1), (1, -1), (-1, 1), (-1, -1)]
+STRAIGHT_STEPS = [(1, 0), (-1, 0), (0, 1), (0, -1)]
+
+
+def encode_board(board):
+    """int8 array of the 64 squares of a Board."""
+    codes = np.zeros(64, dtype = np.int8)
+    for color in ("white", "black"):
+        for square, piece in board.pieces[color].items():
+            codes[square] = PIECE_CODES[piece.FEN]
+    return codes
+
+
+def encode_boards(boards):
+    """(N, 64) int8 array for a list of Boards."""
+    return np.array([encode_board(board) for board in boards], dtype = np.int8).reshape(-1, 64)
+
+
+def encode_fen(fen):
+    """
+    List of the 64 square codes of a FEN string (only the piece placement is read).
+    Raises ValueError if the placement is malformed.
+    """
+    codes = [0] * 64
+    rows = fen.split()[0].split("/") if fen.strip() else []
+    if len(rows) != 8:
+        raise ValueError(f"Expected 8 ranks in FEN placement: {fen!r}")
+    for index, row in enumerate(rows):
+        square = (7 - index) * 8 # FEN lists rank 8 first
+        end = square + 8
+        for char in row:
+            if char in "12345678":
+                square += int(char)
+                continue
+            code = PIECE_CODES.get(char)
+            if (code is None) or (square >= end):
+                raise ValueError(f"Invalid rank {row!r} in FEN {fen!r}")
+            codes[square] = code
+            square += 1
+        if square != end:
+            raise ValueError(f"Invalid rank {row!r} in FEN {fen!r}")
+    return codes
+
+
+def encode_fens(fens):
+    """(N, 64) int8 array for a list of FEN strings."""
+    return np.array([encode_fen(fen) for fen in fens], dtype = np.int8).reshape(-1, 64)
+
+
+def as_codes(positions):
+    """Square codes (N, 64) from either (N, 64) codes or (N, 12, 64) one-hot piece planes."""
+    positions = np.asarray(positions)
+    if (positions.ndim == 3) and (positions.shape[1:] == (12, 64)):
+        return (positions.astype(np.int8) * PLANE_CODES[:, None]).sum(axis = 1, dtype = np.int8)
+    if (positions.ndim == 2) and (positions.shape[1] == 64):
+        return positions.astype(np.int8, copy = False)
+    raise ValueError(f"Expected an (N, 64) or (N, 12, 64) array, got shape {positions.shape}")
+
+
+def _tapered(middlegame, endgame, phase):
+    phase = np.minimum(phase, MAX_PHASE)
+    return ((middlegame * phase) + (endgame * (MAX_PHASE - phase))) // MAX_PHASE
+
+
+def _shift(mask, rank_step, file_step):
+    """Move every square of (N, 8, 8) masks by the given ranks and files; squares pushed off the board are lost."""
+    shifted = np.zeros_like(mask)
+    target_ranks = slice(max(rank_step, 0), 8 + min(rank_step, 0))
+    source_ranks = slice(max(-rank_step, 0), 8 + min(-rank_step, 0))
+    target_files = slice(max(file_step, 0), 8 + min(file_step, 0))
+    source_files = slice(max(-file_step, 0), 8 + min(-file_step, 0))
+    shifted[:, target_ranks, target_files] = mask[:, source_ranks, source_files]
+    return shifted
+
+
+def _mobility(grid, sign):
+    """Pseudo-legal moves of one side's pieces (not pawns) in (N, 8, 8) square codes."""
+    own = (grid * sign) > 0
+    empty = grid == 0
+    pieces = grid * sign
+    moves = np.zeros(len(grid), dtype = np.int32)
+    for symbol_code, steps in ((2, KNIGHT_STEPS), (6, KING_STEPS)):
+        movers = pieces == symbol_code
+        for rank_step, file_step in steps:
+            moves += (_shift(movers, rank_step, file_step) & ~own).sum(axis = (1, 2), dtype = np.int32)
+    # Sliders: push a ray front one square at a time, stopping it at the first occupied square
+    for slider_codes, steps in (((3, 5), DIAGONAL_STEPS), ((4, 5), STRAIGHT_STEPS)):
+        sliders = np.isin(pieces, slider_codes)
+        for rank_step, file_step in steps:
+            front = sliders
+            for distance in range(7):
+                front = _shift(front, rank_step, file_step)
+                moves += (front & ~own).sum(axis = (1, 2), dtype = np.int32)
+                front = front & empty
+                if not front.any():
+                    break
+    return moves
+
+
+def _evaluate_chunk(codes):
+    table_rows = codes.astype(np.intp) + 6
+    middlegame = MIDDLEGAME_TABLE[table_rows, SQUARE_INDEXES].sum(axis = 1)
+    endgame = ENDGAME_TABLE[table_rows, SQUARE_INDEXES].sum(axis = 1)
+    middlegame_material = MIDDLEGAME_MATERIAL[table_rows].sum(axis = 1)
+    endgame_material = ENDGAME_MATERIAL[table_rows].sum(axis = 1)
+    phase = PHASE_TABLE[table_rows].sum(axis = 1)
+    grid = codes.reshape(-1, 8, 8)
+    return {
+        "score": _tapered(middlegame, endgame, phase),
+        "material": _tapered(middlegame_material, endgame_material, phase),
+        "piece_square": _tapered(middlegame - middlegame_material, endgame - endgame_material, phase),
+        "mobility": _mobility(grid, 1) - _mobility(grid, -1)
+    }
+
+
+def evaluate_batch(positions, chunk_size = CHUNK_SIZE):
+    """
+    Evaluate encoded positions ((N, 64) codes or (N, 12, 64) planes), chunk_size at a time.
+    Returns a dictionary of (N,) int32 arrays: score, material, piece_square and mobility.
+    """
+    codes = as_codes(positions)
+    chunks = [_evaluate_chunk(codes[start:start + chunk_size]) for start in range(0, len(codes), chunk_size)]
+    if not chunks:
+        return {name: np.zeros(0, dtype = np.int32) for name in ("score", "material", "piece_square", "mobility")}
+    return {name: np.concatenate([chunk[name] for chunk in chunks]) for name in chunks[0]}
+
+
+def evaluate_fens(fens, chunk_size = CHUNK_SIZE):
+    """
+    Evaluate a stream of FEN strings (e.g. lines of a file), chunk_size at a time.
+    Yields one evaluate_batch result per chunk, so the input never has to fit in memory.
+    """
+    chunk = []
+    for fen in fens:
+        chunk.append(encode_fen(fen))
+        if len(chunk) == chunk_size:
+            yield evaluate_batch(np.array(chunk, dtype = np.int8))
+            chunk = []
+    if chunk:
+        yield evaluate_batch(np.array(chunk, dtype = np.int8))
+
+
+def batch_benchmark(fens, chunk_size = CHUNK_SIZE):
+    """
+    Positions per second of the scalar path (Board.from_fen and evaluate, one position at a time)
+    and the batch path (encode_fens and evaluate_batch), checking that both give the same scores.
+    """
+    start_time = time.perf_counter()
+    scalar_scores = [evaluate(Board.from_fen(fen.split()[0])) for fen in fens]
+    scalar_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    codes = encode_fens(fens)
+    encode_time = time.perf_counter() - start_time
+    start_time = time.perf_counter()
+    scores = evaluate_batch(codes, chunk_size)["score"]
+    batch_time = time.perf_counter() - start_time
+    if scores.tolist() != scalar_scores:
+        raise AssertionError("Batch evaluation differs from the scalar evaluation")
+    return {
+        "positions": len(fens),
+        "scalar": len(fens) / scalar_time,
+        "batch": len(fens) / (encode_time + batch_time),
+        "batch_evaluation_only": len(fens) / batch_time
+    }
+
+if __name__ == "__main__":
+    from batch_analysis import read_positions
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    positions_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "../static/positions"))
+    fens = []
+    for name in ("perft.epd", "openings.epd"):
+        with open(os.path.join(positions_dir, name)) as file:
+            fens += [fen for index, fen, operations in read_positions(file)]
+    fens = (fens * ((count // len(fens)) + 1))[:count]
+    result = batch_benchmark(fens)
+    print(f"{result['positions']} positions")
+    print(f"Scalar (Board.from_fen + evaluate): {result['scalar']:.0f} positions per second")
+    print(f"Batch (encode_fens + evaluate_batch): {result['batch']:.0f} positions per second "
+          f"({result['batch'] / result['scalar']:.1f}x)")
+    print(f"Batch evaluation of encoded positions: {result['batch_evaluation_only']:.0f} positions per second "
+          f"({result['batch_evaluation_only'] / result['scalar']:.1f}x)")
@@ -0,0 +1,46 @@
+"""
+Helpers for working with bitboards: 64-bit integers where bit n is set when
+square n is part of the set. Squares are numbered rank * 8 + file, so (0, 0)
+is bit 0 and (7, 7) is bit 63, matching the layout of Board.board_state.
+"""
+
+# FEN characters of every piece, one bitboard is kept for each of them
+WHITE_PIECES = "PNBRQK"
+BLACK_PIECES = "pnbrqk"
+PIECE_SYMBOLS = WHITE_PIECES + BLACK_PIECES
+
+FULL_BOARD = (1 << 64) - 1
+
+# Precomputed (rank, file) tuples so converting squares back does not allocate
+SQUARE_POSITIONS = [divmod(square, 8) for square in range(64)]
+
+FILE_MASKS = [sum(1 << (rank * 8 + file) for rank in range(8)) for file in range(8)]
+RANK_MASKS = [0xFF << (rank * 8) for rank in range(8)]
+
+
+def square_index(position):
+    """Convert a (rank, file) position to a square index."""
+    return (position[0] * 8) + position[1]
+
+
+def square_position(square):
+    """Convert a square index back to a (rank, file) position."""
+    return SQUARE_POSITIONS[square]
+
+
+def lsb_square(bitboard):
+    """Index of the lowest set square. The bitboard must not be empty."""
+    return (bitboard & -bitboard).bit_length() - 1
+
+
+def iter_squares(bitboard):
+    """Yield the index of every square in the set, lowest first."""
+    while bitboard:
+        lowest = bitboard & -bitboard
+        yield lowest.bit_length() - 1
+        bitboard ^= lowest
+
+
+def popcount(bitboard):
+    """Number of squares in the set."""
+    return bitboard.bit_count()
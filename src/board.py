@@ -1,42 +1,87 @@
 from pieces import *
+from bitboard import *
+from attacks import *
+from zobrist import PIECE_KEYS
+from evaluation import SQUARE_SCORES, PIECE_PHASE
 
 class Board:
-    def __init__(self):
-        # Board initializes with standard chess setup
+    def __init__(self, setup = True):
+        # Board initializes with standard chess setup (or empty with setup = False)
         self.board_state = [[None] * 8 for i in range(8)]
-        self.setup_board()
+        # Bitboard view of the same position: one 64-bit set per piece (keyed by FEN character)
+        # plus occupancy masks, kept in sync by every method that changes board_state
+        self.bitboards = {symbol: 0 for symbol in PIECE_SYMBOLS}
+        self.occupancy = {"white": 0, "black": 0}
+        self.occupied = 0
+        self.hash = 0 # Zobrist hash of the piece placement, updated with every change
+        # Running evaluation terms (see evaluation.py), updated with every change
+        self.middlegame_score = 0 # Material plus piece-square bonuses, white minus black
+        self.endgame_score = 0
+        self.phase = 0
+        # Live pieces per color (square index -> piece), piece counts per FEN character and king squares
+        self.pieces = {"white": {}, "black": {}}
+        self.piece_counts = {symbol: 0 for symbol in PIECE_SYMBOLS}
+        self.king_squares = {"white": None, "black": None}
+        if setup:
+            self.setup_board()
+
+    @classmethod
+    def from_fen(cls, placement):
+        """
+        Create a board from the piece placement field of a FEN string (rank 8 first).
+        Raises ValueError if the placement is malformed.
+        """
+        rows = placement.split("/")
+        if len(rows) != 8:
+            raise ValueError(f"Expected 8 ranks in FEN placement, got {len(rows)}: {placement!r}")
+        board = cls(setup = False)
+        for index, row in enumerate(rows):
+            rank = 7 - index
+            file = 0
+            for char in row:
+                if char in "12345678":
+                    file += int(char)
+                    continue
+                piece_class = PIECE_CLASSES.get(char.upper())
+                if (piece_class is None) or (file > 7):
+                    raise ValueError(f"Invalid rank {row!r} in FEN placement {placement!r}")
+                board.place_piece(piece_class("white" if char.isupper() else "black", (rank, file)))
+                file += 1
+            if file != 8:
+                raise ValueError(f"Invalid rank {row!r} in FEN placement {placement!r}")
+        return board
 
     def setup_board(self):
         # Place pawns
         for file in range(8):
-            self.board_state[1][file] = Pawn("white", (1, file))
-            self.board_state[6][file] = Pawn("black", (6, file))
+            self.place_piece(Pawn("white", (1, file)))
+            self.place_piece(Pawn("black", (6, file)))
 
         # Place rooks
-        self.board_state[0][0] = Rook("white", (0, 0))
-        self.board_state[0][7] = Rook("white", (0, 7))
-        self.board_state[7][0] = Rook("black", (7, 0))
-        self.board_state[7][7] = Rook("black", (7, 7))
+        self.place_piece(Rook("white", (0, 0)))
+        self.place_piece(Rook("white", (0, 7)))
+        self.place_piece(Rook("black", (7, 0)))
+        self.place_piece(Rook("black", (7, 7)))
 
         # Place knights
-        self.board_state[0][1] = Knight("white", (0, 1))
-        self.board_state[0][6] = Knight("white", (0, 6))
-        self.board_state[7][1] = Knight("black", (7, 1))
-        self.board_state[7][6] = Knight("black", (7, 6))
+        self.place_piece(Knight("white", (0, 1)))
+        self.place_piece(Knight("white", (0, 6)))
+        self.place_piece(Knight("black", (7, 1)))
+        self.place_piece(Knight("black", (7, 6)))
 
         # Place bishops
-        self.board_state[0][2] = Bishop("white", (0, 2))
-        self.board_state[0][5] = Bishop("white", (0, 5))
-        self.board_state[7][2] = Bishop("black", (7, 2))
-        self.board_state[7][5] = Bishop("black", (7, 5))
+        self.place_piece(Bishop("white", (0, 2)))
+        self.place_piece(Bishop("white", (0, 5)))
+        self.place_piece(Bishop("black", (7, 2)))
+        self.place_piece(Bishop("black", (7, 5)))
 
         # Place queens
-        self.board_state[0][3] = Queen("white", (0, 3))
-        self.board_state[7][3] = Queen("black", (7, 3))
+        self.place_piece(Queen("white", (0, 3)))
+        self.place_piece(Queen("black", (7, 3)))
 
         # Place kings
-        self.board_state[0][4] = King("white", (0, 4))
-        self.board_state[7][4] = King("black", (7, 4))
+        self.place_piece(King("white", (0, 4)))
+        self.place_piece(King("black", (7, 4)))
 
     def convert_to_FEN(self):
         fen_string = ""
@@ -60,22 +105,120 @@ class Board:
 
         return fen_string
 
+    def place_piece(self, piece):
+        """
+        Put a piece on the square given by its current position, replacing anything there.
+        """
+        rank, file = piece.current_pos
+        self.remove_piece((rank, file))
+        square = (rank * 8) + file
+        square_bit = 1 << square
+        self.board_state[rank][file] = piece
+        self.bitboards[piece.FEN] |= square_bit
+        self.occupancy[piece.color] |= square_bit
+        self.occupied |= square_bit
+        self.hash ^= PIECE_KEYS[piece.FEN][square]
+        middlegame, endgame = SQUARE_SCORES[piece.FEN][square]
+        self.middlegame_score += middlegame
+        self.endgame_score += endgame
+        self.phase += PIECE_PHASE[piece.FEN]
+        self.pieces[piece.color][square] = piece
+        self.piece_counts[piece.FEN] += 1
+        if piece.FEN in "Kk":
+            self.king_squares[piece.color] = square
+
+    def remove_piece(self, position):
+        """
+        Remove and return the piece at a position (None if the square is empty).
+        """
+        rank, file = position
+        piece = self.board_state[rank][file]
+        if piece is not None:
+            square = (rank * 8) + file
+            square_bit = 1 << square
+            self.board_state[rank][file] = None
+            self.bitboards[piece.FEN] &= ~square_bit
+            self.occupancy[piece.color] &= ~square_bit
+            self.occupied &= ~square_bit
+            self.hash ^= PIECE_KEYS[piece.FEN][square]
+            middlegame, endgame = SQUARE_SCORES[piece.FEN][square]
+            self.middlegame_score -= middlegame
+            self.endgame_score -= endgame
+            self.phase -= PIECE_PHASE[piece.FEN]
+            del self.pieces[piece.color][square]
+            self.piece_counts[piece.FEN] -= 1
+            if piece.FEN in "Kk":
+                # Boards set up by hand may hold a second king
+                kings = self.bitboards[piece.FEN]
+                self.king_squares[piece.color] = lsb_square(kings) if kings else None
+        return piece
+
     def move_piece(self, piece, end_pos):
         """
         Move a piece to an end position.
+        Whatever stands on the end position is overwritten.
         """
-        # Get the start and end positions
-        end_rank, end_file = end_pos
-        start_rank, start_file = piece.current_pos
+        # Clear the start square (it may hold a different object, e.g. when undoing a promotion)
+        self.remove_piece(piece.current_pos)
 
         # Perform the move
-        self.board_state[start_rank][start_file] = None
-        self.board_state[end_rank][end_file] = piece
-        piece.current_pos = (end_rank, end_file)
+        piece.current_pos = (end_pos[0], end_pos[1])
+        self.place_piece(piece)
 
     def get_piece(self, position):
         """
         Get the piece at a specific position.
         """
         row, col = position
-        return self.board_state[row][col]
\ No newline at end of file
+        return self.board_state[row][col]
+
+    def is_square_attacked(self, square, by_color, occupied = None):
+        """
+        Check if a square index is attacked by any piece of the given color.
+        Looks outward from the square with each attack pattern and stops at the first hit.
+        An occupancy other than the current one can be passed to look through pieces (e.g. a moving king).
+        """
+        bitboards = self.bitboards
+        if occupied is None:
+            occupied = self.occupied
+        if by_color == "white":
+            pawns, knights, bishops, rooks, queens, king = "P", "N", "B", "R", "Q", "K"
+            defender = "black"
+        else:
+            pawns, knights, bishops, rooks, queens, king = "p", "n", "b", "r", "q", "k"
+            defender = "white"
+
+        # A pawn attacks the square if a defender's pawn on the square would attack the pawn
+        if PAWN_ATTACKS[defender][square] & bitboards[pawns]:
+            return True
+        if KNIGHT_ATTACKS[square] & bitboards[knights]:
+            return True
+        if KING_ATTACKS[square] & bitboards[king]:
+            return True
+
+        # Sliders: cast rays from the square and look for a matching slider at the first blocker
+        queens = bitboards[queens]
+        if bishop_attacks(square, occupied) & (bitboards[bishops] | queens):
+            return True
+        if rook_attacks(square, occupied) & (bitboards[rooks] | queens):
+            return True
+        return False
+
+    def attackers(self, square, by_color):
+        """
+        Bitboard of all pieces of the given color attacking a square index.
+        """
+        bitboards = self.bitboards
+        if by_color == "white":
+            pawns, knights, bishops, rooks, queens, king = "P", "N", "B", "R", "Q", "K"
+            defender = "black"
+        else:
+            pawns, knights, bishops, rooks, queens, king = "p", "n", "b", "r", "q", "k"
+            defender = "white"
+
+        queens = bitboards[queens]
+        return ((PAWN_ATTACKS[defender][square] & bitboards[pawns])
+                | (KNIGHT_ATTACKS[square] & bitboards[knights])
+                | (KING_ATTACKS[square] & bitboards[king])
+                | (bishop_attacks(square, self.occupied) & (bitboards[bishops] | queens))
+                | (rook_attacks(square, self.occupied) & (bitboards[rooks] | queens)))
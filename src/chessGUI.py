@@ -94,6 +94,18 @@ class ChessGUI:
         text_rect = text.get_rect(center=self.undo_button_rect.center)
         self.screen.blit(text, text_rect)
 
+    def draw_thinking_indicator(self, nodes_per_second, depth):
+        """Draws the AI thinking indicator with the live search speed below the Undo button"""
+        font = pygame.font.SysFont("arial", 20)
+        center_x = self.undo_button_rect.centerx
+        top = self.undo_button_rect.bottom + 30
+        dots = "." * (1 + (pygame.time.get_ticks() // 400) % 3)
+        lines = [f"Thinking{dots}", f"{nodes_per_second:,} nodes/s", f"Depth {depth}"]
+        for index, line in enumerate(lines):
+            text = font.render(line, True, (0, 0, 0))
+            text_rect = text.get_rect(midtop=(center_x, top + (index * 26)))
+            self.screen.blit(text, text_rect)
+
     def draw_board(self):
         """Draws board on the screen"""
         for rank in range(0, 8):
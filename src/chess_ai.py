@@ -1,7 +1,44 @@
 import random
+import time
+from pieces import PIECE_CLASSES
+from bitboard import WHITE_PIECES
+from moves import NULL_MOVE, PROMOTION_PIECES
+from evaluation import evaluate, evaluate_from_scratch, MATERIAL
+from move_ordering import MoveOrderer
+from transposition_table import TranspositionTable, EXACT, LOWER_BOUND, UPPER_BOUND
+
+# Bound of a score seen from the other side (negated): a lower bound becomes an upper bound
+OPPOSITE_BOUND = {EXACT: EXACT, LOWER_BOUND: UPPER_BOUND, UPPER_BOUND: LOWER_BOUND}
+
+CHECKMATE_SCORE = 100000
+MATE_THRESHOLD = CHECKMATE_SCORE - 1000 # Scores beyond this are mates
+MAX_DEPTH = 64
+CHECK_INTERVAL = 1024 # Nodes searched between clock checks
+DELTA_MARGIN = 200 # Safety margin (centipawns) for delta pruning in quiescence search
+PIECE_GAINS = {symbol: values[0] for symbol, values in MATERIAL.items()}
+
+
+def score_to_table(score, ply):
+    """Mate scores are stored relative to the stored position instead of the root."""
+    if score > MATE_THRESHOLD:
+        return score + ply
+    if score < -MATE_THRESHOLD:
+        return score - ply
+    return score
+
+
+def score_from_table(score, ply):
+    if score > MATE_THRESHOLD:
+        return score - ply
+    if score < -MATE_THRESHOLD:
+        return score + ply
+    return score
+
 
 class ChessAI:
-    def __init__(self, game, color):
+    def __init__(self, game, color, hash_size_mb = 16, time_limit = 1.0, node_limit = None, max_depth = MAX_DEPTH,
+                 move_ordering = True, quiescence_node_limit = 2000, workers = 1, transposition_table = None,
+                 parallel_mode = "root_split"):
         self.game = game
         self.color = color
         self.selected_piece = None
@@ -15,72 +52,350 @@ class ChessAI:
         }
         self.white_points = 0
         self.black_points = 0
+        # Kept for the whole game so results carry over from one move to the next (or shared, see lazy_smp.py)
+        self.transposition_table = transposition_table or TranspositionTable(hash_size_mb)
+        self.move_orderer = MoveOrderer(self.piece_values)
+        self.verify_evaluation = False # Debug mode: check every leaf evaluation against a full rescan
+        self.move_ordering = move_ordering # Off searches moves in generation order (for measuring the gain)
+
+        # Search budget (seconds / nodes, None for no limit) and state of the current search
+        self.time_limit = time_limit
+        self.node_limit = node_limit
+        self.max_depth = max_depth
+        self.search_node_limit = node_limit # Node budget of the current search
+        # Quiescence nodes allowed below each leaf of the main search (0 turns quiescence off)
+        self.quiescence_node_limit = quiescence_node_limit
+        self.quiescence_budget = 0
+        self.quiescence_nodes = 0
+        self.nodes = 0
+        self.beta_cutoffs = 0
+        self.first_move_cutoffs = 0 # Cutoffs caused by the first move searched, a measure of ordering quality
+        self.deadline = None
+        self.next_limit_check = CHECK_INTERVAL
+        self.stop_search = False
+        self.stop_signal = None # Optional shared flag (non-zero at [0]) set by another process to stop the search
+        self.completed_depth = 0
+        self.root_move = None
+        # Worker processes (1 searches in this process) and how they share the work:
+        # "root_split" (parallel_search.py) or "lazy_smp" (lazy_smp.py). Both stop on time_limit and
+        # max_depth only, node_limit is ignored with more than one worker
+        self.workers = workers
+        self.parallel_mode = parallel_mode
+        self.hash_size_mb = hash_size_mb
+        self.parallel_search = None
+        self.search_info = {"depth": 0, "nodes": 0, "quiescence_nodes": 0, "time": 0.0, "nps": 0, "cutoffs": 0,
+                            "first_move_cutoffs": 0, "score": 0, "move": None}
+        self.info_callback = None # Called with search_info after every finished iteration (UCI info lines)
+
+    def search(self, time_limit = None, node_limit = None, max_depth = None, skip_depth = None):
+        """
+        Iterative deepening: search depth 1, 2, 3, ... until the time or node budget runs out.
+        Returns (best move, score) from the last iteration that finished; depth 1 always finishes
+        so there is a move to play. Limits default to the ones given to the constructor.
+        skip_depth(depth) can leave out iterations (helper searches in lazy_smp.py).
+        """
+        time_limit = self.time_limit if time_limit is None else time_limit
+        self.search_node_limit = self.node_limit if node_limit is None else node_limit
+        max_depth = self.max_depth if max_depth is None else max_depth
 
-    def minimax(self, depth, alpha, beta):
-        if (depth == 0) or (self.game.update_game_status() == "terminal"):
+        self.transposition_table.new_search()
+        self.move_orderer.new_search()
+        self.nodes = 0
+        self.quiescence_nodes = 0
+        self.beta_cutoffs = 0
+        self.first_move_cutoffs = 0
+        self.stop_search = False
+        self.completed_depth = 0
+        self.root_move = None
+        start_time = time.perf_counter()
+        self.deadline = (start_time + time_limit) if time_limit else None
+        self.next_limit_check = min(CHECK_INTERVAL, self.search_node_limit or CHECK_INTERVAL)
+
+        best_move, best_value = None, 0
+        for depth in range(1, max_depth + 1):
+            if skip_depth and (depth < max_depth) and skip_depth(depth):
+                continue
+            move, value = self.minimax(depth, float("-inf"), float("inf"))
+            if self.stop_search:
+                break # Unfinished iteration, keep the previous result
+            best_move, best_value = move, value
+            self.completed_depth = depth
+            self.root_move = move # Searched first in the next iteration
+
+            elapsed = time.perf_counter() - start_time
+            self.search_info = {
+                "depth": depth,
+                "nodes": self.nodes,
+                "time": elapsed,
+                "quiescence_nodes": self.quiescence_nodes,
+                "nps": int(self.nodes / elapsed) if elapsed > 0 else 0,
+                "cutoffs": self.beta_cutoffs,
+                "first_move_cutoffs": self.first_move_cutoffs,
+                "score": value,
+                "move": move
+            }
+            if self.info_callback:
+                self.info_callback(self.search_info)
+            # Nothing left to search, a forced mate was found, or the next iteration cannot finish in time
+            if (move is None) or (abs(value) > MATE_THRESHOLD):
+                break
+            if self.deadline and (elapsed * 2 > time_limit):
+                break
+        return best_move, best_value
+
+    def principal_variation(self, first_move, max_length = MAX_DEPTH):
+        """
+        Expected line of play starting with first_move, following the best moves stored in the
+        transposition table. Stops at a missing or illegal entry or a repeated position.
+        """
+        line = []
+        seen = set()
+        move = first_move
+        while move and (len(line) < max_length) and (self.game.hash not in seen) and (move in self.game.generate_moves()):
+            seen.add(self.game.hash)
+            self.game.push(move)
+            line.append(move)
+            entry = self.transposition_table.probe(self.game.hash)
+            move = entry[3] if entry is not None else NULL_MOVE
+        for played in line:
+            self.game.pop()
+        return line
+
+    def check_limits(self):
+        """Stop the search once the budget is spent (never during the first iteration) or when signalled."""
+        if (self.stop_signal is not None) and self.stop_signal[0]:
+            self.stop_search = True
+            return
+        if self.completed_depth > 0:
+            if (self.deadline and time.perf_counter() >= self.deadline) or (self.search_node_limit and self.nodes >= self.search_node_limit):
+                self.stop_search = True
+                return
+        self.next_limit_check = self.nodes + CHECK_INTERVAL
+        if self.search_node_limit:
+            self.next_limit_check = min(self.next_limit_check, max(self.search_node_limit, self.nodes + 1))
+
+    def minimax(self, depth, alpha, beta, ply = 0):
+        self.nodes += 1
+        if self.nodes >= self.next_limit_check:
+            self.check_limits()
+        if self.stop_search:
+            return None, 0
+        # A repeated position is scored as a draw: the side that is better off avoids it, the other may aim for it
+        if (ply > 0) and self.game.is_repetition():
+            return None, 0
+
+        if depth == 0:
+            if self.quiescence_node_limit:
+                self.quiescence_budget = self.quiescence_node_limit
+                return None, self.quiescence(alpha, beta, ply)
             return None, self.evaluate()
-        
+
         if (self.game.current_turn == self.color):
             maximizing_player = True
         else:
             maximizing_player = False
+
+        # Transposition table: reuse earlier results for this position (never cut at the root, it needs a move).
+        # Table scores are from the side to move's point of view, so they hold whichever color searches
+        original_alpha, original_beta = alpha, beta
+        hash_move = NULL_MOVE
+        entry = self.transposition_table.probe(self.game.hash)
+        if entry is not None:
+            entry_depth, entry_score, bound, hash_move = entry
+            if (ply > 0) and (entry_depth >= depth):
+                entry_score = score_from_table(entry_score, ply)
+                if not maximizing_player:
+                    entry_score, bound = -entry_score, OPPOSITE_BOUND[bound]
+                if bound == EXACT:
+                    return hash_move, entry_score
+                if bound == LOWER_BOUND:
+                    alpha = max(alpha, entry_score)
+                else:
+                    beta = min(beta, entry_score)
+                if beta <= alpha:
+                    return hash_move, entry_score
+        if (ply == 0) and self.root_move:
+            hash_move = self.root_move
         
-        piece_moves = self.game.get_all_legal_moves()
+        # The root position's moves are usually cached already (game status, piece selection)
+        moves = self.game.legal_moves() if ply == 0 else self.game.generate_moves()
+
+        # Game status is only worked out here, when the search actually needs it
+        if not moves:
+            if self.game.is_in_check(self.game.current_turn):
+                # Checkmate, scored higher the closer it is to the root
+                if maximizing_player:
+                    return None, -(CHECKMATE_SCORE - ply)
+                return None, CHECKMATE_SCORE - ply
+            return None, 0 # Stalemate
+        if (self.game.halfmove_clock >= 100) or self.game.is_insufficient_material():
+            return None, 0
+
+        if self.move_ordering:
+            moves = self.move_orderer.order_moves(self.game, moves, hash_move, ply)
+
         best_move = None
 
         if maximizing_player:
-            max_value = float("-inf")
-            for piece in piece_moves:
-                for move in piece[1]:
-                    self.game.select_piece(piece[0].current_pos)
-                    self.game.make_move(move)
-                    current_value = self.minimax(depth - 1, alpha, beta)
-                    self.game.undo_move()
-                    if current_value[1] > max_value:
-                        max_value = current_value[1]
-                        best_move = (piece[0], move)
-                    alpha = max(alpha, current_value[1])
-                    if beta <= alpha:
-                        break
-            return best_move, max_value
+            best_value = float("-inf")
+            for index, move in enumerate(moves):
+                self.game.push(move)
+                current_value = self.minimax(depth - 1, alpha, beta, ply + 1)
+                self.game.pop()
+                if self.stop_search:
+                    return None, 0
+                if current_value[1] > best_value:
+                    best_value = current_value[1]
+                    best_move = move
+                alpha = max(alpha, current_value[1])
+                if beta <= alpha:
+                    self.record_cutoff(move, index, depth, ply)
+                    break
+        else:
+            best_value = float("inf")
+            for index, move in enumerate(moves):
+                self.game.push(move)
+                current_value = self.minimax(depth - 1, alpha, beta, ply + 1)
+                self.game.pop()
+                if self.stop_search:
+                    return None, 0
+                if current_value[1] < best_value:
+                    best_value = current_value[1]
+                    best_move = move
+                beta = min(beta, current_value[1])
+                if beta <= alpha:
+                    self.record_cutoff(move, index, depth, ply)
+                    break
+
+        if best_value <= original_alpha:
+            bound = UPPER_BOUND
+        elif best_value >= original_beta:
+            bound = LOWER_BOUND
+        else:
+            bound = EXACT
+        table_value = best_value
+        if not maximizing_player:
+            table_value, bound = -best_value, OPPOSITE_BOUND[bound]
+        self.transposition_table.store(self.game.hash, depth, score_to_table(table_value, ply), bound, best_move)
+        return best_move, best_value
+
+    def quiescence(self, alpha, beta, ply):
+        """
+        Search captures and promotions only, until the position is quiet, so the evaluation
+        is not taken in the middle of an exchange.
+        The side to move can always stand pat (take the static evaluation) instead of capturing.
+        Captures that cannot bring the score back to the window even when winning the captured
+        piece outright are skipped (delta pruning).
+        """
+        self.nodes += 1
+        self.quiescence_nodes += 1
+        self.quiescence_budget -= 1
+        if self.nodes >= self.next_limit_check:
+            self.check_limits()
+        if self.stop_search:
+            return 0
+
+        stand_pat = self.evaluate()
+        maximizing_player = self.game.current_turn == self.color
+        if maximizing_player:
+            if stand_pat >= beta:
+                return stand_pat
+            alpha = max(alpha, stand_pat)
         else:
-            min_value = float("inf")
-            for piece in piece_moves:
-                for move in piece[1]:
-                    self.game.select_piece(piece[0].current_pos)
-                    self.game.make_move(move)
-                    current_value = self.minimax(depth - 1, alpha, beta)
-                    self.game.undo_move()
-                    if current_value[1] < min_value:
-                        min_value = current_value[1]
-                        best_move = (piece[0], move)
-                    beta = min(beta, current_value[1])
-                    if beta <= alpha:
-                        break
-            return best_move, min_value
+            if stand_pat <= alpha:
+                return stand_pat
+            beta = min(beta, stand_pat)
+        if self.quiescence_budget <= 0:
+            return stand_pat
+
+        moves = self.game.generate_captures()
+        if self.move_ordering:
+            moves = self.move_orderer.order_moves(self.game, moves, NULL_MOVE, ply)
+        board_state = self.game.board.board_state
+        best_value = stand_pat
+        for move in moves:
+            # Delta pruning: the largest possible gain from this move
+            target = (move >> 6) & 63
+            victim = board_state[target >> 3][target & 7]
+            gain = DELTA_MARGIN
+            if move & 0x4000:
+                gain += PIECE_GAINS[victim.FEN.upper()] if victim else PIECE_GAINS["P"]
+            if move & 0x8000:
+                gain += PIECE_GAINS[PROMOTION_PIECES[(move >> 12) & 3]] - PIECE_GAINS["P"]
+            if (maximizing_player and stand_pat + gain <= alpha) or (not maximizing_player and stand_pat - gain >= beta):
+                continue
+
+            self.game.push(move)
+            value = self.quiescence(alpha, beta, ply + 1)
+            self.game.pop()
+            if self.stop_search:
+                return 0
+            if maximizing_player:
+                if value > best_value:
+                    best_value = value
+                alpha = max(alpha, value)
+            else:
+                if value < best_value:
+                    best_value = value
+                beta = min(beta, value)
+            if beta <= alpha:
+                break
+        return best_value
 
+    def record_cutoff(self, move, index, depth, ply):
+        self.beta_cutoffs += 1
+        if index == 0:
+            self.first_move_cutoffs += 1
+        self.move_orderer.record_cutoff(move, self.game.current_turn, depth, ply)
 
     def calculate_points(self):
         self.white_points = 0
         self.black_points = 0
-        for rank in self.game.board.board_state:
-            for file in rank:
-                if file:
-                    if file.color == "white":
-                        if type(file).__name__ in self.piece_values.keys():
-                            self.white_points += self.piece_values[type(file).__name__]
-                    elif file.color == "black":
-                        if type(file).__name__ in self.piece_values.keys():
-                            self.black_points += self.piece_values[type(file).__name__]
+        for symbol, count in self.game.board.piece_counts.items():
+            points = self.piece_values[PIECE_CLASSES[symbol.upper()].__name__] * count
+            if symbol in WHITE_PIECES:
+                self.white_points += points
+            else:
+                self.black_points += points
 
     def evaluate(self):
-        self.calculate_points()
+        """
+        Score of the position for the AI, read from the board's incrementally updated terms.
+        With verify_evaluation set it is checked against a from-scratch evaluation.
+        """
+        score = evaluate(self.game.board)
+        if self.verify_evaluation and score != evaluate_from_scratch(self.game.board):
+            raise AssertionError("Incremental evaluation out of sync with the position")
         if self.color == "white":
-            return self.white_points - self.black_points
+            return score
         else:
-            return self.black_points - self.white_points
+            return -score
         
+    def close(self):
+        """Shut down the worker processes of a parallel search (and free the lazy SMP shared table)."""
+        if self.parallel_search is not None:
+            self.parallel_search.close()
+            self.parallel_search = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
     def make_move(self):
-        move, value = self.minimax(3, float("-inf"), float("inf"))
-        self.game.select_piece(move[0].current_pos)
-        self.game.make_move(move[1])
\ No newline at end of file
+        if (self.workers > 1) and (self.parallel_mode == "lazy_smp"):
+            if self.parallel_search is None:
+                from lazy_smp import LazySMPSearch # Imported here, lazy_smp builds on this module
+                self.parallel_search = LazySMPSearch(self.workers, self.hash_size_mb, self.quiescence_node_limit)
+            move, value = self.parallel_search.search(self.game, self.time_limit, self.max_depth)
+            self.search_info = self.parallel_search.search_info
+        elif self.workers > 1:
+            if self.parallel_search is None:
+                from parallel_search import ParallelSearch # Imported here, parallel_search builds on this module
+                self.parallel_search = ParallelSearch(self, self.workers)
+            move, value = self.parallel_search.search(self.time_limit, self.max_depth)
+            self.search_info = self.parallel_search.search_info
+        else:
+            move, value = self.search()
+        self.game.play_move(move)
\ No newline at end of file
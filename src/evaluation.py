@@ -0,0 +1,162 @@
+"""
+Material and piece-square evaluation with a tapered middlegame/endgame phase.
+
+Every piece on a square contributes a fixed (middlegame, endgame) pair:
+its material value plus its piece-square bonus, positive for white and
+negative for black. Board adds and subtracts these pairs as pieces are placed
+and removed, so a leaf evaluation only blends two running sums by the game
+phase. evaluate_from_scratch recomputes the same value by walking the board
+and is used to verify the incremental sums.
+"""
+from bitboard import PIECE_SYMBOLS
+
+# Material in centipawns: (middlegame, endgame)
+MATERIAL = {
+    "P": (100, 120),
+    "N": (320, 300),
+    "B": (330, 320),
+    "R": (500, 520),
+    "Q": (900, 950),
+    "K": (0, 0)
+}
+
+# Game phase: 24 with all minor and major pieces on the board, 0 with only kings and pawns
+PHASE_WEIGHTS = {"P": 0, "N": 1, "B": 1, "R": 2, "Q": 4, "K": 0}
+MAX_PHASE = 24
+
+# Piece-square tables from white's point of view, written as seen from white's side
+# of the board: the first row is rank 8, the last row is rank 1
+PAWN_TABLE = [
+     0,   0,   0,   0,   0,   0,   0,   0,
+    50,  50,  50,  50,  50,  50,  50,  50,
+    10,  10,  20,  30,  30,  20,  10,  10,
+     5,   5,  10,  25,  25,  10,   5,   5,
+     0,   0,   0,  20,  20,   0,   0,   0,
+     5,  -5, -10,   0,   0, -10,  -5,   5,
+     5,  10,  10, -20, -20,  10,  10,   5,
+     0,   0,   0,   0,   0,   0,   0,   0
+]
+PAWN_ENDGAME_TABLE = [
+     0,   0,   0,   0,   0,   0,   0,   0,
+    80,  80,  80,  80,  80,  80,  80,  80,
+    50,  50,  50,  50,  50,  50,  50,  50,
+    30,  30,  30,  30,  30,  30,  30,  30,
+    15,  15,  15,  15,  15,  15,  15,  15,
+     5,   5,   5,   5,   5,   5,   5,   5,
+     0,   0,   0,   0,   0,   0,   0,   0,
+     0,   0,   0,   0,   0,   0,   0,   0
+]
+KNIGHT_TABLE = [
+   -50, -40, -30, -30, -30, -30, -40, -50,
+   -40, -20,   0,   0,   0,   0, -20, -40,
+   -30,   0,  10,  15,  15,  10,   0, -30,
+   -30,   5,  15,  20,  20,  15,   5, -30,
+   -30,   0,  15,  20,  20,  15,   0, -30,
+   -30,   5,  10,  15,  15,  10,   5, -30,
+   -40, -20,   0,   5,   5,   0, -20, -40,
+   -50, -40, -30, -30, -30, -30, -40, -50
+]
+BISHOP_TABLE = [
+   -20, -10, -10, -10, -10, -10, -10, -20,
+   -10,   0,   0,   0,   0,   0,   0, -10,
+   -10,   0,   5,  10,  10,   5,   0, -10,
+   -10,   5,   5,  10,  10,   5,   5, -10,
+   -10,   0,  10,  10,  10,  10,   0, -10,
+   -10,  10,  10,  10,  10,  10,  10, -10,
+   -10,   5,   0,   0,   0,   0,   5, -10,
+   -20, -10, -10, -10, -10, -10, -10, -20
+]
+ROOK_TABLE = [
+     0,   0,   0,   0,   0,   0,   0,   0,
+     5,  10,  10,  10,  10,  10,  10,   5,
+    -5,   0,   0,   0,   0,   0,   0,  -5,
+    -5,   0,   0,   0,   0,   0,   0,  -5,
+    -5,   0,   0,   0,   0,   0,   0,  -5,
+    -5,   0,   0,   0,   0,   0,   0,  -5,
+    -5,   0,   0,   0,   0,   0,   0,  -5,
+     0,   0,   0,   5,   5,   0,   0,   0
+]
+QUEEN_TABLE = [
+   -20, -10, -10,  -5,  -5, -10, -10, -20,
+   -10,   0,   0,   0,   0,   0,   0, -10,
+   -10,   0,   5,   5,   5,   5,   0, -10,
+    -5,   0,   5,   5,   5,   5,   0,  -5,
+     0,   0,   5,   5,   5,   5,   0,  -5,
+   -10,   5,   5,   5,   5,   5,   0, -10,
+   -10,   0,   5,   0,   0,   0,   0, -10,
+   -20, -10, -10,  -5,  -5, -10, -10, -20
+]
+KING_TABLE = [
+   -30, -40, -40, -50, -50, -40, -40, -30,
+   -30, -40, -40, -50, -50, -40, -40, -30,
+   -30, -40, -40, -50, -50, -40, -40, -30,
+   -30, -40, -40, -50, -50, -40, -40, -30,
+   -20, -30, -30, -40, -40, -30, -30, -20,
+   -10, -20, -20, -20, -20, -20, -20, -10,
+    20,  20,   0,   0,   0,   0,  20,  20,
+    20,  30,  10,   0,   0,  10,  30,  20
+]
+KING_ENDGAME_TABLE = [
+   -50, -40, -30, -20, -20, -30, -40, -50,
+   -30, -20, -10,   0,   0, -10, -20, -30,
+   -30, -10,  20,  30,  30,  20, -10, -30,
+   -30, -10,  30,  40,  40,  30, -10, -30,
+   -30, -10,  30,  40,  40,  30, -10, -30,
+   -30, -10,  20,  30,  30,  20, -10, -30,
+   -30, -30,   0,   0,   0,   0, -30, -30,
+   -50, -30, -30, -30, -30, -30, -30, -50
+]
+
+# (middlegame, endgame) tables per piece type
+PIECE_SQUARE_TABLES = {
+    "P": (PAWN_TABLE, PAWN_ENDGAME_TABLE),
+    "N": (KNIGHT_TABLE, KNIGHT_TABLE),
+    "B": (BISHOP_TABLE, BISHOP_TABLE),
+    "R": (ROOK_TABLE, ROOK_TABLE),
+    "Q": (QUEEN_TABLE, QUEEN_TABLE),
+    "K": (KING_TABLE, KING_ENDGAME_TABLE)
+}
+
+
+def _square_scores(symbol):
+    """(middlegame, endgame) contribution of the piece on each square index, signed for its color."""
+    middlegame_table, endgame_table = PIECE_SQUARE_TABLES[symbol.upper()]
+    middlegame_value, endgame_value = MATERIAL[symbol.upper()]
+    scores = []
+    for square in range(64):
+        if symbol.isupper():
+            index = square ^ 56 # Tables list rank 8 first, square 0 is a1
+            scores.append((middlegame_value + middlegame_table[index], endgame_value + endgame_table[index]))
+        else:
+            index = square # Mirrored for black: black's first rank is the tables' last row
+            scores.append((-(middlegame_value + middlegame_table[index]), -(endgame_value + endgame_table[index])))
+    return scores
+
+
+SQUARE_SCORES = {symbol: _square_scores(symbol) for symbol in PIECE_SYMBOLS}
+# Phase weight keyed by FEN character of either color
+PIECE_PHASE = {symbol: PHASE_WEIGHTS[symbol.upper()] for symbol in PIECE_SYMBOLS}
+
+
+def tapered_score(middlegame_score, endgame_score, phase):
+    """Blend the two scores by game phase, from white's point of view."""
+    phase = min(phase, MAX_PHASE)
+    return ((middlegame_score * phase) + (endgame_score * (MAX_PHASE - phase))) // MAX_PHASE
+
+
+def evaluate(board):
+    """Evaluation from white's point of view using the board's running sums."""
+    return tapered_score(board.middlegame_score, board.endgame_score, board.phase)
+
+
+def evaluate_from_scratch(board):
+    """The same evaluation computed by walking every square, to check the incremental sums."""
+    middlegame_score = endgame_score = phase = 0
+    for rank in board.board_state:
+        for piece in rank:
+            if piece is not None:
+                middlegame, endgame = SQUARE_SCORES[piece.FEN][(piece.current_pos[0] * 8) + piece.current_pos[1]]
+                middlegame_score += middlegame
+                endgame_score += endgame
+                phase += PIECE_PHASE[piece.FEN]
+    return tapered_score(middlegame_score, endgame_score, phase)
@@ -1,15 +1,33 @@
 from board import Board
 from pieces import *
+from bitboard import *
+from movegen import generate_legal_moves, has_legal_move
+from moves import *
+from array import array
+from collections import OrderedDict
+from zobrist import SIDE_KEY, state_key, position_key
+
+# Castling right lost when a piece leaves or lands on one of these corner squares
+CASTLING_SQUARES = {
+    0: ("white", "queenside"),
+    7: ("white", "kingside"),
+    56: ("black", "queenside"),
+    63: ("black", "kingside")
+}
+
+POSITION_CACHE_SIZE = 256 # Positions whose legal moves and check state are kept (least recently used dropped first)
+TERMINAL_STATUSES = ("checkmate", "stalemate", "draw 50-move", "draw insufficient material", "draw threefold repetition")
 
 class Game:
-    def __init__(self):
-        self.board = Board()
+    def __init__(self, board = None):
+        self.board = board if board is not None else Board()
         self.current_turn = "white"
         self.move_history = []  # List of moves in the format [(piece, from_pos, to_pos), ...]
         self.last_status = "active" # active, check, checkmate, stalemate, draw
         self.game_status = "active"  # active, check, checkmate, stalemate, draw
         self.selected_piece = None
         self.possible_moves = []
+        self.selected_moves = array("H")  # Encoded legal moves of the selected piece
         # For special moves
         self.en_passant_target = None
         self.castling_rights = {
@@ -18,16 +36,21 @@ class Game:
         }
         self.halfmove_clock = 0  # For 50-move rule
         self.fullmove_number = 1  # Increments after black's move
-        self.repetition_count = {} # For threefold repetition rule
-        self.fen_history = [self.get_fen()] # Board state history
+        self.debug_hash = False # Recompute the hash from scratch after every update and compare
+        self.hash = self.compute_hash() # Zobrist hash of the position, kept up to date incrementally
+        self.hash_history = [self.hash] # Hash of every position reached, including search moves (see is_repetition)
+        self.repetition_count = {self.hash: 1} # For threefold repetition rule
+        self.search_stack = [] # State saved by push() for pop()
+        self.spare_pieces = {symbol: [] for symbol in PIECE_SYMBOLS} # Promoted pieces taken back by pop(), reused by push()
+        # Legal moves and check state per position, shared by selection, game status and the AI root.
+        # Keyed by the position hash so entries never go stale: every move or undo changes the key.
+        self.position_cache = OrderedDict()
 
     def find_king(self, color):
         """Find the position of a king of the specified color"""
-        for rank in range(8):
-            for file in range(8):
-                piece = self.board.board_state[rank][file]
-                if (piece is not None) and isinstance(piece, King) and (piece.color == color):
-                    return (rank, file)
+        king_square = self.board.king_squares[color]
+        if king_square is not None:
+            return SQUARE_POSITIONS[king_square]
         return None
 
     def select_piece(self, position):
@@ -43,64 +66,225 @@ class Game:
             return False
             
         self.selected_piece = piece
-        self.possible_moves = self.get_legal_moves(piece)
+        square = square_index(position)
+        self.selected_moves = array("H", [move for move in self.legal_moves(piece.color) if move_from(move) == square])
+        # Promotions produce one move per piece, but the target square is listed once
+        self.possible_moves = list(dict.fromkeys(SQUARE_POSITIONS[move_to(move)] for move in self.selected_moves))
         return True
     
     def get_legal_moves(self, piece):
         """
         Get all legal moves for a piece considering check constraints.
         """
-        # Get the basic moves the piece can make
-        all_moves = piece.get_moves(self.board.board_state)
-        legal_moves = []
-        
-        # Test each move to see if it would leave the king in check
-        original_pos = piece.current_pos
-        
-        for move in all_moves:
-            # Save the piece that might be captured
-            target_piece = self.board.get_piece(move)
-            
-            # Make the move temporarily
-            self.board.move_piece(piece, move)
-            
-            # Check if the move would leave the king in check
-            if not self.is_in_check(piece.color):
-                legal_moves.append(move)
-            
-            # Undo the move
-            self.board.move_piece(piece, original_pos)
-            if target_piece:
-                self.board.board_state[move[0]][move[1]] = target_piece
-                target_piece.current_pos = move
-    
-        # Add en passant moves
-        if isinstance(piece, Pawn):
-            if self.en_passant_target:
-                if (self.en_passant_target[0] != piece.color):
-                    if (abs(self.en_passant_target[1] - piece.current_pos[0]) == 1) and (abs(self.en_passant_target[2] - piece.current_pos[1]) == 1):
-                        legal_moves.append((self.en_passant_target[1], self.en_passant_target[2]))
-        # Add castling moves
-        elif isinstance(piece, King) and (self.game_status != "check"):
-            if self.castling_rights[piece.color]["queenside"]:
-                if (self.board.board_state[piece.current_pos[0]][1] is None) and (self.board.board_state[piece.current_pos[0]][2] is None) and (self.board.board_state[piece.current_pos[0]][3] is None):
-                    if (not self.is_in_check(piece.color, (piece.current_pos[0], 2))) and (not self.is_in_check(piece.color, (piece.current_pos[0], 3))):
-                        legal_moves.append((piece.current_pos[0], 2))
-            if self.castling_rights[piece.color]["kingside"]:
-                if (self.board.board_state[piece.current_pos[0]][5] is None) and (self.board.board_state[piece.current_pos[0]][6] is None):
-                    if (not self.is_in_check(piece.color, (piece.current_pos[0], 5))):
-                        legal_moves.append((piece.current_pos[0], 6))
-
-        return legal_moves
+        square = square_index(piece.current_pos)
+        return list(dict.fromkeys(SQUARE_POSITIONS[move_to(move)] for move in self.legal_moves(piece.color) if move_from(move) == square))
     
     def get_all_legal_moves(self):
-        all_moves = []
-        for rank in self.board.board_state:
-            for file in rank:
-                if file and (file.color == self.current_turn):
-                    all_moves.append((file, self.get_legal_moves(file)))
-        return all_moves
-    
+        """
+        Get the legal moves of every piece of the side to move as [(piece, [moves]), ...].
+        """
+        moves_by_square = {}
+        for move in self.legal_moves():
+            targets = moves_by_square.setdefault(move_from(move), [])
+            if SQUARE_POSITIONS[move_to(move)] not in targets:
+                targets.append(SQUARE_POSITIONS[move_to(move)])
+
+        return [(piece, moves_by_square.get(square, [])) for square, piece in self.board.pieces[self.current_turn].items()]
+
+    def generate_moves(self, moves = None):
+        """
+        Get every legal move of the side to move as encoded integers (see moves.py).
+        A buffer such as an array("H") can be passed in to be cleared and reused.
+        """
+        if moves is None:
+            moves = array("H")
+        else:
+            del moves[:]
+        return generate_legal_moves(self.board, self.current_turn, self.castling_rights, self.en_passant_target, moves = moves)
+
+    def position_entry(self, color):
+        """
+        Cached [legal moves, in check, has a legal move] of the given color in the current position.
+        Check is worked out when the entry is made; the moves and whether there are any are filled in
+        when first asked for. The board hash is part of the key as well, so a board edited directly
+        never hits a stale entry.
+        """
+        key = (self.hash, self.board.hash, color)
+        entry = self.position_cache.get(key)
+        if entry is None:
+            entry = [None, self.is_in_check(color), None]
+            self.position_cache[key] = entry
+            if len(self.position_cache) > POSITION_CACHE_SIZE:
+                self.position_cache.popitem(last = False)
+        else:
+            self.position_cache.move_to_end(key)
+        return entry
+
+    def legal_moves(self, color = None):
+        """
+        Legal moves of the given color (default: the side to move), generated once per position.
+        The array is shared with the cache and must not be changed; use generate_moves() for a private copy.
+        """
+        entry = self.position_entry(color or self.current_turn)
+        if entry[0] is None:
+            entry[0] = generate_legal_moves(self.board, color or self.current_turn, self.castling_rights, self.en_passant_target,
+                                            moves = array("H"))
+            entry[2] = len(entry[0]) > 0
+        return entry[0]
+
+    def generate_captures(self, moves = None):
+        """
+        Get only the legal captures and promotions of the side to move (used by quiescence search).
+        """
+        if moves is None:
+            moves = array("H")
+        else:
+            del moves[:]
+        return generate_legal_moves(self.board, self.current_turn, self.castling_rights, self.en_passant_target, moves = moves,
+                                    captures_only = True)
+
+    def has_legal_moves(self, color):
+        """
+        Check if the given color has at least one legal move.
+        """
+        entry = self.position_entry(color)
+        if entry[2] is None:
+            entry[2] = has_legal_move(self.board, color, self.castling_rights, self.en_passant_target)
+        return entry[2]
+
+    def play_move(self, move):
+        """
+        Play an encoded move through the regular game path (selection, make_move and promotion).
+        Returns True if the move was made.
+        """
+        start, end = move_positions(move)
+        if not self.select_piece(start):
+            return False
+        if self.make_move(end):
+            return True
+        if is_promotion(move) and (self.game_status == "promotion"):
+            self.finish_promotion(PIECE_CLASSES[promotion_piece(move)])
+            return True
+        return False
+
+    def play_uci_moves(self, uci_moves):
+        """
+        Play a space separated list of moves in coordinate notation (e.g. "e2e4 e7e5").
+        Returns the game; raises ValueError at the first illegal move.
+        """
+        for text in uci_moves.split():
+            for move in self.generate_moves():
+                if move_to_uci(move) == text:
+                    self.play_move(move)
+                    break
+            else:
+                raise ValueError(f"Illegal move {text}")
+        return self
+
+    def push(self, move):
+        """
+        Play an encoded move for search.
+        Only the board, side to move, castling rights, en passant target and clocks are updated;
+        game status, history and repetition counts are left for the regular make_move path.
+        """
+        board = self.board
+        start = move & 63
+        target = (move >> 6) & 63
+        flags = move >> 12
+        start_position = SQUARE_POSITIONS[start]
+        end_position = SQUARE_POSITIONS[target]
+        piece = board.board_state[start_position[0]][start_position[1]]
+        color = piece.color
+        board_hash = board.hash
+        previous_state_key = state_key(self.castling_rights, self.en_passant_target)
+
+        if flags == EN_PASSANT:
+            captured = board.remove_piece((start_position[0], end_position[1]))
+        else:
+            captured = board.board_state[end_position[0]][end_position[1]]
+
+        # Everything pop() needs to restore the previous state
+        self.search_stack.append((move, piece, captured, self.castling_rights, self.en_passant_target, self.halfmove_clock, self.hash))
+
+        board.move_piece(piece, end_position)
+        if flags >= PROMOTION:
+            symbol = PROMOTION_PIECES[flags & 3]
+            spares = self.spare_pieces[symbol if color == "white" else symbol.lower()]
+            if spares:
+                promoted = spares.pop()
+                promoted.current_pos = end_position
+            else:
+                promoted = PIECE_CLASSES[symbol](color, end_position)
+            board.place_piece(promoted)
+        elif flags == KINGSIDE_CASTLE:
+            board.move_piece(board.get_piece((start_position[0], 7)), (start_position[0], 5))
+        elif flags == QUEENSIDE_CASTLE:
+            board.move_piece(board.get_piece((start_position[0], 0)), (start_position[0], 3))
+
+        # Castling rights are copied on write, so pop() can put the previous dictionary back as is
+        lost_rights = []
+        if isinstance(piece, King):
+            lost_rights = [(color, "kingside"), (color, "queenside")]
+        if start in CASTLING_SQUARES:
+            lost_rights.append(CASTLING_SQUARES[start])
+        if target in CASTLING_SQUARES:
+            lost_rights.append(CASTLING_SQUARES[target])
+        if any(self.castling_rights[side][wing] for side, wing in lost_rights):
+            self.castling_rights = {side: dict(rights) for side, rights in self.castling_rights.items()}
+            for side, wing in lost_rights:
+                self.castling_rights[side][wing] = False
+
+        if flags == DOUBLE_PAWN_PUSH:
+            self.en_passant_target = (color, (start_position[0] + end_position[0]) // 2, start_position[1])
+        else:
+            self.en_passant_target = None
+
+        if isinstance(piece, Pawn) or (captured is not None):
+            self.halfmove_clock = 0
+        else:
+            self.halfmove_clock += 1
+        if color == "black":
+            self.fullmove_number += 1
+        self.current_turn = "black" if color == "white" else "white"
+
+        self.hash ^= board_hash ^ board.hash ^ SIDE_KEY ^ previous_state_key ^ state_key(self.castling_rights, self.en_passant_target)
+        self.hash_history.append(self.hash)
+        if self.debug_hash:
+            self.verify_hash()
+
+    def pop(self):
+        """
+        Take back the last move played with push().
+        """
+        move, piece, captured, castling_rights, en_passant_target, halfmove_clock, position_hash = self.search_stack.pop()
+        board = self.board
+        flags = move >> 12
+        start_position, end_position = move_positions(move)
+
+        if flags == KINGSIDE_CASTLE:
+            board.move_piece(board.get_piece((start_position[0], 5)), (start_position[0], 7))
+        elif flags == QUEENSIDE_CASTLE:
+            board.move_piece(board.get_piece((start_position[0], 3)), (start_position[0], 0))
+
+        if flags >= PROMOTION:
+            promoted = board.get_piece(end_position)
+            self.spare_pieces[promoted.FEN].append(promoted)
+        # Moving the piece back also clears a promoted piece from the end square
+        board.move_piece(piece, start_position)
+        if captured is not None:
+            board.place_piece(captured)
+
+        self.castling_rights = castling_rights
+        self.en_passant_target = en_passant_target
+        self.halfmove_clock = halfmove_clock
+        if piece.color == "black":
+            self.fullmove_number -= 1
+        self.current_turn = piece.color
+        self.hash = position_hash
+        self.hash_history.pop()
+        if self.debug_hash:
+            self.verify_hash()
+
     def make_move(self, end_position):
         """
         Move the currently selected piece to the end position if it's a legal move.
@@ -114,7 +298,8 @@ class Game:
         moved_piece = self.selected_piece
         captured_piece = self.board.get_piece(end_position)
         
-        # Update halfmove clock for the 50-move rule
+        # Update halfmove clock for the 50-move rule (undo restores the previous value from the move record)
+        previous_halfmove_clock = self.halfmove_clock
         if isinstance(moved_piece, Pawn) or (captured_piece is not None):
             self.halfmove_clock = 0
         else:
@@ -135,21 +320,33 @@ class Game:
             "castling": None,
             "rook": None,
             "rook_from": None,
-            "rook_to": None
+            "rook_to": None,
+            "castling_rights": {color: dict(rights) for color, rights in self.castling_rights.items()},
+            "en_passant_target": self.en_passant_target,
+            "previous half-move clock": previous_halfmove_clock,
+            "hash": self.hash,
+            "board_hash": self.board.hash
         })
+
+        # A rook captured on its starting corner takes its side's castling right with it
+        if isinstance(captured_piece, Rook) and (end_position[0] == (0 if captured_piece.color == "white" else 7)):
+            if end_position[1] == 0:
+                self.castling_rights[captured_piece.color]["queenside"] = False
+            elif end_position[1] == 7:
+                self.castling_rights[captured_piece.color]["kingside"] = False
         
         # Handle special moves
         if isinstance(moved_piece, Pawn):
             # Handle en passant
             if self.en_passant_target and (end_position == (self.en_passant_target[1], self.en_passant_target[2])):
-                self.move_history[-1]["captured"] = self.board.board_state[start_position[0]][end_position[1]]
-                self.board.board_state[start_position[0]][end_position[1]] = None
+                self.move_history[-1]["captured"] = self.board.remove_piece((start_position[0], end_position[1]))
             
             # Handle promotion
             promotion_rank = 7 if moved_piece.color == "white" else 0
             if end_position[0] == promotion_rank:
                 # Make the actual move
                 self.board.move_piece(moved_piece, end_position)
+                self.en_passant_target = None
 
                 # Update game status to "promotion"
                 self.update_game_status(piece = moved_piece)
@@ -175,10 +372,8 @@ class Game:
                 self.move_history[-1]["rook_from"] = (end_position[0], 0)
                 self.move_history[-1]["rook_to"] = (end_position[0], 3)
 
-                self.board.board_state[end_position[0]][0] = None
-                self.board.board_state[end_position[0]][2] = King(moved_piece.color, (end_position[0], 2))
-                self.board.board_state[start_position[0]][start_position[1]] = None
-                self.board.board_state[end_position[0]][3] = Rook(moved_piece.color, (end_position[0], 3))
+                self.board.move_piece(self.move_history[-1]["rook"], (end_position[0], 3))
+                self.board.move_piece(moved_piece, end_position)
                 castled = True
             elif (self.castling_rights[moved_piece.color]["kingside"]) and (end_position == (moved_piece.current_pos[0], 6)):
                 self.move_history[-1]["castling"] = "kingside"
@@ -186,17 +381,15 @@ class Game:
                 self.move_history[-1]["rook_from"] = (end_position[0], 7)
                 self.move_history[-1]["rook_to"] = (end_position[0], 5)
 
-                self.board.board_state[end_position[0]][7] = None
-                self.board.board_state[end_position[0]][6] = King(moved_piece.color, (end_position[0], 6))
-                self.board.board_state[start_position[0]][start_position[1]] = None
-                self.board.board_state[end_position[0]][5] = Rook(moved_piece.color, (end_position[0], 5))
+                self.board.move_piece(self.move_history[-1]["rook"], (end_position[0], 5))
+                self.board.move_piece(moved_piece, end_position)
                 castled = True
 
             # Update castling rights
             self.castling_rights[moved_piece.color]["kingside"] = False
             self.castling_rights[moved_piece.color]["queenside"] = False
             
-        elif isinstance(moved_piece, Rook):
+        elif isinstance(moved_piece, Rook) and (start_position[0] == (0 if moved_piece.color == "white" else 7)):
             if start_position[1] == 0:  # Queenside rook
                 self.castling_rights[moved_piece.color]["queenside"] = False
             elif start_position[1] == 7:  # Kingside rook
@@ -206,23 +399,19 @@ class Game:
         if not castled:
             self.board.move_piece(moved_piece, end_position)
         
-        # Update repetition count for threefold repetition rule
-        fen = self.get_fen().split(" ")[0:4]  # Ignore halfmove/fullmove for repetition
-        fen_key = " ".join(fen)
-        self.repetition_count[fen_key] = self.repetition_count.get(fen_key, 0) + 1
+        # Update the hash and the repetition count for threefold repetition rule
+        self.update_hash(self.move_history[-1])
 
         # Check game status after the move
         self.update_game_status()
 
-        # Update board state history
-        self.fen_history.append(self.get_fen())
-
         # Switch turns
         self.current_turn = "black" if self.current_turn == "white" else "white"
         
         # Clear selection
         self.selected_piece = None
         self.possible_moves = []
+        del self.selected_moves[:]
         
         return True
     
@@ -237,11 +426,12 @@ class Game:
         color = self.selected_piece.color
 
         new_piece = selected_class(color, pos)
-        self.board.board_state[pos[0]][pos[1]] = new_piece
+        self.board.place_piece(new_piece)
 
         # Update the last move in history to reflect the promotion
         if self.move_history:
             self.move_history[-1]["promotion"] = selected_class.__name__
+            self.update_hash(self.move_history[-1])
 
         # Switch turns
         self.current_turn = "black" if self.current_turn == "white" else "white"
@@ -252,66 +442,72 @@ class Game:
         # Clear selection
         self.selected_piece = None
         self.possible_moves = []
+        del self.selected_moves[:]
+
+    def update_hash(self, last_move):
+        """
+        Bring the hash up to date after the move recorded in last_move, from the state saved in the record.
+        Also counts the new position for the threefold repetition rule.
+        """
+        self.hash = (last_move["hash"] ^ last_move["board_hash"] ^ self.board.hash ^ SIDE_KEY
+                     ^ state_key(last_move["castling_rights"], last_move["en_passant_target"])
+                     ^ state_key(self.castling_rights, self.en_passant_target))
+        self.hash_history.append(self.hash)
+        self.repetition_count[self.hash] = self.repetition_count.get(self.hash, 0) + 1
+        if self.debug_hash:
+            self.verify_hash(next_turn = True)
+
+    def compute_hash(self, next_turn = False):
+        """
+        Compute the Zobrist hash of the position from scratch.
+        next_turn hashes the position with the other side to move (make_move switches turns last).
+        """
+        color = self.current_turn
+        if next_turn:
+            color = "black" if color == "white" else "white"
+        return position_key(self.board, color, self.castling_rights, self.en_passant_target)
+
+    def verify_hash(self, next_turn = False):
+        """
+        Debug check that the incrementally updated hash matches a from-scratch computation.
+        """
+        if self.hash != self.compute_hash(next_turn):
+            raise AssertionError("Zobrist hash out of sync with the position")
+
+    def is_square_attacked(self, position, by_color):
+        """
+        Check if the square at position is attacked by any piece of the given color.
+        """
+        return self.board.is_square_attacked((position[0] * 8) + position[1], by_color)
 
     def is_in_check(self, color, position = None):
         """
         Check if the king of the given color is in check.
+        If a position is given, check whether a king of that color would be attacked there.
         """
         if position:
             king_position = position
         else:
             king_position = self.find_king(color)
+            if king_position is None:
+                return False
         opponent_color = "black" if color == "white" else "white"
         
-        # Check if any opponent piece can attack the king
-        for rank in range(8):
-            for file in range(8):
-                piece = self.board.board_state[rank][file]
-                if piece is not None and piece.color == opponent_color:
-                    moves = piece.get_moves(self.board.board_state)
-                    if king_position in moves:
-                        return True
-        return False
+        return self.is_square_attacked(king_position, opponent_color)
     
     def is_checkmate(self, color):
         """
         Check if the king of the given color is in checkmate.
         """
-        # If not in check, can't be checkmate
-        if not self.is_in_check(color):
-            return False
-        
-        # Check if any piece can make a legal move
-        for rank in range(8):
-            for file in range(8):
-                piece = self.board.board_state[rank][file]
-                if piece is not None and piece.color == color:
-                    legal_moves = self.get_legal_moves(piece)
-                    if legal_moves:
-                        return False
-        
         # No legal moves and in check = checkmate
-        return True
+        return self.position_entry(color)[1] and not self.has_legal_moves(color)
     
     def is_stalemate(self, color):
         """
         Check if the position is a stalemate for the given color.
         """
-        # If in check, it's not stalemate
-        if self.is_in_check(color):
-            return False
-        
-        # Check if any piece can make a legal move
-        for rank in range(8):
-            for file in range(8):
-                piece = self.board.board_state[rank][file]
-                if piece is not None and piece.color == color:
-                    legal_moves = self.get_legal_moves(piece)
-                    if legal_moves:
-                        return False
-        
         # No legal moves and not in check = stalemate
-        return True
+        return not (self.position_entry(color)[1] or self.has_legal_moves(color))
     
     def update_game_status(self, piece = None):
         """
@@ -326,70 +522,127 @@ class Game:
                 self.game_status = "promotion"
                 return
 
-        # Check for checkmate or stalemate
-        if self.is_checkmate(opponent_color):
-            self.game_status = "checkmate"
+        self.game_status = self.position_status(opponent_color)
+        if self.game_status in TERMINAL_STATUSES:
             return "terminal"
-        
-        if self.is_stalemate(opponent_color):
-            self.game_status = "stalemate"
-            return "terminal"
-        
-        # Check for draw
+
+    def position_status(self, color = None):
+        """
+        Status of the current position for the given color (default: the side to move), in one pass:
+        check is worked out once, the legal move search stops at the first move, then the draw rules.
+        Returns "checkmate", "stalemate", one of the draw statuses, "check" or "active".
+        """
+        color = color or self.current_turn
+        in_check = self.position_entry(color)[1]
+        if not self.has_legal_moves(color):
+            return "checkmate" if in_check else "stalemate"
         if self.halfmove_clock >= 100:  # 50 moves = 100 half-moves
-            self.game_status = "draw 50-move"
-            return "terminal"
-        
+            return "draw 50-move"
         if self.is_insufficient_material():
-            self.game_status = "draw insufficient material"
-            return "terminal"
-        
-        fen = self.get_fen().split(" ")[0:4]
-        fen_key = " ".join(fen)
-        if self.repetition_count.get(fen_key, 0) >= 3:
-            self.game_status = "draw threefold repetition"
-            return "terminal"
-        
-        # Check if the current player is in check
-        if self.is_in_check(opponent_color):
-            self.game_status = "check"
-        else:
-            self.game_status = "active"
+            return "draw insufficient material"
+        if self.repetition_count.get(self.hash, 0) >= 3:
+            return "draw threefold repetition"
+        return "check" if in_check else "active"
     
+    def is_repetition(self):
+        """
+        Whether the current position already occurred earlier in the game or the search line.
+        Only positions since the last capture or pawn move (and with the same side to move) are compared.
+        """
+        history = self.hash_history
+        last = len(history) - 1
+        oldest = max(0, last - self.halfmove_clock)
+        for index in range(last - 4, oldest - 1, -2):
+            if history[index] == self.hash:
+                return True
+        return False
+
+    def recent_hashes(self):
+        """Hashes of the positions is_repetition can still match (since the last capture or pawn move), current one last."""
+        return self.hash_history[-(self.halfmove_clock + 1):]
+
     def is_insufficient_material(self):
         """Check for draw due to insufficient mating material"""
-        pieces = []
-        for rank in self.board.board_state:
-            for piece in rank:
-                if piece:
-                    pieces.append(piece)
+        counts = self.board.piece_counts
+        piece_count = len(self.board.pieces["white"]) + len(self.board.pieces["black"])
 
         # King vs King
-        if len(pieces) == 2:
+        if piece_count == 2:
             return True
 
         # King + bishop/knight vs King
-        if len(pieces) == 3:
-            types = [type(p) for p in pieces]
-            if all(t in [King, Bishop, Knight] for t in types):
+        if piece_count == 3:
+            if counts["B"] + counts["N"] + counts["b"] + counts["n"]:
                 return True
 
         # King + bishop vs King + bishop, both bishops on same color
-        if len(pieces) == 4:
-            bishops = [p for p in pieces if isinstance(p, Bishop)]
-            if len(bishops) == 2:
-                b1_color = (bishops[0].current_pos[0] + bishops[0].current_pos[1]) % 2
-                b2_color = (bishops[1].current_pos[0] + bishops[1].current_pos[1]) % 2
+        if piece_count == 4:
+            if counts["B"] + counts["b"] == 2:
+                bishops = self.board.bitboards["B"] | self.board.bitboards["b"]
+                b1_color = sum(square_position(lsb_square(bishops))) % 2
+                b2_color = sum(square_position(bishops.bit_length() - 1)) % 2
                 if b1_color == b2_color:
                     return True
         return False
 
+    @classmethod
+    def from_fen(cls, fen, history = None):
+        """
+        Create a game set up at the position described by a FEN string.
+        The halfmove clock and fullmove number may be left out (they default to 0 and 1).
+        history (recent_hashes() of the game the FEN was taken from) lets is_repetition see earlier positions.
+        Raises ValueError if the FEN is malformed.
+        """
+        fields = fen.split()
+        if len(fields) not in (4, 6):
+            raise ValueError(f"Expected 4 or 6 fields in FEN, got {len(fields)}: {fen!r}")
+        placement, turn, castling, en_passant = fields[:4]
+
+        board = Board.from_fen(placement)
+        if (board.piece_counts["K"] != 1) or (board.piece_counts["k"] != 1):
+            raise ValueError(f"FEN must have exactly one king per side: {fen!r}")
+        game = cls(board)
+
+        if turn not in ("w", "b"):
+            raise ValueError(f"Invalid side to move {turn!r} in FEN {fen!r}")
+        game.current_turn = "white" if turn == "w" else "black"
+
+        if (castling != "-") and ((not castling) or (set(castling) - set("KQkq")) or (len(set(castling)) != len(castling))):
+            raise ValueError(f"Invalid castling rights {castling!r} in FEN {fen!r}")
+        game.castling_rights = {
+            "white": {"kingside": "K" in castling, "queenside": "Q" in castling},
+            "black": {"kingside": "k" in castling, "queenside": "q" in castling}
+        }
+
+        if en_passant != "-":
+            if (len(en_passant) != 2) or (en_passant[0] not in "abcdefgh") or (en_passant[1] not in "36"):
+                raise ValueError(f"Invalid en passant square {en_passant!r} in FEN {fen!r}")
+            rank, file = int(en_passant[1]) - 1, ord(en_passant[0]) - 97
+            # The target is behind the pawn that just moved: rank 3 for white, rank 6 for black
+            game.en_passant_target = ("white" if rank == 2 else "black", rank, file)
+
+        if len(fields) == 6:
+            if not (fields[4].isdigit() and fields[5].isdigit()):
+                raise ValueError(f"Invalid move counters in FEN {fen!r}")
+            game.halfmove_clock = int(fields[4])
+            game.fullmove_number = int(fields[5])
+
+        # The board already holds the piece-square part of the hash, add the rest of the state
+        game.hash = board.hash ^ state_key(game.castling_rights, game.en_passant_target)
+        if game.current_turn == "black":
+            game.hash ^= SIDE_KEY
+        game.hash_history = list(history) if history else [game.hash]
+        game.repetition_count = {game.hash: 1}
+        if game.is_in_check(game.current_turn):
+            game.game_status = "check"
+        return game
+
     def get_fen(self):
         """
         Get the FEN (Forsyth-Edwards Notation) string for the current position.
         """
-        # Get the board position part
-        fen = self.board.convert_to_FEN().replace("\n", "/").rstrip("/")
+        # Get the board position part (convert_to_FEN lists rank 1 first, FEN starts from rank 8)
+        fen = "/".join(reversed(self.board.convert_to_FEN().split()))
         
         # Add current turn
         fen += " " + ("w" if self.current_turn == "white" else "b")
@@ -429,23 +682,23 @@ class Game:
         
         self.selected_piece = None
         self.possible_moves = []
+        del self.selected_moves[:]
 
         # Switch back to the previous player's turn
         self.current_turn = "white" if self.current_turn == "black" else "black"
 
         # Decrease count of repetition for threefold repetition rule
-        fen = self.get_fen().split(" ")[0:4]
-        fen_key = " ".join(fen)
-        if fen_key in self.repetition_count:
-            self.repetition_count[fen_key] = max(0, self.repetition_count[fen_key]) - 1
+        if self.hash in self.repetition_count:
+            self.repetition_count[self.hash] = max(0, self.repetition_count[self.hash] - 1)
+        self.hash_history.pop()
 
         # Get the last move
         last_move = self.move_history.pop()
+        self.hash = last_move["hash"]
         piece = last_move["piece"]
         from_pos = last_move["from"]
         to_pos = last_move["to"]
         captured = last_move["captured"]
-        promotion = last_move["promotion"]
         castling = last_move["castling"]
         rook = last_move["rook"]
         rook_from = last_move["rook_from"]
@@ -453,13 +706,10 @@ class Game:
         # Check if this was an en passant capture
         was_en_passant = isinstance(piece, Pawn) and captured and to_pos != captured.current_pos
 
-        if promotion:
-            piece = Pawn(piece.color, to_pos)
-    
         if castling:
             self.board.move_piece(rook, rook_from)
 
-        # Move the piece back
+        # Move the piece back (after a promotion this is the original pawn, replacing the promoted piece)
         self.board.move_piece(piece, from_pos)
     
         # Restore captured piece if any
@@ -468,27 +718,19 @@ class Game:
                 # For en passant, the captured pawn's position is different
                 # It's in the same file as the destination but same rank as the starting position
                 captured_pos = (from_pos[0], to_pos[1])
-                self.board.board_state[captured_pos[0]][captured_pos[1]] = captured
                 captured.current_pos = captured_pos
-                en_passant_color = "black" if self.current_turn == "white" else "white"
-                self.en_passant_target = (en_passant_color, to_pos[0], to_pos[1])
+                self.board.place_piece(captured)
             else:
                 # Normal capture
-                self.board.board_state[to_pos[0]][to_pos[1]] = captured
                 captured.current_pos = to_pos
+                self.board.place_piece(captured)
 
-        # Recover en passant target
-        if len(self.move_history) > 0 and isinstance(self.move_history[-1]["piece"], Pawn):
-            if abs(self.move_history[-1]["to"][0] - self.move_history[-1]["from"][0]) == 2:
-                self.en_passant_target = ("white" if self.current_turn == "black" else "black", int((self.move_history[-1]["from"][0] + self.move_history[-1]["to"][0]) // 2), self.move_history[-1]["from"][1])
+        # Recover en passant target and castling rights from before the move
+        self.en_passant_target = last_move["en_passant_target"]
+        self.castling_rights = last_move["castling_rights"]
 
         # Restore the halfmove clock from before this move was made
-        if len(self.move_history) > 0:
-            # Get the clock value from the previous move record
-            self.halfmove_clock = self.move_history[-1]["half-move clock"]
-        else:
-            # If this was the first move, reset to 0
-            self.halfmove_clock = 0
+        self.halfmove_clock = last_move["previous half-move clock"]
         
         # Update game status
         self.update_game_status()
@@ -496,6 +738,9 @@ class Game:
         # Decrement fullmove number if needed
         if self.current_turn == "black":
             self.fullmove_number -= 1
+
+        if self.debug_hash:
+            self.verify_hash()
         
         return True
     
@@ -509,22 +754,21 @@ class Game:
         
         self.selected_piece = None
         self.possible_moves = []
-
-        # Decrease count of repetition for threefold repetition rule
-        for i in range(1, 3):
-            fen = self.fen_history[-i].split(" ")[0:4]
-            fen_key = " ".join(fen)
-            if fen_key in self.repetition_count:
-                self.repetition_count[fen_key] = max(0, self.repetition_count[fen_key]) - 1
+        del self.selected_moves[:]
 
         # Get the last two moves
         for i in range(2):
+            # Decrease count of repetition for threefold repetition rule
+            if self.hash in self.repetition_count:
+                self.repetition_count[self.hash] = max(0, self.repetition_count[self.hash] - 1)
+            self.hash_history.pop()
+
             last_move = self.move_history.pop()
+            self.hash = last_move["hash"]
             piece = last_move["piece"]
             from_pos = last_move["from"]
             to_pos = last_move["to"]
             captured = last_move["captured"]
-            promotion = last_move["promotion"]
             castling = last_move["castling"]
             rook = last_move["rook"]
             rook_from = last_move["rook_from"]
@@ -532,13 +776,10 @@ class Game:
             # Check if this was an en passant capture
             was_en_passant = isinstance(piece, Pawn) and captured and to_pos != captured.current_pos
 
-            if promotion:
-                piece = Pawn(piece.color, to_pos)
-        
             if castling:
                 self.board.move_piece(rook, rook_from)
 
-            # Move the piece back
+            # Move the piece back (after a promotion this is the original pawn, replacing the promoted piece)
             self.board.move_piece(piece, from_pos)
 
             # Change turns
@@ -550,34 +791,27 @@ class Game:
                     # For en passant, the captured pawn's position is different
                     # It's in the same file as the destination but same rank as the starting position
                     captured_pos = (from_pos[0], to_pos[1])
-                    self.board.board_state[captured_pos[0]][captured_pos[1]] = captured
                     captured.current_pos = captured_pos
-                    en_passant_color = "black" if self.current_turn == "white" else "white"
-                    self.en_passant_target = (en_passant_color, to_pos[0], to_pos[1])
+                    self.board.place_piece(captured)
                 else:
                     # Normal capture
-                    self.board.board_state[to_pos[0]][to_pos[1]] = captured
                     captured.current_pos = to_pos
+                    self.board.place_piece(captured)
 
-            # Recover en passant target
-            if len(self.move_history) > 0 and isinstance(self.move_history[-1]["piece"], Pawn):
-                if abs(self.move_history[-1]["to"][0] - self.move_history[-1]["from"][0]) == 2:
-                    self.en_passant_target = ("white" if self.current_turn == "black" else "black", int((self.move_history[-1]["from"][0] + self.move_history[-1]["to"][0]) // 2), self.move_history[-1]["from"][1])
-            else:
-                self.en_passant_target = None
+            # Recover en passant target and castling rights from before the move
+            self.en_passant_target = last_move["en_passant_target"]
+            self.castling_rights = last_move["castling_rights"]
 
             # Restore the halfmove clock from before this move was made
-            if len(self.move_history) > 0:
-                # Get the clock value from the previous move record
-                self.halfmove_clock = self.move_history[-1]["half-move clock"]
-            else:
-                # If this was the first move, reset to 0
-                self.halfmove_clock = 0
+            self.halfmove_clock = last_move["previous half-move clock"]
         
         # Update game status
         self.update_game_status()
         
         # Decrement fullmove number
         self.fullmove_number -= 1
+
+        if self.debug_hash:
+            self.verify_hash()
         
         return True
\ No newline at end of file
@@ -0,0 +1,167 @@
+"""
+Lazy SMP: several worker processes search the same position at the same time
+and share one transposition table held in shared memory.
+
+There is no work splitting. Each worker runs the regular iterative deepening
+search, and what one worker stores in the table (scores, bounds, best moves)
+is picked up by the others. Helper workers skip some depths in a staggered
+pattern so they run ahead of the main worker and fill the table with deeper
+results. The move played is the main worker's. Entries are written without
+locks; the key/data XOR check in TranspositionTable throws away any entry torn
+by two simultaneous writes.
+
+The table is kept from one search to the next, also when the other side is to
+move: ChessAI stores its scores from the side to move's point of view.
+
+Shared memory layout: one control word (non-zero tells the helpers to stop)
+followed by the table entries.
+"""
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from game import Game
+from chess_ai import ChessAI, MAX_DEPTH
+from moves import move_to_uci
+from transposition_table import TranspositionTable, table_bytes
+
+CONTROL_BYTES = 8
+
+# Depth skipping pattern for helper workers (as used by Stockfish's lazy SMP): helper i
+# leaves out depth d when ((d + SKIP_PHASE[i]) // SKIP_SIZE[i]) is odd
+SKIP_SIZE = [1, 1, 2, 2, 2, 2, 3, 3, 3, 3, 3, 3, 4, 4, 4, 4, 4, 4, 4, 4]
+SKIP_PHASE = [0, 1, 0, 1, 2, 3, 0, 1, 2, 3, 4, 5, 0, 1, 2, 3, 4, 5, 6, 7]
+
+# Shared memory blocks opened by this worker process, by name
+_attached = {}
+
+
+def _attach(name):
+    if name not in _attached:
+        _attached[name] = shared_memory.SharedMemory(name = name)
+    return _attached[name]
+
+
+def helper_skips_depth(helper_index, depth):
+    """Whether a helper worker (numbered from 0) leaves out the given depth."""
+    index = helper_index % len(SKIP_SIZE)
+    return ((depth + SKIP_PHASE[index]) // SKIP_SIZE[index]) % 2 == 1
+
+
+def search_worker(fen, memory_name, hash_size_mb, age, worker_index, time_limit, max_depth, quiescence_node_limit,
+                  history = None):
+    """
+    Worker task: search the position with the shared table.
+    Worker 0 is the main worker; the others are helpers. Every worker stops as soon as the control word is set.
+    history holds the hashes of the positions before this one (Game.recent_hashes), for repetition detection.
+    Returns (best move, score, search_info).
+    """
+    memory = _attach(memory_name)
+    control = memory.buf[:CONTROL_BYTES].cast("Q")
+    table = TranspositionTable(hash_size_mb, memory.buf[CONTROL_BYTES:])
+    table.age = (age - 1) & 63 # search() moves it on to this search's age, the same in every worker
+
+    game = Game.from_fen(fen, history)
+    ai = ChessAI(game, game.current_turn, time_limit = time_limit, max_depth = max_depth,
+                 quiescence_node_limit = quiescence_node_limit, transposition_table = table)
+    ai.stop_signal = control
+    skip_depth = None
+    if worker_index > 0:
+        skip_depth = lambda depth: helper_skips_depth(worker_index - 1, depth)
+    move, value = ai.search(skip_depth = skip_depth)
+    ai.search_info["nodes"] = ai.nodes # Helpers may stop mid-iteration, count all their work
+    return move, value, ai.search_info
+
+
+class LazySMPSearch:
+    def __init__(self, workers = 2, hash_size_mb = 16, quiescence_node_limit = 2000):
+        self.workers = workers
+        self.hash_size_mb = hash_size_mb
+        self.quiescence_node_limit = quiescence_node_limit
+        self.memory = shared_memory.SharedMemory(create = True, size = CONTROL_BYTES + table_bytes(hash_size_mb))
+        self.control = self.memory.buf[:CONTROL_BYTES].cast("Q")
+        self.executor = ProcessPoolExecutor(max_workers = workers)
+        self.age = 0
+        self.search_info = {"depth": 0, "nodes": 0, "time": 0.0, "nps": 0, "score": 0, "move": None, "workers": workers}
+
+    def close(self):
+        """Stop the workers and free the shared table (safe to call more than once)."""
+        if self.executor is None:
+            return
+        self.executor.shutdown()
+        self.executor = None
+        self.control.release()
+        self.memory.close()
+        self.memory.unlink()
+
+    def clear(self):
+        """Empty the shared table (e.g. for a new game)."""
+        self.memory.buf[CONTROL_BYTES:] = bytes(len(self.memory.buf) - CONTROL_BYTES)
+
+    def stop(self):
+        """Stop a running search early (e.g. from another thread); the main worker keeps its last finished iteration."""
+        self.control[0] = 1
+
+    def search(self, game, time_limit = 1.0, max_depth = MAX_DEPTH):
+        """
+        Search the position of game with every worker until the main worker finishes
+        (time limit or max depth reached), then stop the helpers.
+        Returns (best move, score) for the side to move.
+        """
+        fen = game.get_fen()
+        history = game.recent_hashes()
+        self.age = (self.age + 1) & 63
+        self.control[0] = 0
+        start_time = time.perf_counter()
+        futures = [self.executor.submit(search_worker, fen, self.memory.name, self.hash_size_mb, self.age, index,
+                                        time_limit, max_depth, self.quiescence_node_limit, history)
+                   for index in range(self.workers)]
+        move, value, main_info = futures[0].result()
+        elapsed = time.perf_counter() - start_time
+        self.control[0] = 1
+        nodes = main_info["nodes"] + sum(future.result()[2]["nodes"] for future in futures[1:])
+        self.control[0] = 0
+        self.search_info = {
+            "depth": main_info["depth"],
+            "nodes": nodes,
+            "time": elapsed,
+            "nps": int(nodes / elapsed) if elapsed > 0 else 0,
+            "score": value,
+            "move": move,
+            "workers": self.workers
+        }
+        return move, value
+
+
+def lazy_smp_benchmark(positions, depth, worker_counts = (1, 2, 4, 8), hash_size_mb = 16):
+    """Time to reach a fixed depth and nodes per second on each position, for each worker count."""
+    results = []
+    for workers in worker_counts:
+        search = LazySMPSearch(workers, hash_size_mb)
+        search.search(Game(), time_limit = 0, max_depth = 1) # Start the worker processes before timing
+        for fen in positions:
+            search.clear()
+            move, value = search.search(Game.from_fen(fen), time_limit = 0, max_depth = depth)
+            results.append({"workers": workers, "fen": fen, "move": move_to_uci(move), "score": value,
+                            "time": search.search_info["time"], "nodes": search.search_info["nodes"],
+                            "nps": search.search_info["nps"]})
+        search.close()
+    return results
+
+if __name__ == "__main__":
+    depth = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    positions = [
+        "r1bqkb1r/pppp1ppp/2n2n2/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R w KQkq - 4 4",
+        "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+        "rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8",
+        "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10"
+    ]
+    print(f"Time to depth {depth} on {os.cpu_count()} CPUs")
+    totals = {}
+    for result in lazy_smp_benchmark(positions, depth):
+        totals[result["workers"]] = totals.get(result["workers"], 0) + result["time"]
+        print(f"Workers: {result['workers']}, Best: {result['move']}, Score: {result['score']}, "
+              f"Time: {result['time']:.4f} seconds, Nodes: {result['nodes']}, NPS: {result['nps']}")
+    for workers, total in totals.items():
+        print(f"Workers: {workers}, Total time: {total:.4f} seconds, Speedup: {totals[1] / total:.2f}x")
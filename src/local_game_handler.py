@@ -1,4 +1,6 @@
 import pygame
+from bitboard import SQUARE_POSITIONS
+from moves import move_to
 
 class LocalGameHandler:
     def __init__(self, game, gui):
@@ -32,8 +34,8 @@ class LocalGameHandler:
 
     def highlight_possible_moves(self):
         """Highlights the selected piece's possible moves"""
-        for move in self.game.possible_moves:
-                rank, file = move
+        for move in self.game.selected_moves:
+                rank, file = SQUARE_POSITIONS[move_to(move)]
                 rank = abs(7 - rank)
                 pygame.draw.circle(self.gui.screen, (145, 145, 145), 
                                 (((self.gui.square_size * file) + (self.gui.square_size * 0.5)), 
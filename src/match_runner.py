@@ -0,0 +1,212 @@
+"""
+Headless engine-vs-engine matches between two ChessAI configurations.
+
+Games start from the positions of an opening book (FEN/EPD, see
+static/positions/openings.epd). Every opening is played twice with the colors
+swapped, so neither engine profits from a lopsided opening. Games run in
+parallel worker processes and use Game for all rules (checkmate, stalemate,
+50-move rule, insufficient material, threefold repetition); games that reach
+max_plies are scored as draws.
+
+The report gives the result from engine A's point of view with the Elo
+difference and its 95% error margin, plus the average depth, nodes per second
+and time per move of each engine.
+
+Usage: python match_runner.py --a "time_limit=0.1" --b "time_limit=0.1,quiescence_node_limit=0" --games 32
+"""
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from game import Game, TERMINAL_STATUSES
+from chess_ai import ChessAI
+from batch_analysis import read_positions
+
+OPENING_BOOK = os.path.abspath(os.path.join(os.path.dirname(__file__), "../static/positions/openings.epd"))
+
+# ChessAI settings an engine configuration can change, with the defaults used for matches
+ENGINE_DEFAULTS = {
+    "time_limit": 0.1,
+    "node_limit": None,
+    "max_depth": 64,
+    "hash_size_mb": 4,
+    "quiescence_node_limit": 2000,
+    "move_ordering": True
+}
+
+MAX_PLIES = 300
+
+
+def parse_engine(text):
+    """Read an engine configuration written as "name=value,name=value" into a dictionary of ChessAI settings."""
+    config = dict(ENGINE_DEFAULTS)
+    for item in filter(None, text.split(",")):
+        name, _, value = item.partition("=")
+        name = name.strip()
+        if name not in ENGINE_DEFAULTS:
+            raise ValueError(f"Unknown engine setting {name!r}")
+        value = value.strip()
+        if value.lower() in ("true", "false"):
+            config[name] = value.lower() == "true"
+        elif value.lower() == "none":
+            config[name] = None
+        else:
+            config[name] = float(value) if "." in value else int(value)
+    return config
+
+
+def load_book(path = OPENING_BOOK):
+    """Opening positions of a FEN/EPD file as a list of (fen, name)."""
+    with open(path) as file:
+        return [(fen, operations.get("id", fen)) for index, fen, operations in read_positions(file)]
+
+
+def game_over(game):
+    """How the game ended at the current position (a Game status name), None if it goes on."""
+    status = game.position_status()
+    return status if status in TERMINAL_STATUSES else None
+
+
+def play_game(fen, engine_a, engine_b, a_is_white, max_plies = MAX_PLIES):
+    """
+    Worker task: play one game from fen between two engine configurations.
+    Returns the score of engine A (1, 0.5 or 0), how the game ended, its length
+    and the search totals of each engine ({"a": {...}, "b": {...}}).
+    """
+    game = Game.from_fen(fen)
+    white, black = ("a", "b") if a_is_white else ("b", "a")
+    configs = {"a": engine_a, "b": engine_b}
+    players = {
+        "white": (white, ChessAI(game, "white", **configs[white])),
+        "black": (black, ChessAI(game, "black", **configs[black]))
+    }
+    stats = {name: {"moves": 0, "depth": 0, "nodes": 0, "time": 0.0} for name in ("a", "b")}
+
+    try:
+        plies = 0
+        reason = game_over(game)
+        while (reason is None) and (plies < max_plies):
+            name, ai = players[game.current_turn]
+            start_time = time.perf_counter()
+            move, value = ai.search()
+            elapsed_time = time.perf_counter() - start_time
+            if not game.play_move(move):
+                raise ValueError(f"Engine {name.upper()} played an illegal move in {game.get_fen()}")
+            plies += 1
+            stats[name]["moves"] += 1
+            stats[name]["depth"] += ai.search_info["depth"]
+            stats[name]["nodes"] += ai.nodes
+            stats[name]["time"] += elapsed_time
+            reason = game_over(game)
+    finally:
+        for name, ai in players.values():
+            ai.close()
+
+    reason = reason or "max plies"
+    score_a = 0.5
+    if reason == "checkmate":
+        # The side to move is the one that was mated
+        winner = players["black" if game.current_turn == "white" else "white"][0]
+        score_a = 1 if winner == "a" else 0
+    return {"score": score_a, "reason": reason, "plies": plies, "a_is_white": a_is_white, "stats": stats}
+
+
+def run_match(engine_a, engine_b, book, games = None, workers = 1, max_plies = MAX_PLIES):
+    """
+    Play games between two engine configurations, cycling through the book with
+    colors swapped on every second game (default: each opening with both colors).
+    Returns the game results in order.
+    """
+    games = games or (2 * len(book))
+    tasks = []
+    for index in range(games):
+        fen, name = book[(index // 2) % len(book)]
+        tasks.append((fen, engine_a, engine_b, index % 2 == 0, max_plies))
+
+    if workers <= 1:
+        results = [play_game(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers = workers) as executor:
+            results = list(executor.map(play_game, *zip(*tasks)))
+    for index, result in enumerate(results):
+        result["opening"] = book[(index // 2) % len(book)][1]
+    return results
+
+
+def elo_difference(wins, draws, losses):
+    """
+    Elo difference implied by a match score and its 95% error margin.
+    Returns (elo, margin); an all-win or all-loss score gives an infinite difference.
+    """
+    games = wins + draws + losses
+    if games == 0:
+        return 0.0, math.inf
+    score = (wins + (draws / 2)) / games
+
+    def elo(fraction):
+        if fraction <= 0:
+            return -math.inf
+        if fraction >= 1:
+            return math.inf
+        return 400 * math.log10(fraction / (1 - fraction))
+
+    # Standard error of the mean score over games scored 1, 1/2 and 0
+    variance = ((wins * (1 - score) ** 2) + (draws * (0.5 - score) ** 2) + (losses * score ** 2)) / games
+    deviation = 1.96 * math.sqrt(variance / games)
+    return elo(score), (elo(score + deviation) - elo(score - deviation)) / 2
+
+
+def summarize(results):
+    """Match totals from engine A's point of view, with the average search statistics of both engines."""
+    wins = sum(1 for result in results if result["score"] == 1)
+    losses = sum(1 for result in results if result["score"] == 0)
+    draws = len(results) - wins - losses
+    elo, margin = elo_difference(wins, draws, losses)
+    summary = {"games": len(results), "wins": wins, "draws": draws, "losses": losses,
+               "score": (wins + (draws / 2)) / len(results) if results else 0, "elo": elo, "margin": margin}
+    for name in ("a", "b"):
+        moves = sum(result["stats"][name]["moves"] for result in results)
+        nodes = sum(result["stats"][name]["nodes"] for result in results)
+        elapsed_time = sum(result["stats"][name]["time"] for result in results)
+        summary[name] = {
+            "moves": moves,
+            "average_depth": (sum(result["stats"][name]["depth"] for result in results) / moves) if moves else 0,
+            "nps": int(nodes / elapsed_time) if elapsed_time > 0 else 0,
+            "time_per_move": (elapsed_time / moves) if moves else 0
+        }
+    return summary
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Play two ChessAI configurations against each other")
+    parser.add_argument("--a", default = "", help = "engine A settings, e.g. \"time_limit=0.2,max_depth=4\"")
+    parser.add_argument("--b", default = "", help = "engine B settings (same form)")
+    parser.add_argument("--book", default = OPENING_BOOK, help = "FEN/EPD file with the opening positions")
+    parser.add_argument("--games", type = int, default = None, help = "number of games (default: every opening with both colors)")
+    parser.add_argument("--workers", type = int, default = os.cpu_count() or 1)
+    parser.add_argument("--max-plies", type = int, default = MAX_PLIES, help = "adjudicate a draw after this many plies")
+    parser.add_argument("--output", help = "write every game and the summary as JSON to this file")
+    args = parser.parse_args()
+
+    engine_a, engine_b = parse_engine(args.a), parse_engine(args.b)
+    start_time = time.perf_counter()
+    results = run_match(engine_a, engine_b, load_book(args.book), args.games, args.workers, args.max_plies)
+    elapsed_time = time.perf_counter() - start_time
+    for index, result in enumerate(results):
+        colors = "A white" if result["a_is_white"] else "A black"
+        print(f"Game {index + 1}: {result['opening']} ({colors}) A scored {result['score']}, {result['reason']} after {result['plies']} plies")
+
+    summary = summarize(results)
+    print(f"A vs B: +{summary['wins']} ={summary['draws']} -{summary['losses']} ({100 * summary['score']:.1f}%), "
+          f"Elo difference: {summary['elo']:.1f} +/- {summary['margin']:.1f}")
+    for name in ("a", "b"):
+        engine = summary[name]
+        print(f"Engine {name.upper()}: Average depth: {engine['average_depth']:.2f}, NPS: {engine['nps']}, "
+              f"Time per move: {engine['time_per_move']:.4f} seconds")
+    print(f"{summary['games']} games in {elapsed_time:.2f} seconds")
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump({"engines": {"a": engine_a, "b": engine_b}, "summary": summary, "games": results}, file, indent = 2)
@@ -0,0 +1,115 @@
+"""
+Memory use of the game model: bytes per Game and per piece, how many piece
+objects the move paths create, and what integer colors would save over the
+"white"/"black" strings the game uses.
+
+Usage: python memory_benchmark.py [games]
+"""
+import sys
+import timeit
+import tracemalloc
+import pieces
+from game import Game
+from moves import encode_move, PROMOTION, PROMOTION_PIECES
+
+PROMOTION_FEN = "4k3/P7/8/8/8/8/8/4K3 w - - 0 1"
+CASTLING_FEN = "r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1"
+
+
+def memory_per_game(count = 100):
+    """Average bytes allocated for a new Game (start position)."""
+    tracemalloc.start()
+    start_size = tracemalloc.get_traced_memory()[0]
+    games = [Game() for index in range(count)]
+    size = tracemalloc.get_traced_memory()[0] - start_size
+    tracemalloc.stop()
+    return size / len(games)
+
+
+def piece_size():
+    """Bytes of one piece object, including its attribute dictionary if it has one."""
+    piece = pieces.Pawn("white", (1, 0))
+    size = sys.getsizeof(piece)
+    if hasattr(piece, "__dict__"):
+        size += sys.getsizeof(piece.__dict__)
+    return size
+
+
+def color_costs(repeats = 1000000):
+    """
+    Bytes per piece and seconds per million color comparisons and color-keyed lookups, with the
+    string colors in use and with integer colors. A color is a reference either way, so the piece
+    size is the same; only the comparisons and lookups differ.
+    """
+    costs = {}
+    for name, white, black, table in (("string", "white", "black", {"white": 0, "black": 1}), ("integer", 0, 1, [0, 1])):
+        piece = pieces.Pawn("white", (1, 0))
+        piece.color = white
+        names = {"piece": piece, "other": black, "table": table}
+        costs[name] = {
+            "piece_bytes": sys.getsizeof(piece),
+            "compare": timeit.timeit("piece.color != other", globals = names, number = repeats) * 1000000 / repeats,
+            "lookup": timeit.timeit("table[piece.color]", globals = names, number = repeats) * 1000000 / repeats
+        }
+    return costs
+
+
+def count_pieces_created(function):
+    """Run function and return how many piece objects it created."""
+    count = 0
+    original_init = pieces.Piece.__init__
+
+    def counting_init(piece, color, pos):
+        nonlocal count
+        count += 1
+        original_init(piece, color, pos)
+
+    pieces.Piece.__init__ = counting_init
+    try:
+        function()
+    finally:
+        pieces.Piece.__init__ = original_init
+    return count
+
+
+def piece_allocations(repeats = 100):
+    """Pieces created by repeated move/undo cycles through the game and search paths."""
+    promotion = encode_move(48, 56, PROMOTION | PROMOTION_PIECES.index("Q"))
+
+    def promote_and_undo():
+        game = Game.from_fen(PROMOTION_FEN)
+        for index in range(repeats):
+            game.play_move(promotion)
+            game.undo_move()
+
+    def push_pop_promotions():
+        game = Game.from_fen(PROMOTION_FEN)
+        for index in range(repeats):
+            game.push(promotion)
+            game.pop()
+
+    def castle_and_undo():
+        game = Game.from_fen(CASTLING_FEN)
+        for index in range(repeats):
+            game.play_uci_moves("e1g1 e8c8")
+            game.undo_move()
+            game.undo_move()
+
+    setup = count_pieces_created(lambda: Game.from_fen(PROMOTION_FEN)) # Pieces placed by the setup itself
+    castling_setup = count_pieces_created(lambda: Game.from_fen(CASTLING_FEN))
+    return {
+        "promotion and undo": count_pieces_created(promote_and_undo) - setup,
+        "push/pop promotion": count_pieces_created(push_pop_promotions) - setup,
+        "castling and undo": count_pieces_created(castle_and_undo) - castling_setup
+    }
+
+if __name__ == "__main__":
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    print(f"Memory per Game: {memory_per_game(games):.0f} bytes")
+    print(f"Memory per piece: {piece_size()} bytes")
+    repeats = 100
+    for name, count in piece_allocations(repeats).items():
+        print(f"Pieces created by {repeats} x {name}: {count}")
+    for name, cost in color_costs().items():
+        print(f"{name.capitalize()} colors: {cost['piece_bytes']} bytes per piece, "
+              f"{cost['compare']:.3f} seconds per million comparisons, {cost['lookup']:.3f} seconds per million lookups")
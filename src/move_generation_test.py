@@ -1,6 +1,14 @@
-
+import argparse
+import json
+import os
+import sys
 import time
 from game import Game
+from moves import move_to_uci
+
+POSITIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "static", "positions")
+PERFT_SUITE = os.path.join(POSITIONS_DIR, "perft.epd")
+PERFT_BASELINE = os.path.join(POSITIONS_DIR, "perft_baseline.json")
 
 def move_generation_test(depth):
     """Optimized move generation test function"""
@@ -19,23 +27,16 @@ def perft(game, depth):
         return 1
     
     num_positions = 0
-    # Get all legal moves at once instead of piece by piece
-    all_piece_moves = game.get_all_legal_moves()
-    
-    # Track move history start index to optimize undo operations
-    history_start_index = len(game.move_history)
-    
-    for piece, moves in all_piece_moves:
-        for move in moves:
-            # Make move and recursive call
-            game.select_piece(piece.current_pos)
-            game.make_move(move)
-            
-            # Recursively count positions from this new position
-            num_positions += perft(game, depth - 1)
-            
-            # Undo move
-            game.undo_move()
+    # Get all legal moves at once as a flat list of encoded moves
+    for move in game.generate_moves():
+        # Make move and recursive call
+        game.push(move)
+        
+        # Recursively count positions from this new position
+        num_positions += perft(game, depth - 1)
+        
+        # Undo move
+        game.pop()
     
     return num_positions
 
@@ -50,37 +51,133 @@ def bulk_counting_perft(game, depth):
     
     if depth == 1:
         # Just count all legal moves without recursion
-        move_count = 0
-        all_piece_moves = game.get_all_legal_moves()
-        for piece, moves in all_piece_moves:
-            move_count += len(moves)
-        return move_count
+        return len(game.generate_moves())
     
     num_positions = 0
-    all_piece_moves = game.get_all_legal_moves()
-    
-    for piece, moves in all_piece_moves:
-        for move in moves:
-            game.select_piece(piece.current_pos)
-            game.make_move(move)
-            num_positions += bulk_counting_perft(game, depth - 1)
-            game.undo_move()
+    for move in game.generate_moves():
+        game.push(move)
+        num_positions += bulk_counting_perft(game, depth - 1)
+        game.pop()
     
     return num_positions
 
+def divide(game, depth):
+    """
+    Perft split by root move: {move in coordinate notation: positions below it}.
+    Comparing this against another engine shows which move a counting error is under.
+    """
+    counts = {}
+    for move in game.generate_moves():
+        game.push(move)
+        counts[move_to_uci(move)] = bulk_counting_perft(game, depth - 1)
+        game.pop()
+    return counts
+
+def load_epd(path):
+    """
+    Read perft positions from an EPD file, one per line: "<fen> ;D1 20 ;D2 400 ...".
+    Returns [(fen, {depth: expected positions})].
+    """
+    positions = []
+    with open(path) as file:
+        for line in file:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            fields = line.split(";")
+            expected = {}
+            for field in fields[1:]:
+                name, count = field.split()
+                expected[int(name[1:])] = int(count)
+            positions.append((fields[0].strip(), expected))
+    return positions
+
+def run_suite(path = PERFT_SUITE, max_nodes = 100000, max_depth = None):
+    """
+    Run perft on every position of an EPD file, at every listed depth whose expected
+    count is at most max_nodes. Returns one result dictionary per position and depth.
+    """
+    results = []
+    for fen, expected in load_epd(path):
+        for depth, expected_positions in sorted(expected.items()):
+            if (expected_positions > max_nodes) or (max_depth and depth > max_depth):
+                continue
+            game = Game.from_fen(fen)
+            start_time = time.perf_counter()
+            positions = bulk_counting_perft(game, depth)
+            elapsed_time = time.perf_counter() - start_time
+            results.append({
+                "fen": fen,
+                "depth": depth,
+                "positions": positions,
+                "expected": expected_positions,
+                "passed": positions == expected_positions,
+                "time": elapsed_time,
+                "nps": int(positions / elapsed_time) if elapsed_time > 0 else 0
+            })
+    return results
+
+def summarize(results):
+    """Totals over a suite run: positions, time and overall nodes per second."""
+    positions = sum(result["positions"] for result in results)
+    elapsed_time = sum(result["time"] for result in results)
+    return {
+        "positions": positions,
+        "time": elapsed_time,
+        "nps": int(positions / elapsed_time) if elapsed_time > 0 else 0,
+        "failed": sum(1 for result in results if not result["passed"])
+    }
+
+def check_baseline(summary, path = PERFT_BASELINE):
+    """
+    Compare throughput against the stored baseline.
+    Returns (passed, minimum nodes per second allowed).
+    """
+    with open(path) as file:
+        baseline = json.load(file)
+    minimum = int(baseline["nps"] * (1 - baseline["tolerance"]))
+    return summary["nps"] >= minimum, minimum
+
 if __name__ == "__main__":
-    # Test both implementations
-    print("Testing optimized move generation:")
-    for depth in range(0, 7):
-        start_time = time.time()
-        positions = move_generation_test(depth)
-        elapsed_time = time.time() - start_time
-        print(f"Depth: {depth}, Positions: {positions}, Time: {elapsed_time:.4f} seconds")
-    
-    print("\nTesting bulk counting optimization:")
-    for depth in range(0, 7):
-        game = Game()
-        start_time = time.time()
-        positions = bulk_counting_perft(game, depth)
-        elapsed_time = time.time() - start_time
-        print(f"Depth: {depth}, Positions: {positions}, Time: {elapsed_time:.4f} seconds")
\ No newline at end of file
+    parser = argparse.ArgumentParser(description = "Perft correctness and speed suite")
+    parser.add_argument("--epd", default = PERFT_SUITE, help = "EPD file with perft positions")
+    parser.add_argument("--max-nodes", type = int, default = 100000, help = "skip depths with more positions than this")
+    parser.add_argument("--max-depth", type = int, default = None)
+    parser.add_argument("--divide", metavar = "FEN", help = "print the perft count under each root move of FEN")
+    parser.add_argument("--depth", type = int, default = 3, help = "depth for --divide")
+    parser.add_argument("--output", help = "write the results as JSON to this file")
+    parser.add_argument("--baseline", default = PERFT_BASELINE, help = "JSON file with the nodes per second to stay above")
+    parser.add_argument("--update-baseline", action = "store_true", help = "store this run's speed as the new baseline")
+    args = parser.parse_args()
+
+    if args.divide:
+        counts = divide(Game.from_fen(args.divide), args.depth)
+        for move, count in sorted(counts.items()):
+            print(f"{move}: {count}")
+        print(f"Total: {sum(counts.values())}")
+        sys.exit(0)
+
+    results = run_suite(args.epd, args.max_nodes, args.max_depth)
+    for result in results:
+        status = "ok" if result["passed"] else f"FAILED (expected {result['expected']})"
+        print(f"Depth: {result['depth']}, Positions: {result['positions']}, Time: {result['time']:.4f} seconds, "
+              f"NPS: {result['nps']}, {status}  {result['fen']}")
+    summary = summarize(results)
+    print(f"Total: {summary['positions']} positions in {summary['time']:.4f} seconds, {summary['nps']} nodes per second, "
+          f"{summary['failed']} failed")
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump({"summary": summary, "results": results}, file, indent = 2)
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as file:
+            json.dump({"nps": summary["nps"], "tolerance": 0.3}, file, indent = 2)
+            file.write("\n")
+        print(f"Baseline set to {summary['nps']} nodes per second")
+        sys.exit(1 if summary["failed"] else 0)
+
+    passed, minimum = check_baseline(summary, args.baseline)
+    if not passed:
+        print(f"Throughput below the baseline: {summary['nps']} < {minimum} nodes per second")
+    sys.exit(0 if (passed and not summary["failed"]) else 1)
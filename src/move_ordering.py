@@ -0,0 +1,81 @@
+"""
+Move ordering for the alpha-beta search.
+
+Moves are searched in this order:
+    1. the hash move (best move stored in the transposition table)
+    2. captures and promotions, most valuable victim first and least valuable attacker second (MVV-LVA)
+    3. killer moves: quiet moves that caused a cutoff at the same ply elsewhere in the tree
+    4. the remaining quiet moves, ranked by the history table
+The sooner a good move is searched, the more of the rest alpha-beta can prune.
+"""
+from pieces import PIECE_CLASSES
+from moves import PROMOTION_PIECES
+
+HASH_MOVE_SCORE = 1 << 30
+CAPTURE_SCORE = 1 << 26
+KILLER_SCORE = 1 << 24
+HISTORY_LIMIT = (1 << 24) - 2 # History scores stay below the killer moves
+MAX_PLY = 128
+VICTIM_WEIGHT = 4096 # Larger than any attacker value, so the victim always decides first
+
+
+class MoveOrderer:
+    def __init__(self, piece_values):
+        """piece_values maps piece class names to their value, as in ChessAI.piece_values."""
+        self.values = {symbol: piece_values[cls.__name__] for symbol, cls in PIECE_CLASSES.items()}
+        self.killers = [[0, 0] for ply in range(MAX_PLY)]
+        # history[color][from * 64 + to]: how often the quiet move caused a cutoff, weighted by depth
+        self.history = {"white": [0] * 4096, "black": [0] * 4096}
+
+    def new_search(self):
+        """Forget killer moves and fade the history so older searches count for less."""
+        for killers in self.killers:
+            killers[0] = killers[1] = 0
+        for table in self.history.values():
+            for index in range(4096):
+                table[index] >>= 1
+
+    def order_moves(self, game, moves, hash_move = 0, ply = 0):
+        """Return the moves as a list sorted best first."""
+        board_state = game.board.board_state
+        values = self.values
+        history = self.history[game.current_turn]
+        killer_1, killer_2 = self.killers[ply] if ply < MAX_PLY else (0, 0)
+        scores = {}
+        for move in moves:
+            if move == hash_move:
+                score = HASH_MOVE_SCORE
+            elif move & 0xC000: # Captures and promotions
+                start = move & 63
+                target = (move >> 6) & 63
+                score = CAPTURE_SCORE
+                if move & 0x4000:
+                    victim = board_state[target >> 3][target & 7]
+                    # The en passant victim is not on the target square, it is always a pawn
+                    score += (values[victim.FEN.upper()] if victim else values["P"]) * VICTIM_WEIGHT
+                if move & 0x8000:
+                    score += values[PROMOTION_PIECES[(move >> 12) & 3]] * VICTIM_WEIGHT
+                score -= values[board_state[start >> 3][start & 7].FEN.upper()]
+            elif move == killer_1:
+                score = KILLER_SCORE + 1
+            elif move == killer_2:
+                score = KILLER_SCORE
+            else:
+                score = history[move & 0xFFF]
+            scores[move] = score
+        return sorted(moves, key = scores.__getitem__, reverse = True)
+
+    def record_cutoff(self, move, color, depth, ply):
+        """Remember a quiet move that caused a beta cutoff as a killer and in the history table."""
+        if move & 0xC000: # Captures and promotions are already ordered by MVV-LVA
+            return
+        if ply < MAX_PLY:
+            killers = self.killers[ply]
+            if killers[0] != move:
+                killers[1] = killers[0]
+                killers[0] = move
+        table = self.history[color]
+        table[move & 0xFFF] += depth * depth
+        if table[move & 0xFFF] > HISTORY_LIMIT:
+            for index in range(4096):
+                table[index] >>= 1
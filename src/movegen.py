@@ -0,0 +1,187 @@
+"""
+Legal move generation on top of Board's bitboards.
+
+Checkers, pinned pieces and the squares that resolve a check are worked out
+once per position, so every move produced here is legal without playing it
+on the board and testing for check afterwards. Moves come out in the packed
+integer format described in moves.py. Only king moves and en passant
+need an extra attack test, done against an adjusted occupancy instead of a
+real make/unmake.
+"""
+from attacks import *
+from bitboard import FULL_BOARD, lsb_square, iter_squares
+from moves import *
+
+# Piece symbols per side: pawn, knight, bishop, rook, queen, king
+SIDE_SYMBOLS = {"white": ("P", "N", "B", "R", "Q", "K"), "black": ("p", "n", "b", "r", "q", "k")}
+
+
+def generate_legal_moves(board, color, castling_rights, en_passant_target, from_squares = FULL_BOARD, moves = None,
+                         captures_only = False):
+    """
+    Append every legal move for the given color to moves (a list or array('H')) as encoded integers.
+    from_squares restricts generation to pieces standing on those squares.
+    captures_only produces only captures and promotions (for quiescence search), without
+    ever generating the quiet moves.
+    Returns the move container.
+    """
+    if moves is None:
+        moves = []
+    append = moves.append
+    bitboards = board.bitboards
+    opponent = "black" if color == "white" else "white"
+    pawn, knight, bishop, rook, queen, king = SIDE_SYMBOLS[color]
+    enemy_pawn, enemy_knight, enemy_bishop, enemy_rook, enemy_queen, enemy_king = SIDE_SYMBOLS[opponent]
+
+    own = board.occupancy[color]
+    enemy = board.occupancy[opponent]
+    occupied = board.occupied
+    enemy_diagonal = bitboards[enemy_bishop] | bitboards[enemy_queen]
+    enemy_straight = bitboards[enemy_rook] | bitboards[enemy_queen]
+    target_mask = enemy if captures_only else FULL_BOARD
+
+    king_bitboard = bitboards[king]
+    if king_bitboard:
+        king_square = lsb_square(king_bitboard)
+        checkers = board.attackers(king_square, opponent)
+
+        # King moves: test the target with the king lifted off the board so it cannot hide behind itself
+        if king_bitboard & from_squares:
+            occupied_without_king = occupied ^ king_bitboard
+            for target in iter_squares(KING_ATTACKS[king_square] & ~own & target_mask):
+                if not board.is_square_attacked(target, opponent, occupied_without_king):
+                    if (enemy >> target) & 1:
+                        append(king_square | (target << 6) | (CAPTURE << 12))
+                    else:
+                        append(king_square | (target << 6))
+
+        # In double check only the king can move
+        if checkers & (checkers - 1):
+            return moves
+
+        # Squares a non-king move has to land on: anywhere, or capturing/blocking the single checker
+        if checkers:
+            check_mask = checkers | BETWEEN[king_square][lsb_square(checkers)]
+        else:
+            check_mask = FULL_BOARD
+            if (king_bitboard & from_squares) and not captures_only:
+                _add_castling_moves(board, color, opponent, castling_rights, king_square, append)
+
+        # Pins: cast rays from the king through our own pieces to the first enemy slider
+        pin_rays = {}
+        candidates = (rook_attacks(king_square, enemy) & enemy_straight) | (bishop_attacks(king_square, enemy) & enemy_diagonal)
+        for pinner in iter_squares(candidates):
+            blockers = BETWEEN[king_square][pinner] & occupied
+            if blockers and not (blockers & (blockers - 1)) and (blockers & own):
+                pin_rays[lsb_square(blockers)] = BETWEEN[king_square][pinner] | (1 << pinner)
+    else:
+        # Positions without a king (e.g. set up by hand) have no checks or pins
+        king_square = None
+        checkers = 0
+        check_mask = FULL_BOARD
+        pin_rays = {}
+
+    allowed_targets = ~own & check_mask & target_mask
+
+    # Knights, bishops, rooks and queens
+    for square in iter_squares(bitboards[knight] & from_squares):
+        if square not in pin_rays:  # A pinned knight can never move
+            targets = KNIGHT_ATTACKS[square] & allowed_targets
+            for target in iter_squares(targets & enemy):
+                append(square | (target << 6) | (CAPTURE << 12))
+            for target in iter_squares(targets & ~enemy):
+                append(square | (target << 6))
+    for symbol, attacks in ((bishop, bishop_attacks), (rook, rook_attacks), (queen, queen_attacks)):
+        for square in iter_squares(bitboards[symbol] & from_squares):
+            targets = attacks(square, occupied) & allowed_targets
+            if square in pin_rays:
+                targets &= pin_rays[square]
+            for target in iter_squares(targets & enemy):
+                append(square | (target << 6) | (CAPTURE << 12))
+            for target in iter_squares(targets & ~enemy):
+                append(square | (target << 6))
+
+    # Pawns
+    if color == "white":
+        step, start_rank, promotion_rank = 8, 1, 7
+    else:
+        step, start_rank, promotion_rank = -8, 6, 0
+    for square in iter_squares(bitboards[pawn] & from_squares):
+        pawn_targets = check_mask
+        if square in pin_rays:
+            pawn_targets &= pin_rays[square]
+
+        target = square + step
+        if 0 <= target < 64 and not (occupied >> target) & 1:
+            if (pawn_targets >> target) & 1:
+                if (target >> 3) == promotion_rank:
+                    _add_promotions(square, target, PROMOTION, append)
+                elif not captures_only:
+                    append(square | (target << 6))
+            if (square >> 3) == start_rank and not captures_only and not (occupied >> (target + step)) & 1 and (pawn_targets >> (target + step)) & 1:
+                append(square | ((target + step) << 6) | (DOUBLE_PAWN_PUSH << 12))
+        for target in iter_squares(PAWN_ATTACKS[color][square] & enemy & pawn_targets):
+            if (target >> 3) == promotion_rank:
+                _add_promotions(square, target, PROMOTION_CAPTURE, append)
+            else:
+                append(square | (target << 6) | (CAPTURE << 12))
+
+    # En passant: replay the capture on the occupancy and make sure no slider reaches the king
+    if en_passant_target and (en_passant_target[0] != color):
+        ep_square = (en_passant_target[1] * 8) + en_passant_target[2]
+        captured_square = ep_square - step
+        for square in iter_squares(PAWN_ATTACKS[opponent][ep_square] & bitboards[pawn] & from_squares):
+            if king_square is not None:
+                occupied_after = (occupied ^ (1 << square) ^ (1 << captured_square)) | (1 << ep_square)
+                if rook_attacks(king_square, occupied_after) & enemy_straight:
+                    continue
+                if bishop_attacks(king_square, occupied_after) & enemy_diagonal:
+                    continue
+                if checkers & ~(1 << captured_square) & (bitboards[enemy_knight] | bitboards[enemy_pawn]):
+                    continue
+            append(square | (ep_square << 6) | (EN_PASSANT << 12))
+
+    return moves
+
+
+class _MoveFound(Exception):
+    pass
+
+
+class _FirstMove:
+    """Move container that ends generation as soon as a move is added."""
+    def append(self, move):
+        raise _MoveFound
+
+
+def has_legal_move(board, color, castling_rights, en_passant_target):
+    """Whether the given color has any legal move; generation stops at the first one found."""
+    try:
+        generate_legal_moves(board, color, castling_rights, en_passant_target, moves = _FirstMove())
+    except _MoveFound:
+        return True
+    return False
+
+
+def _add_promotions(square, target, flags, append):
+    """Add one move per promotion piece, queen first."""
+    for piece_index in (3, 0, 2, 1):  # Q, N, R, B
+        append(square | (target << 6) | ((flags | piece_index) << 12))
+
+
+def _add_castling_moves(board, color, opponent, castling_rights, king_square, append):
+    """
+    Add castling moves for a king that is not in check.
+    The king may not pass through or land on an attacked square, and the rook must still be there.
+    """
+    home = 0 if color == "white" else 56
+    if king_square != home + 4:
+        return
+    rooks = board.bitboards["R" if color == "white" else "r"]
+    occupied = board.occupied
+    if castling_rights[color]["kingside"] and (rooks >> (home + 7)) & 1 and not occupied & (0b1100000 << home):
+        if not board.is_square_attacked(home + 5, opponent) and not board.is_square_attacked(home + 6, opponent):
+            append(king_square | ((home + 6) << 6) | (KINGSIDE_CASTLE << 12))
+    if castling_rights[color]["queenside"] and (rooks >> home) & 1 and not occupied & (0b1110 << home):
+        if not board.is_square_attacked(home + 3, opponent) and not board.is_square_attacked(home + 2, opponent):
+            append(king_square | ((home + 2) << 6) | (QUEENSIDE_CASTLE << 12))
@@ -0,0 +1,80 @@
+"""
+Compact integer move encoding.
+
+A move fits in 16 bits so move lists can live in an array('H'):
+    bits 0-5   from square (rank * 8 + file)
+    bits 6-11  to square
+    bits 12-15 flags
+Flag values: 0 quiet, 1 double pawn push, 2 kingside castle, 3 queenside castle,
+4 capture, 5 en passant capture, 8-11 promotion to N/B/R/Q, 12-15 promotion with capture.
+"""
+from bitboard import SQUARE_POSITIONS
+
+QUIET = 0
+DOUBLE_PAWN_PUSH = 1
+KINGSIDE_CASTLE = 2
+QUEENSIDE_CASTLE = 3
+CAPTURE = 4
+EN_PASSANT = 5
+PROMOTION = 8
+PROMOTION_CAPTURE = 12
+
+# Promotion piece (uppercase FEN character) for the two low flag bits
+PROMOTION_PIECES = "NBRQ"
+
+NULL_MOVE = 0
+
+
+def encode_move(start, target, flags = QUIET):
+    """Pack a from square, to square and flags into one integer."""
+    return start | (target << 6) | (flags << 12)
+
+
+def move_from(move):
+    return move & 63
+
+
+def move_to(move):
+    return (move >> 6) & 63
+
+
+def move_flags(move):
+    return move >> 12
+
+
+def is_capture(move):
+    """Captures, en passant and capturing promotions all have the capture bit (4) set."""
+    return (move >> 14) & 1
+
+
+def is_promotion(move):
+    return move >> 15
+
+
+def is_castling(move):
+    return (move >> 12) in (KINGSIDE_CASTLE, QUEENSIDE_CASTLE)
+
+
+def promotion_piece(move):
+    """Uppercase FEN character of the promotion piece, None for other moves."""
+    if move >> 15:
+        return PROMOTION_PIECES[(move >> 12) & 3]
+    return None
+
+
+def move_positions(move):
+    """The (rank, file) start and end positions of a move."""
+    return SQUARE_POSITIONS[move & 63], SQUARE_POSITIONS[(move >> 6) & 63]
+
+
+def square_name(square):
+    rank, file = SQUARE_POSITIONS[square]
+    return chr(97 + file) + str(rank + 1)
+
+
+def move_to_uci(move):
+    """Coordinate notation used by UCI, e.g. e2e4 or e7e8q."""
+    text = square_name(move & 63) + square_name((move >> 6) & 63)
+    if move >> 15:
+        text += PROMOTION_PIECES[(move >> 12) & 3].lower()
+    return text
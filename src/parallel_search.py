@@ -0,0 +1,176 @@
+"""
+Parallel root search: the root moves of a position are split across a pool of
+worker processes.
+
+Workers get the position as a FEN string (with the hashes of the positions
+before it, for repetition detection) and the root move to search, never the
+live Game object. The best score found so far is passed as alpha with
+every new task, so later root moves are searched with a tighter window as
+earlier ones finish. Each root move is searched with its own transposition
+table and alpha is set one point below the best score (scores are integers),
+so a move equal to the best gets an exact score and ties go to the earlier
+root move. This makes the result independent of the number of workers and of
+which worker finishes first: it matches the single-process run (workers = 1)
+of the same search.
+"""
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from game import Game
+from chess_ai import ChessAI, MAX_DEPTH, MATE_THRESHOLD
+from moves import move_to_uci
+
+
+def search_root_move(fen, move, depth, alpha, deadline = None, hash_size_mb = 4, quiescence_node_limit = 2000, history = None):
+    """
+    Worker task: play one root move and search the reply to depth - 1.
+    deadline is a wall-clock time (time.time()) after which the search gives up.
+    history holds the hashes of the positions before the root, so repetitions are scored as in a single-process search.
+    Returns (score for the side to move at the root, nodes searched, whether the search finished).
+    """
+    game = Game.from_fen(fen, history)
+    color = game.current_turn
+    game.push(move)
+    ai = ChessAI(game, color, hash_size_mb = hash_size_mb, quiescence_node_limit = quiescence_node_limit)
+    if deadline:
+        ai.deadline = time.perf_counter() + (deadline - time.time())
+        ai.completed_depth = 1 # Let check_limits stop this search, the caller has a result to fall back on
+    value = ai.minimax(depth - 1, alpha, float("inf"), 1)[1]
+    return value, ai.nodes + 1, not ai.stop_search
+
+
+class ParallelSearch:
+    def __init__(self, ai, workers = 2, hash_size_mb = 4):
+        """
+        Root-splitting search for the position of ai.game, played for ai.color.
+        hash_size_mb is the transposition table size of each root move search.
+        """
+        self.ai = ai
+        self.workers = workers
+        self.hash_size_mb = hash_size_mb
+        self.executor = ProcessPoolExecutor(max_workers = workers) if workers > 1 else None
+        self.nodes = 0
+        self.search_info = {"depth": 0, "nodes": 0, "time": 0.0, "nps": 0, "score": 0, "move": None, "workers": workers}
+
+    def close(self):
+        """Shut the worker processes down."""
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    def search_depth(self, depth, first_move = None, deadline = None):
+        """
+        Search every root move to the given depth, giving up at the wall-clock deadline.
+        Returns (best move, score, finished); finished is False if the time ran out first.
+        """
+        game = self.ai.game
+        fen = game.get_fen()
+        moves = self.ai.move_orderer.order_moves(game, game.generate_moves(), first_move or 0, 0)
+        if not moves:
+            # Mated or stalemated at the root, let the regular search score it
+            move, value = self.ai.minimax(1, float("-inf"), float("inf"))
+            return move, value, True
+
+        best_index, best_value = None, float("-inf")
+        finished = True
+        task_options = (deadline, self.hash_size_mb, self.ai.quiescence_node_limit, game.recent_hashes())
+
+        def record(index, alpha, result):
+            nonlocal best_index, best_value, finished
+            value, nodes, task_finished = result
+            self.nodes += nodes
+            finished = finished and task_finished
+            # Scores at or below alpha are only upper bounds: the move is no better than the best one
+            if task_finished and value > alpha:
+                if (value > best_value) or ((value == best_value) and (index < best_index)):
+                    best_index, best_value = index, value
+
+        def next_alpha():
+            return best_value - 1 if best_index is not None else float("-inf")
+
+        if self.executor is None:
+            for index, move in enumerate(moves):
+                alpha = next_alpha()
+                record(index, alpha, search_root_move(fen, move, depth, alpha, *task_options))
+        else:
+            pending = {}
+            next_index = 0
+            while (next_index < len(moves)) or pending:
+                # Keep every worker busy, each new task starting from the best score so far
+                while (next_index < len(moves)) and (len(pending) < self.workers):
+                    alpha = next_alpha()
+                    future = self.executor.submit(search_root_move, fen, moves[next_index], depth, alpha, *task_options)
+                    pending[future] = (next_index, alpha)
+                    next_index += 1
+                done, not_done = wait(pending, return_when = FIRST_COMPLETED)
+                for future in sorted(done, key = lambda future: pending[future][0]):
+                    index, alpha = pending.pop(future)
+                    record(index, alpha, future.result())
+
+        if best_index is None:
+            return None, 0, False
+        return moves[best_index], best_value, finished
+
+    def search(self, time_limit = None, max_depth = MAX_DEPTH):
+        """
+        Iterative deepening over parallel root searches.
+        Returns (best move, score) of the last depth that finished within the time limit.
+        """
+        self.nodes = 0
+        start_time = time.perf_counter()
+        deadline = (time.time() + time_limit) if time_limit else None
+        best_move, best_value = None, 0
+        for depth in range(1, max_depth + 1):
+            # Depth 1 always finishes so there is a move to play
+            move, value, finished = self.search_depth(depth, best_move, deadline if depth > 1 else None)
+            if not finished:
+                break
+            best_move, best_value = move, value
+            elapsed = time.perf_counter() - start_time
+            self.search_info = {
+                "depth": depth,
+                "nodes": self.nodes,
+                "time": elapsed,
+                "nps": int(self.nodes / elapsed) if elapsed > 0 else 0,
+                "score": value,
+                "move": move,
+                "workers": self.workers
+            }
+            if (move is None) or (abs(value) > MATE_THRESHOLD):
+                break
+            if time_limit and (elapsed * 2 > time_limit):
+                break
+        return best_move, best_value
+
+
+def parallel_benchmark(fen, depth, worker_counts = (1, 2, 4)):
+    """Search a position to a fixed depth with each worker count and report the speedup over one worker."""
+    results = []
+    for workers in worker_counts:
+        game = Game.from_fen(fen)
+        search = ParallelSearch(ChessAI(game, game.current_turn, hash_size_mb = 1), workers)
+        search.search_depth(1) # Start the worker processes before timing
+        search.nodes = 0
+        start_time = time.time()
+        move, value, finished = search.search_depth(depth)
+        elapsed_time = time.time() - start_time
+        search.close()
+        results.append({"workers": workers, "move": move_to_uci(move), "score": value, "nodes": search.nodes, "time": elapsed_time})
+    for result in results:
+        result["speedup"] = results[0]["time"] / result["time"]
+    return results
+
+if __name__ == "__main__":
+    depth = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    print(f"Depth {depth} on {os.cpu_count()} CPUs")
+    positions = [
+        "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+        "r1bqkb1r/pppp1ppp/2n2n2/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R w KQkq - 4 4",
+        "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1"
+    ]
+    for fen in positions:
+        print(fen)
+        for result in parallel_benchmark(fen, depth):
+            print(f"  Workers: {result['workers']}, Best: {result['move']}, Score: {result['score']}, Nodes: {result['nodes']}, "
+                  f"Time: {result['time']:.4f} seconds, Speedup: {result['speedup']:.2f}x")
@@ -0,0 +1,46 @@
+import sys
+import time
+from game import Game
+from chess_ai import ChessAI
+from moves import move_to_uci
+
+# Fixed test positions, given as the moves that lead to them from the start position
+POSITIONS = {
+    "start": "",
+    "italian": "e2e4 e7e5 g1f3 b8c6 f1c4 g8f6",
+    "queens_gambit": "d2d4 d7d5 c2c4 e7e6 b1c3 g8f6 c1g5 f8e7",
+    "sicilian": "e2e4 c7c5 g1f3 d7d6 d2d4 c5d4 f3d4 g8f6 b1c3 a7a6",
+    "open_center": "e2e4 e7e5 d2d4 e5d4 d1d4 b8c6 d4e3 g8f6 b1c3 f8b4 c1d2 e8g8"
+}
+
+def search_benchmark(uci_moves, depth, move_ordering = True):
+    """Search a position to a fixed depth and return the search statistics."""
+    game = Game().play_uci_moves(uci_moves)
+    ai = ChessAI(game, game.current_turn, move_ordering = move_ordering)
+    start_time = time.time()
+    move, value = ai.search(time_limit = 0, max_depth = depth)
+    elapsed_time = time.time() - start_time
+    return {
+        "move": move_to_uci(move),
+        "score": value,
+        "nodes": ai.nodes,
+        "quiescence_nodes": ai.quiescence_nodes,
+        "cutoffs": ai.beta_cutoffs,
+        "first_move_cutoffs": ai.first_move_cutoffs,
+        "time": elapsed_time
+    }
+
+if __name__ == "__main__":
+    depth = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    print(f"Node counts at depth {depth}, without and with move ordering:")
+    total = {False: 0, True: 0}
+    for name, uci_moves in POSITIONS.items():
+        for move_ordering in (False, True):
+            result = search_benchmark(uci_moves, depth, move_ordering)
+            total[move_ordering] += result["nodes"]
+            first_move_rate = (100 * result["first_move_cutoffs"] / result["cutoffs"]) if result["cutoffs"] else 0
+            print(f"{name:14} ordering={'on ' if move_ordering else 'off'} Nodes: {result['nodes']:8} "
+                  f"({result['quiescence_nodes']} quiescence), "
+                  f"First move cutoffs: {first_move_rate:5.1f}%, Best: {result['move']}, Time: {result['time']:.4f} seconds")
+    print(f"Total nodes: {total[False]} without ordering, {total[True]} with ordering "
+          f"({100 * (1 - total[True] / total[False]):.1f}% fewer)")
@@ -0,0 +1,114 @@
+"""
+Fixed-size transposition table for the search.
+
+Entries live in two flat array('Q') buffers (keys and packed data), so the
+memory used is exactly what was asked for and does not grow during a game.
+Each bucket holds two entries: a depth-preferred slot that keeps the deepest
+result for the current search, and an always-replace slot for everything else.
+
+The key slot holds the position hash XORed with the data word. An entry only
+matches when both words belong together, so a table shared between processes
+(see lazy_smp.py) needs no locks: an entry torn by two simultaneous writes
+simply fails verification and reads as a miss.
+
+Packed data layout (64 bits):
+    bits 0-15   best move (see moves.py)
+    bits 16-23  depth
+    bits 24-25  bound type
+    bits 26-31  search age
+    bits 32-63  score + 2^31
+"""
+from array import array
+
+EXACT = 0
+LOWER_BOUND = 1 # Score is at least this value (search failed high)
+UPPER_BOUND = 2 # Score is at most this value (search failed low)
+
+ENTRY_BYTES = 16 # 8 byte key + 8 byte data
+BUCKET_ENTRIES = 2
+SCORE_OFFSET = 1 << 31
+
+
+def bucket_count(size_mb):
+    """Number of buckets that fit in size_mb megabytes."""
+    return max(1, int(size_mb * 1024 * 1024) // (ENTRY_BYTES * BUCKET_ENTRIES))
+
+
+def table_bytes(size_mb):
+    """Bytes used by the entries of a table of size_mb megabytes."""
+    return bucket_count(size_mb) * BUCKET_ENTRIES * ENTRY_BYTES
+
+
+class TranspositionTable:
+    def __init__(self, size_mb = 16, buffer = None):
+        """
+        Allocate a table that uses at most size_mb megabytes.
+        A writable buffer of at least table_bytes(size_mb) bytes (e.g. shared memory) can be
+        given to hold the entries instead.
+        """
+        self.size_mb = size_mb
+        self.bucket_count = bucket_count(size_mb)
+        entries = self.bucket_count * BUCKET_ENTRIES
+        if buffer is None:
+            self.keys = array("Q", [0]) * entries
+            self.data = array("Q", [0]) * entries
+        else:
+            view = memoryview(buffer)
+            self.keys = view[:entries * 8].cast("Q")
+            self.data = view[entries * 8:entries * 16].cast("Q")
+        self.age = 0
+        self.probes = 0
+        self.hits = 0
+
+    def new_search(self):
+        """Start a new search: older entries become preferred for replacement."""
+        self.age = (self.age + 1) & 63
+
+    def clear(self):
+        for index in range(len(self.keys)):
+            self.keys[index] = 0
+            self.data[index] = 0
+        self.age = 0
+
+    def probe(self, key):
+        """
+        Look up a position hash.
+        Returns (depth, score, bound, move) or None if the position is not stored.
+        """
+        self.probes += 1
+        index = (key % self.bucket_count) * BUCKET_ENTRIES
+        for slot in (index, index + 1):
+            data = self.data[slot]
+            if (self.keys[slot] ^ data) == key:
+                if data:
+                    self.hits += 1
+                    return ((data >> 16) & 0xFF, (data >> 32) - SCORE_OFFSET, (data >> 24) & 3, data & 0xFFFF)
+        return None
+
+    def store(self, key, depth, score, bound, move):
+        """
+        Store a search result.
+        The depth-preferred slot is replaced by deeper (or equal) results, results for the
+        same position and anything left over from an earlier search; the rest go to the
+        always-replace slot.
+        """
+        index = (key % self.bucket_count) * BUCKET_ENTRIES
+        stored = self.data[index]
+        same_position = (self.keys[index] ^ stored) == key
+        if same_position or (depth >= ((stored >> 16) & 0xFF)) or (((stored >> 26) & 63) != self.age):
+            slot = index
+            # Keep the old best move when the new result does not have one
+            if not move and same_position:
+                move = stored & 0xFFFF
+        else:
+            slot = index + 1
+        data = ((move & 0xFFFF) | (min(depth, 0xFF) << 16) | (bound << 24) | (self.age << 26)
+                | ((int(score) + SCORE_OFFSET) << 32))
+        self.keys[slot] = key ^ data
+        self.data[slot] = data
+
+    def hashfull(self):
+        """Permille of the first thousand entries in use by the current search (as reported by UCI engines)."""
+        sample = min(1000, len(self.data))
+        used = sum(1 for index in range(sample) if self.data[index] and ((self.data[index] >> 26) & 63) == self.age)
+        return (used * 1000) // sample
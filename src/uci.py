@@ -0,0 +1,244 @@
+"""
+UCI (Universal Chess Interface) front-end, so the engine can be driven by chess
+GUIs, match runners and other engines' test tools.
+
+Commands are read from standard input. Searches run on a background thread
+so that stop, isready and quit are answered while the engine is thinking.
+With Threads above 1 the search is a lazy SMP search (lazy_smp.py); it reports
+a single info line when it ends and ignores node limits.
+
+Usage: python uci.py
+"""
+import sys
+import threading
+from game import Game
+from chess_ai import ChessAI, CHECKMATE_SCORE, MATE_THRESHOLD, MAX_DEPTH
+from moves import move_to_uci
+
+ENGINE_NAME = "Chess"
+ENGINE_AUTHOR = "LuisPHernandez"
+START_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+
+# Spin options: name -> (default, min, max)
+OPTIONS = {
+    "Hash": (16, 1, 1024),
+    "Threads": (1, 1, 64)
+}
+
+MOVES_TO_GO = 30 # Moves the remaining clock time is shared over when the GUI does not say
+MOVE_OVERHEAD = 0.05 # Seconds kept back on every move for communication delays
+
+
+def format_score(score):
+    """UCI score for a search score from the side to move's point of view."""
+    if abs(score) > MATE_THRESHOLD:
+        plies = CHECKMATE_SCORE - abs(score)
+        moves = (plies + 1) // 2
+        return f"mate {moves if score > 0 else -moves}"
+    return f"cp {int(score)}"
+
+
+def time_budget(remaining, increment = 0, moves_to_go = None):
+    """Seconds to spend on a move given the clock (all in milliseconds)."""
+    budget = (remaining / (moves_to_go or MOVES_TO_GO)) + (increment * 0.75)
+    budget = min(budget, remaining * 0.5) / 1000
+    return max(0.01, budget - MOVE_OVERHEAD)
+
+
+def parse_go(tokens):
+    """Read the arguments of a go command into a dictionary (numbers as ints, flags as True)."""
+    arguments = {}
+    index = 0
+    while index < len(tokens):
+        name = tokens[index]
+        if name in ("infinite", "ponder"):
+            arguments[name] = True
+        elif name == "searchmoves":
+            break # Not supported, the whole position is searched
+        elif index + 1 < len(tokens):
+            try:
+                arguments[name] = int(tokens[index + 1])
+            except ValueError:
+                pass
+            index += 1
+        index += 1
+    return arguments
+
+
+class UCIEngine:
+    def __init__(self, output = sys.stdout):
+        self.output = output
+        self.output_lock = threading.Lock()
+        self.options = {name: default for name, (default, low, high) in OPTIONS.items()}
+        self.game = Game()
+        self.ai = ChessAI(self.game, "white", hash_size_mb = self.options["Hash"])
+        self.lazy_smp = None
+        self.thread = None
+        self.stop_signal = [0]
+        self.stopped = threading.Event() # Set by stop, ends an infinite search
+
+    def send(self, line):
+        with self.output_lock:
+            self.output.write(line + "\n")
+            self.output.flush()
+
+    def handle(self, line):
+        """Process one command line. Returns False once the engine should exit."""
+        tokens = line.split()
+        if not tokens:
+            return True
+        command, arguments = tokens[0], tokens[1:]
+        if command == "uci":
+            self.send(f"id name {ENGINE_NAME}")
+            self.send(f"id author {ENGINE_AUTHOR}")
+            for name, (default, low, high) in OPTIONS.items():
+                self.send(f"option name {name} type spin default {default} min {low} max {high}")
+            self.send("uciok")
+        elif command == "isready":
+            self.send("readyok")
+        elif command == "setoption":
+            self.set_option(arguments)
+        elif command == "ucinewgame":
+            self.stop()
+            self.new_game()
+        elif command == "position":
+            self.stop()
+            self.set_position(arguments)
+        elif command == "go":
+            self.stop()
+            self.go(parse_go(arguments))
+        elif command == "stop":
+            self.stop()
+        elif command == "quit":
+            self.stop()
+            self.close()
+            return False
+        return True
+
+    def set_option(self, arguments):
+        """setoption name <name> value <value>"""
+        if ("name" not in arguments) or ("value" not in arguments):
+            return
+        name = " ".join(arguments[arguments.index("name") + 1:arguments.index("value")])
+        if name not in OPTIONS:
+            return
+        try:
+            value = int(arguments[arguments.index("value") + 1])
+        except (ValueError, IndexError):
+            return
+        default, low, high = OPTIONS[name]
+        self.stop()
+        self.options[name] = max(low, min(high, value))
+        self.new_game()
+
+    def new_game(self):
+        """Fresh tables sized by the current options."""
+        self.close()
+        self.game = Game()
+        self.ai = ChessAI(self.game, "white", hash_size_mb = self.options["Hash"])
+        if self.options["Threads"] > 1:
+            from lazy_smp import LazySMPSearch # Only needed once Threads is raised
+            self.lazy_smp = LazySMPSearch(self.options["Threads"], self.options["Hash"], self.ai.quiescence_node_limit)
+            # Start the worker processes here: forked from the search thread while this thread
+            # waits on standard input, they would block closing their copy of it
+            self.lazy_smp.search(self.game, time_limit = 0, max_depth = 1)
+            self.lazy_smp.clear()
+
+    def close(self):
+        self.ai.close()
+        if self.lazy_smp is not None:
+            self.lazy_smp.close()
+            self.lazy_smp = None
+
+    def set_position(self, arguments):
+        """position [startpos | fen <fen>] [moves <move> ...]"""
+        moves = []
+        if "moves" in arguments:
+            moves = arguments[arguments.index("moves") + 1:]
+            arguments = arguments[:arguments.index("moves")]
+        try:
+            if arguments and (arguments[0] == "fen"):
+                game = Game.from_fen(" ".join(arguments[1:]))
+            else:
+                game = Game.from_fen(START_FEN)
+            game.play_uci_moves(" ".join(moves))
+        except ValueError as error:
+            self.send(f"info string {error}")
+            return
+        self.game = game
+
+    def go(self, arguments):
+        """Start searching the current position with the limits of a go command."""
+        time_limit = 0
+        color = self.game.current_turn
+        clock, increment = ("wtime", "winc") if color == "white" else ("btime", "binc")
+        if "movetime" in arguments:
+            time_limit = max(0.01, (arguments["movetime"] / 1000) - MOVE_OVERHEAD)
+        elif clock in arguments:
+            time_limit = time_budget(arguments[clock], arguments.get(increment, 0), arguments.get("movestogo"))
+        limits = {
+            "time_limit": time_limit,
+            "node_limit": arguments.get("nodes", 0),
+            "max_depth": min(arguments.get("depth", MAX_DEPTH), MAX_DEPTH)
+        }
+        infinite = ("infinite" in arguments) or ("ponder" in arguments)
+
+        # The same AI and table serve both colors: table scores are relative to the side to move
+        self.ai.game = self.game
+        self.ai.color = color
+        self.ai.info_callback = self.send_info
+        self.stop_signal = [0] # A new flag per search, so a late stop can never end the next one
+        self.ai.stop_signal = self.stop_signal
+        self.stopped.clear()
+        self.thread = threading.Thread(target = self.run_search, args = (limits, infinite, self.stop_signal), daemon = True)
+        self.thread.start()
+
+    def run_search(self, limits, infinite, stop_signal):
+        if self.lazy_smp is not None:
+            move, value = self.lazy_smp.search(self.game, limits["time_limit"], limits["max_depth"])
+            if move is not None:
+                self.send_info(self.lazy_smp.search_info)
+        else:
+            move, value = self.ai.search(**limits)
+        if infinite and not stop_signal[0]:
+            self.stopped.wait() # The GUI expects no bestmove before it sends stop
+        if move is None:
+            # Stopped before the first iteration finished: any legal move will do
+            moves = self.game.generate_moves()
+            move = moves[0] if moves else None
+        self.send(f"bestmove {move_to_uci(move) if move is not None else '0000'}")
+
+    def send_info(self, info):
+        milliseconds = int(info["time"] * 1000)
+        pv = ""
+        if info["move"] is not None:
+            line = [info["move"]]
+            if self.options["Threads"] == 1: # The lazy SMP table lives in the worker processes
+                line = self.ai.principal_variation(info["move"], info["depth"])
+            pv = " pv " + " ".join(move_to_uci(move) for move in line)
+        self.send(f"info depth {info['depth']} score {format_score(info['score'])} nodes {info['nodes']} "
+                  f"nps {info['nps']} time {milliseconds}{pv}")
+
+    def stop(self):
+        """Stop the running search (if any) and wait until its bestmove has been sent."""
+        if self.thread is None:
+            return
+        self.stop_signal[0] = 1
+        self.stopped.set()
+        while self.thread.is_alive():
+            if self.lazy_smp is not None:
+                self.lazy_smp.stop() # Repeated: a stop sent just before the search started is reset by it
+            self.thread.join(0.01)
+        self.thread = None
+
+
+def main(input_stream = sys.stdin, output = sys.stdout):
+    engine = UCIEngine(output)
+    for line in input_stream:
+        if not engine.handle(line):
+            break
+    engine.stop()
+    engine.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Zobrist keys for hashing positions into 64-bit integers.
+
+The keys come from a fixed seed so every process computes the same hash for
+the same position (needed once positions or tables are shared between
+processes). Board keeps the piece-square part of the hash up to date and Game
+adds side to move, castling rights and the en passant file.
+"""
+import random
+from bitboard import PIECE_SYMBOLS
+
+_rng = random.Random(0x5EED)
+
+PIECE_KEYS = {symbol: [_rng.getrandbits(64) for square in range(64)] for symbol in PIECE_SYMBOLS}
+SIDE_KEY = _rng.getrandbits(64) # XORed in when black is to move
+CASTLING_KEYS = {
+    "white": {"kingside": _rng.getrandbits(64), "queenside": _rng.getrandbits(64)},
+    "black": {"kingside": _rng.getrandbits(64), "queenside": _rng.getrandbits(64)}
+}
+EN_PASSANT_KEYS = [_rng.getrandbits(64) for file in range(8)]
+
+
+def state_key(castling_rights, en_passant_target):
+    """Hash contribution of the castling rights and en passant file."""
+    key = 0
+    for color in ("white", "black"):
+        rights = castling_rights[color]
+        if rights["kingside"]:
+            key ^= CASTLING_KEYS[color]["kingside"]
+        if rights["queenside"]:
+            key ^= CASTLING_KEYS[color]["queenside"]
+    if en_passant_target:
+        key ^= EN_PASSANT_KEYS[en_passant_target[2]]
+    return key
+
+
+def board_key(board):
+    """Piece-square hash of a board computed from scratch."""
+    key = 0
+    for rank in board.board_state:
+        for piece in rank:
+            if piece is not None:
+                key ^= PIECE_KEYS[piece.FEN][(piece.current_pos[0] * 8) + piece.current_pos[1]]
+    return key
+
+
+def position_key(board, current_turn, castling_rights, en_passant_target):
+    """Full position hash computed from scratch."""
+    key = board_key(board) ^ state_key(castling_rights, en_passant_target)
+    if current_turn == "black":
+        key ^= SIDE_KEY
+    return key
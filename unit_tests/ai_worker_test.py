@@ -0,0 +1,71 @@
+import unittest
+import sys
+import os
+import time
+
+src_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../src'))
+sys.path.append(src_path)
+from ai_worker import AIWorker
+from chess_ai import ChessAI
+from game import Game
+
+# Creating a test case
+class TestAIWorker(unittest.TestCase):
+    def initialize(self, time_limit):
+        self.game = Game()
+        self.game.play_move(self.game.generate_moves()[0])
+        self.worker = AIWorker(ChessAI(self.game, "black", hash_size_mb = 1, time_limit = time_limit))
+
+    def wait_for_move(self):
+        deadline = time.perf_counter() + 10
+        while time.perf_counter() < deadline:
+            move = self.worker.poll(self.game)
+            if move is not None:
+                return move
+            time.sleep(0.01)
+        return None
+
+    def test_background_search(self):
+        self.initialize(0.2)
+        fen = self.game.get_fen()
+        self.worker.start(self.game)
+        self.assertTrue(self.worker.is_thinking())
+        move = self.wait_for_move()
+        self.assertIn(move, self.game.generate_moves())
+        self.assertEqual(self.game.get_fen(), fen) # The search ran on a copy
+        self.assertGreater(self.worker.nodes_per_second(), 0)
+
+    def test_cancel(self):
+        self.initialize(30)
+        self.worker.start(self.game)
+        time.sleep(0.1)
+        start = time.perf_counter()
+        self.worker.cancel()
+        self.assertLess(time.perf_counter() - start, 2)
+        self.assertFalse(self.worker.is_thinking())
+        self.assertIsNone(self.worker.poll(self.game))
+
+    def test_finished_but_not_polled(self):
+        self.initialize(0.1)
+        self.assertFalse(self.worker.has_pending_search())
+        self.worker.start(self.game)
+        self.worker.thread.join()
+        # No longer thinking, but the reply is still pending: an undo now must only take back the player's move
+        self.assertFalse(self.worker.is_thinking())
+        self.assertTrue(self.worker.has_pending_search())
+        self.worker.cancel()
+        self.assertFalse(self.worker.has_pending_search())
+        self.game.undo_move()
+        self.assertEqual(len(self.game.move_history), 0)
+        self.assertIsNone(self.worker.poll(self.game))
+
+    def test_result_for_old_position_is_dropped(self):
+        self.initialize(0.1)
+        self.worker.start(self.game)
+        self.worker.thread.join()
+        self.game.undo_move() # The player took their move back while the AI was thinking
+        self.assertIsNone(self.worker.poll(self.game))
+
+# Running the tests
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+import sys
+import os
+import io
+
+src_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../src'))
+sys.path.append(src_path)
+from batch_analysis import *
+
+INPUT = """# Test positions
+rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1
+
+r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - id "kiwipete"; acd 1;
+8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1 ;D1 14
+not a position w - -
+6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1
+"""
+
+# Creating a test case
+class TestBatchAnalysis(unittest.TestCase):
+    def test_parse_line(self):
+        self.assertIsNone(parse_line("   "))
+        self.assertIsNone(parse_line("# comment"))
+        self.assertEqual(parse_line("4k3/8/8/8/8/8/8/4K2R w K - 3 40"), ("4k3/8/8/8/8/8/8/4K2R w K - 3 40", {}))
+        self.assertEqual(parse_line('4k3/8/8/8/8/8/8/4K2R w K - bm Rh8; id "test 1"; acs 0.5;'),
+                         ("4k3/8/8/8/8/8/8/4K2R w K -", {"bm": "Rh8", "id": "test 1", "acs": "0.5"}))
+
+    def test_results_in_input_order(self):
+        positions = list(read_positions(io.StringIO(INPUT)))
+        self.assertEqual([index for index, fen, operations in positions], [0, 1, 2, 3, 4])
+
+        single = list(analyze_stream(iter(positions), depth = 2, hash_size_mb = 1))
+        pooled = list(analyze_stream(iter(positions), workers = 2, window = 2, depth = 2, hash_size_mb = 1))
+        for result in single + pooled:
+            result["time"] = None
+        self.assertEqual(single, pooled)
+        self.assertEqual([result["index"] for result in pooled], [0, 1, 2, 3, 4])
+
+        self.assertEqual(pooled[1]["id"], "kiwipete")
+        self.assertEqual(pooled[1]["depth"], 1) # acd overrides the depth limit
+        self.assertEqual(pooled[0]["depth"], 2)
+        self.assertIsNone(pooled[3]["move"])
+        self.assertIn("FEN", pooled[3]["error"])
+        self.assertEqual(pooled[4]["move"], "a1a8") # Back rank mate
+
+    def test_write_results(self):
+        results = analyze_stream(read_positions(io.StringIO(INPUT)), depth = 1, hash_size_mb = 1)
+        output = io.StringIO()
+        self.assertEqual(write_results(results, output, "csv"), 5)
+        rows = output.getvalue().splitlines()
+        self.assertEqual(rows[0], ",".join(FIELDS))
+        self.assertEqual(len(rows), 6)
+
+        output = io.StringIO()
+        write_results(analyze_stream(read_positions(io.StringIO(INPUT)), depth = 1, hash_size_mb = 1), output)
+        lines = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual([line["index"] for line in lines], [0, 1, 2, 3, 4])
+        self.assertEqual(list(lines[0]), FIELDS)
+
+# Running the tests
+if __name__ == '__main__':
+    unittest.main()
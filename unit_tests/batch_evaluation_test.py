@@ -0,0 +1,78 @@
+import unittest
+import sys
+import os
+
+src_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../src'))
+sys.path.append(src_path)
+from board import Board
+from evaluation import evaluate
+from move_generation_test import load_epd, PERFT_SUITE
+try:
+    from batch_evaluation import *
+except ImportError: # NumPy is optional
+    np = None
+
+START_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+
+# Creating a test case
+@unittest.skipIf(np is None, "NumPy is not installed")
+class TestBatchEvaluation(unittest.TestCase):
+    def setUp(self):
+        self.fens = [fen for fen, depths in load_epd(PERFT_SUITE)]
+
+    def test_encode(self):
+        codes = encode_fens([START_FEN])
+        self.assertEqual(codes.shape, (1, 64))
+        self.assertEqual(codes.dtype, np.int8)
+        self.assertEqual(codes[0, 4], PIECE_CODES["K"])
+        self.assertEqual(codes[0, 59], PIECE_CODES["q"])
+        self.assertEqual(int(codes.sum()), 0)
+        for fen in self.fens:
+            board = Board.from_fen(fen.split()[0])
+            self.assertEqual(encode_board(board).tolist(), encode_fen(fen))
+        self.assertEqual(encode_fens([]).shape, (0, 64))
+        for fen in ("8/8/8/8/8/8/8 w - -", "9/8/8/8/8/8/8/8 w - -", "x7/8/8/8/8/8/8/8 w - -", ""):
+            with self.assertRaises(ValueError):
+                encode_fen(fen)
+
+    def test_planes(self):
+        codes = encode_fens(self.fens)
+        planes = np.zeros((len(codes), 12, 64), dtype = np.int8)
+        for plane, code in enumerate(PLANE_CODES):
+            planes[:, plane] = codes == code
+        self.assertEqual(as_codes(planes).tolist(), codes.tolist())
+        self.assertEqual(evaluate_batch(planes)["score"].tolist(), evaluate_batch(codes)["score"].tolist())
+        with self.assertRaises(ValueError):
+            as_codes(np.zeros((2, 63), dtype = np.int8))
+
+    def test_matches_scalar_evaluation(self):
+        result = evaluate_batch(encode_fens(self.fens))
+        for index, fen in enumerate(self.fens):
+            board = Board.from_fen(fen.split()[0])
+            self.assertEqual(int(result["score"][index]), evaluate(board), fen)
+
+    def test_chunks(self):
+        codes = encode_fens(self.fens)
+        whole = evaluate_batch(codes)
+        chunked = evaluate_batch(codes, chunk_size = 2)
+        streamed = list(evaluate_fens(iter(self.fens), chunk_size = 2))
+        self.assertEqual(len(streamed), (len(self.fens) + 1) // 2)
+        for name in ("score", "material", "piece_square", "mobility"):
+            self.assertEqual(chunked[name].tolist(), whole[name].tolist())
+            self.assertEqual(np.concatenate([chunk[name] for chunk in streamed]).tolist(), whole[name].tolist())
+        self.assertEqual(len(evaluate_batch(codes[:0])["score"]), 0)
+
+    def test_mobility(self):
+        # Start position: 4 knight moves each, everything else is blocked
+        result = evaluate_batch(encode_fens([START_FEN, "4k3/8/8/8/8/8/8/R3K3 w - - 0 1", "4k3/8/8/8/3N4/8/8/4K3 w - - 0 1"]))
+        self.assertEqual(result["mobility"][0], 0)
+        self.assertEqual(result["material"][0], 0)
+        # Rook a1: 7 up the file + 3 along the rank; king e1: 5 vs 5 for the black king
+        self.assertEqual(result["mobility"][1], 10)
+        # Knight d4: 8 squares
+        self.assertEqual(result["mobility"][2], 8)
+        self.assertGreater(result["material"][1], 0)
+
+# Running the tests
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,190 @@
+import unittest
+import random
+import sys
+import os
+
+src_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../src'))
+sys.path.append(src_path)
+from board import Board
+from bitboard import *
+from pieces import Rook
+from attacks import *
+from game import Game
+from evaluation import evaluate, evaluate_from_scratch
+
+# Creating a test case
+class TestBoard(unittest.TestCase):
+    def initialize(self):
+        self.game = Game()
+
+    def play(self, moves):
+        for start, end in moves:
+            self.assertTrue(self.game.select_piece(start))
+            self.assertTrue(self.game.make_move(end))
+
+    def assertBitboardsMatch(self, board):
+        # Rebuild every bitboard from board_state and compare with the incrementally kept ones
+        expected = {symbol: 0 for symbol in PIECE_SYMBOLS}
+        occupancy = {"white": 0, "black": 0}
+        for rank in range(8):
+            for file in range(8):
+                piece = board.board_state[rank][file]
+                if piece:
+                    self.assertEqual(piece.current_pos, (rank, file))
+                    expected[piece.FEN] |= 1 << square_index((rank, file))
+                    occupancy[piece.color] |= 1 << square_index((rank, file))
+        self.assertEqual(board.bitboards, expected)
+        self.assertEqual(board.occupancy, occupancy)
+        self.assertEqual(board.occupied, occupancy["white"] | occupancy["black"])
+
+        # Piece lists, counts and king squares
+        for color in ("white", "black"):
+            self.assertEqual(board.pieces[color], {square: board.board_state[square >> 3][square & 7]
+                                                   for square in iter_squares(occupancy[color])})
+        self.assertEqual(board.piece_counts, {symbol: popcount(bitboard) for symbol, bitboard in expected.items()})
+        for color, king in (("white", "K"), ("black", "k")):
+            self.assertEqual(board.king_squares[color], lsb_square(expected[king]) if expected[king] else None)
+
+    def test_start_position_bitboards(self):
+        board = Board()
+        self.assertBitboardsMatch(board)
+        self.assertEqual(board.bitboards["P"], RANK_MASKS[1])
+        self.assertEqual(board.bitboards["p"], RANK_MASKS[6])
+        self.assertEqual(popcount(board.occupied), 32)
+
+    def test_capture_and_undo(self):
+        self.initialize()
+        self.play([((1, 4), (3, 4)), ((6, 3), (4, 3)), ((3, 4), (4, 3))])  # 1. e4 d5 2. exd5
+        self.assertBitboardsMatch(self.game.board)
+        self.assertEqual(popcount(self.game.board.occupancy["black"]), 15)
+
+        self.game.undo_move()
+        self.assertBitboardsMatch(self.game.board)
+        self.assertEqual(popcount(self.game.board.occupied), 32)
+
+    def test_castling_and_undo(self):
+        self.initialize()
+        self.play([
+            ((1, 4), (3, 4)), ((6, 4), (4, 4)),  # 1. e4 e5
+            ((0, 6), (2, 5)), ((7, 1), (5, 2)),  # 2. Nf3 Nc6
+            ((0, 5), (3, 2)), ((7, 6), (5, 5)),  # 3. Bc4 Nf6
+            ((0, 4), (0, 6))                     # 4. O-O
+        ])
+        self.assertBitboardsMatch(self.game.board)
+        self.assertEqual(self.game.find_king("white"), (0, 6))
+        self.assertIsInstance(self.game.board.get_piece((0, 5)), Rook)
+
+        self.game.undo_move()
+        self.assertBitboardsMatch(self.game.board)
+        self.assertEqual(self.game.find_king("white"), (0, 4))
+        self.assertIsInstance(self.game.board.get_piece((0, 7)), Rook)
+        self.assertIsNone(self.game.board.get_piece((0, 5)))
+        self.assertIsNone(self.game.board.get_piece((0, 6)))
+
+    def test_sliding_attacks_match_ray_walk(self):
+        rng = random.Random(7)
+        for i in range(200):
+            square = rng.randrange(64)
+            occupied = rng.getrandbits(64) & rng.getrandbits(64)
+            rank, file = square_position(square)
+
+            # Walk each ray by hand and compare with the table lookup
+            expected = {"rook": 0, "bishop": 0}
+            for kind, directions in (("rook", ROOK_DIRECTIONS), ("bishop", BISHOP_DIRECTIONS)):
+                for delta_rank, delta_file in directions:
+                    r, f = rank + delta_rank, file + delta_file
+                    while 0 <= r < 8 and 0 <= f < 8:
+                        expected[kind] |= 1 << square_index((r, f))
+                        if occupied & (1 << square_index((r, f))):
+                            break
+                        r += delta_rank
+                        f += delta_file
+
+            self.assertEqual(rook_attacks(square, occupied), expected["rook"])
+            self.assertEqual(bishop_attacks(square, occupied), expected["bishop"])
+            self.assertEqual(queen_attacks(square, occupied), expected["rook"] | expected["bishop"])
+
+    def test_step_attacks(self):
+        self.assertEqual(popcount(KNIGHT_ATTACKS[square_index((0, 0))]), 2)
+        self.assertEqual(popcount(KNIGHT_ATTACKS[square_index((3, 3))]), 8)
+        self.assertEqual(popcount(KING_ATTACKS[square_index((0, 7))]), 3)
+        self.assertEqual(PAWN_ATTACKS["white"][square_index((1, 0))], 1 << square_index((2, 1)))
+        self.assertEqual(PAWN_ATTACKS["black"][square_index((0, 4))], 0)
+
+    def test_incremental_evaluation(self):
+        game = Game()
+        self.assertEqual(evaluate(game.board), 0) # Symmetric start position
+        self.assertEqual(game.board.phase, 24)
+
+        # Random games played with push and with make_move, then undone
+        rng = random.Random(7)
+        for use_push in (True, False):
+            played = 0
+            for ply in range(60):
+                moves = game.generate_moves()
+                if not moves:
+                    break
+                move = moves[rng.randrange(len(moves))]
+                if use_push:
+                    game.push(move)
+                else:
+                    game.play_move(move)
+                played += 1
+                self.assertEqual(evaluate(game.board), evaluate_from_scratch(game.board))
+            for ply in range(played):
+                if use_push:
+                    game.pop()
+                else:
+                    game.undo_move()
+            self.assertEqual(evaluate(game.board), 0)
+            self.assertEqual(game.board.phase, 24)
+
+    def test_from_fen(self):
+        board = Board.from_fen("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR")
+        start = Board()
+        self.assertEqual(board.bitboards, start.bitboards)
+        self.assertEqual(board.hash, start.hash)
+        self.assertEqual(board.convert_to_FEN(), start.convert_to_FEN())
+        self.assertBitboardsMatch(board)
+
+        empty = Board(setup = False)
+        self.assertEqual(empty.occupied, 0)
+        self.assertEqual(Board.from_fen("8/8/8/8/8/8/8/8").hash, empty.hash)
+
+        for placement in ("8/8/8/8/8/8/8", "9/8/8/8/8/8/8/8", "7/8/8/8/8/8/8/8", "8p/8/8/8/8/8/8/8", "x7/8/8/8/8/8/8/8"):
+            with self.assertRaises(ValueError):
+                Board.from_fen(placement)
+
+    def test_piece_lists(self):
+        # Random games with captures, castling and promotions, through both move paths and back
+        rng = random.Random(11)
+        for use_push in (True, False):
+            game = Game.from_fen("r3k2r/pP1pqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PpPBBPPP/R3K2R w KQkq - 0 1")
+            played = 0
+            for ply in range(80):
+                moves = game.generate_moves()
+                if not moves:
+                    break
+                move = moves[rng.randrange(len(moves))]
+                if use_push:
+                    game.push(move)
+                else:
+                    game.play_move(move)
+                played += 1
+                self.assertBitboardsMatch(game.board)
+                self.assertEqual(game.find_king("white"), square_position(lsb_square(game.board.bitboards["K"])))
+            for ply in range(played):
+                if use_push:
+                    game.pop()
+                else:
+                    game.undo_move()
+                self.assertBitboardsMatch(game.board)
+            self.assertEqual(len(game.board.pieces["white"]), 16)
+
+        board = Board(setup = False)
+        self.assertEqual(board.king_squares, {"white": None, "black": None})
+        self.assertBitboardsMatch(board)
+
+# Running the tests
+if __name__ == '__main__':
+    unittest.main()
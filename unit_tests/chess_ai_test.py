@@ -1,11 +1,15 @@
 import unittest
 import sys
 import os
+import time
 
 src_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../src'))
 sys.path.append(src_path)
 from chess_ai import *
 from game import Game
+from pieces import *
+from moves import *
+from evaluation import evaluate_from_scratch
 
 # Creating a test case
 class TestAI(unittest.TestCase):
@@ -47,6 +51,77 @@ class TestAI(unittest.TestCase):
         self.assertEqual(self.ai.white_points, 2392)  # Test white's points after two moves with no captures
         self.assertEqual(self.ai.black_points, 2382) # Test black's points after a move with a capture
 
+    def test_finds_mate_in_one(self):
+        self.game = Game()
+        for rank in range(8):
+            for file in range(8):
+                self.game.board.remove_piece((rank, file))
+        for piece in [King("white", (0, 6)), Rook("white", (0, 0)), King("black", (7, 6)),
+                      Pawn("black", (6, 5)), Pawn("black", (6, 6)), Pawn("black", (6, 7))]:
+            self.game.board.place_piece(piece)
+        self.ai = ChessAI(self.game, "white")
+
+        self.ai.make_move()
+        self.assertIsInstance(self.game.board.get_piece((7, 0)), Rook) # Back rank mate
+        self.assertEqual(self.game.game_status, "checkmate")
+
+    def test_iterative_deepening_node_budget(self):
+        self.initialize()
+        move, value = self.ai.search(time_limit = 0, node_limit = 3000)
+        self.assertIn(move, self.game.generate_moves()) # Best move of the last finished iteration
+        self.assertGreaterEqual(self.ai.search_info["depth"], 1)
+        self.assertEqual(self.ai.search_info["move"], move)
+        self.assertLessEqual(self.ai.nodes, 3000)
+        self.assertEqual(len(self.game.search_stack), 0) # Stopped search left the game untouched
+        # The budget only applies to that search, later searches use the constructor's limits again
+        self.assertIsNone(self.ai.node_limit)
+        self.ai.transposition_table.clear()
+        self.ai.search(time_limit = 0, max_depth = 4)
+        self.assertEqual(self.ai.search_info["depth"], 4)
+        self.assertGreater(self.ai.nodes, 3000)
+
+    def test_iterative_deepening_time_budget(self):
+        self.initialize()
+        start = time.perf_counter()
+        self.ai.search(time_limit = 0.2)
+        self.assertLess(time.perf_counter() - start, 1.0)
+        self.assertGreater(self.ai.search_info["nps"], 0)
+
+    def test_verify_evaluation_during_search(self):
+        self.initialize()
+        for text in ["e2e4", "d7d5", "e4d5", "d8d5", "b1c3"]:
+            self.game.play_move(next(move for move in self.game.generate_moves() if move_to_uci(move) == text))
+        self.ai.verify_evaluation = True
+        self.ai.search(time_limit = 0, node_limit = 3000) # Raises if the incremental evaluation drifts
+        self.assertEqual(self.ai.evaluate(), -evaluate_from_scratch(self.game.board))
+
+    def test_repetition_is_a_draw(self):
+        # Black is a queen down; the knights returning home repeats the start of the line
+        self.game = Game.from_fen("4k1n1/8/8/8/8/8/8/3QK1N1 w - - 0 1").play_uci_moves("g1f3 g8f6 f3g1")
+        self.ai = ChessAI(self.game, "black")
+        knight_back = next(move for move in self.game.generate_moves() if move_to_uci(move) == "f6g8")
+        self.game.push(knight_back)
+        self.assertEqual(self.ai.minimax(2, float("-inf"), float("inf"), 1), (None, 0))
+        self.game.pop()
+        self.assertEqual(self.ai.minimax(2, float("-inf"), float("inf"), 0)[0], knight_back) # Draw beats being a queen down
+
+    def test_quiescence_sees_recapture(self):
+        # Qxd5 wins a pawn at depth 1, but e6xd5 recaptures the queen right after
+        self.game = Game()
+        for rank in range(8):
+            for file in range(8):
+                self.game.board.remove_piece((rank, file))
+        for piece in [King("white", (0, 0)), Queen("white", (3, 3)), King("black", (7, 7)),
+                      Pawn("black", (4, 3)), Pawn("black", (5, 4))]:
+            self.game.board.place_piece(piece)
+        queen_takes_pawn = encode_move(27, 35, CAPTURE)
+
+        self.ai = ChessAI(self.game, "white", quiescence_node_limit = 0)
+        self.assertEqual(self.ai.search(time_limit = 0, max_depth = 1)[0], queen_takes_pawn) # Horizon effect
+        self.ai = ChessAI(self.game, "white")
+        self.assertNotEqual(self.ai.search(time_limit = 0, max_depth = 1)[0], queen_takes_pawn)
+        self.assertGreater(self.ai.quiescence_nodes, 0)
+
 # Running the tests
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,352 @@
+import unittest
+import sys
+import os
+
+src_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../src'))
+sys.path.append(src_path)
+from game import Game
+from move_generation_test import load_epd, PERFT_SUITE
+from pieces import *
+from moves import *
+from array import array
+from unittest import mock
+import copy
+import game as game_module
+
+# Creating a test case
+class TestGame(unittest.TestCase):
+    def initialize(self, pieces = None):
+        self.game = Game()
+        if pieces is not None:
+            # Replace the start position with the given pieces
+            for rank in range(8):
+                for file in range(8):
+                    self.game.board.remove_piece((rank, file))
+            for piece in pieces:
+                self.game.board.place_piece(piece)
+
+    def test_square_attacked_by_each_piece_type(self):
+        self.initialize([King("white", (0, 4)), King("black", (7, 4)), Pawn("black", (4, 4)),
+                         Knight("black", (5, 0)), Bishop("black", (6, 6)), Rook("black", (7, 0))])
+        self.assertTrue(self.game.is_square_attacked((3, 3), "black"))  # Pawn attacks downwards
+        self.assertFalse(self.game.is_square_attacked((5, 3), "black"))
+        self.assertTrue(self.game.is_square_attacked((3, 1), "black"))  # Knight
+        self.assertTrue(self.game.is_square_attacked((5, 7), "black"))  # Bishop
+        self.assertTrue(self.game.is_square_attacked((7, 3), "black"))  # Rook and king
+        self.assertFalse(self.game.is_square_attacked((3, 4), "black"))  # Bishop blocked by its own pawn
+        self.assertFalse(self.game.is_square_attacked((7, 6), "black"))  # Rook blocked by its own king
+        self.assertTrue(self.game.is_square_attacked((1, 3), "white"))  # King
+
+    def test_slider_blocked(self):
+        self.initialize([King("white", (0, 4)), King("black", (7, 7)), Rook("black", (7, 4)), Pawn("white", (3, 4))])
+        self.assertFalse(self.game.is_in_check("white"))
+        self.game.board.remove_piece((3, 4))
+        self.assertTrue(self.game.is_in_check("white"))
+
+    def test_no_castling_through_or_into_check(self):
+        self.initialize([King("white", (0, 4)), Rook("white", (0, 7)), Rook("white", (0, 0)),
+                         King("black", (7, 4)), Rook("black", (7, 6)), Bishop("black", (4, 7))])
+        king_moves = self.game.get_legal_moves(self.game.board.get_piece((0, 4)))
+        self.assertNotIn((0, 6), king_moves)  # g1 is attacked by the rook on g8
+        self.assertNotIn((0, 2), king_moves)  # d1 is attacked by the bishop on h5
+
+        self.game.board.remove_piece((7, 6))
+        self.game.board.remove_piece((4, 7))
+        king_moves = self.game.get_legal_moves(self.game.board.get_piece((0, 4)))
+        self.assertIn((0, 6), king_moves)
+        self.assertIn((0, 2), king_moves)
+
+    def test_pinned_piece_stays_on_pin_ray(self):
+        self.initialize([King("white", (0, 4)), Rook("white", (2, 4)), Knight("white", (1, 3)), Bishop("white", (1, 5)),
+                         King("black", (7, 0)), Rook("black", (7, 4)), Bishop("black", (3, 1))])
+        self.assertEqual(sorted(self.game.get_legal_moves(self.game.board.get_piece((2, 4)))),
+                         [(1, 4), (3, 4), (4, 4), (5, 4), (6, 4), (7, 4)])
+        self.assertEqual(self.game.get_legal_moves(self.game.board.get_piece((1, 3))), [])  # Pinned by the bishop on b4
+        self.assertNotEqual(self.game.get_legal_moves(self.game.board.get_piece((1, 5))), [])
+
+    def test_en_passant_discovered_check(self):
+        self.initialize([King("white", (4, 0)), Pawn("white", (4, 1)), King("black", (7, 7)),
+                         Pawn("black", (4, 2)), Rook("black", (4, 7))])
+        self.game.en_passant_target = ("black", 5, 2)
+        # Capturing en passant would empty the fifth rank between the king and the rook
+        self.assertNotIn((5, 2), self.game.get_legal_moves(self.game.board.get_piece((4, 1))))
+
+        self.game.board.remove_piece((4, 7))
+        self.assertIn((5, 2), self.game.get_legal_moves(self.game.board.get_piece((4, 1))))
+
+    def test_double_check_only_king_moves(self):
+        self.initialize([King("white", (0, 4)), Queen("white", (0, 3)), Rook("white", (0, 0)),
+                         King("black", (7, 0)), Rook("black", (7, 4)), Knight("black", (2, 3))])
+        self.game.castling_rights["white"]["queenside"] = False
+        all_moves = [(piece, moves) for piece, moves in self.game.get_all_legal_moves() if moves]
+        self.assertEqual(len(all_moves), 1)
+        self.assertIsInstance(all_moves[0][0], King)
+
+    def test_generate_moves_start_position(self):
+        self.initialize()
+        buffer = array("H")
+        moves = self.game.generate_moves(buffer)
+        self.assertIs(moves, buffer)
+        self.assertEqual(len(moves), 20)
+        self.assertEqual(sum(1 for move in moves if move_flags(move) == DOUBLE_PAWN_PUSH), 8)
+        self.assertIn("e2e4", [move_to_uci(move) for move in moves])
+
+        # The buffer is cleared and refilled on reuse
+        self.assertEqual(len(self.game.generate_moves(buffer)), 20)
+
+    def test_generate_captures(self):
+        # Captures, en passant and promotions, but no quiet moves
+        self.initialize([King("white", (0, 4)), King("black", (7, 0)), Pawn("white", (6, 6)), Pawn("white", (4, 4)),
+                         Pawn("black", (4, 3)), Knight("white", (2, 2)), Rook("black", (3, 1)), Queen("black", (7, 7))])
+        self.game.en_passant_target = ("black", 5, 3)
+        captures = self.game.generate_captures()
+        moves = self.game.generate_moves()
+        self.assertEqual(sorted(captures), sorted(move for move in moves if is_capture(move) or is_promotion(move)))
+        self.assertEqual(sorted(move_to_uci(move) for move in captures),
+                         ["c3d5", "e5d6", "g7g8b", "g7g8n", "g7g8q", "g7g8r", "g7h8b", "g7h8n", "g7h8q", "g7h8r"])
+
+    def test_from_fen(self):
+        fen = "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1"
+        self.game = Game.from_fen(fen)
+        self.assertEqual(self.game.get_fen(), fen)
+        self.assertEqual(len(self.game.generate_moves()), 48)
+        self.assertEqual(self.game.hash, self.game.compute_hash())
+        self.assertEqual(Game().get_fen(), "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1")
+
+        self.game = Game.from_fen("rnbqkbnr/pppp1ppp/8/4p3/4P3/8/PPPP1PPP/RNBQKBNR w KQkq e6 0 2")
+        self.assertEqual(self.game.en_passant_target, ("black", 5, 4))
+
+    def test_from_fen_round_trip(self):
+        for fen, counts in load_epd(PERFT_SUITE):
+            game = Game.from_fen(fen)
+            self.assertEqual(game.get_fen(), fen)
+            self.assertEqual(game.hash, game.compute_hash())
+            self.assertEqual(len(game.generate_moves()), counts[1])
+
+        # Move counters are optional, the game status is set from the position
+        game = Game.from_fen("4k3/8/8/8/8/8/8/4K2r w - -")
+        self.assertEqual(game.get_fen(), "4k3/8/8/8/8/8/8/4K2r w - - 0 1")
+        self.assertEqual(game.game_status, "check")
+
+    def test_undo_restores_loaded_halfmove_clock(self):
+        fen = "4k3/8/8/8/8/8/8/R3K3 w - - 37 20"
+        for undo in ("undo_move", "undo_move_ai_opp"):
+            self.game = Game.from_fen(fen)
+            self.game.play_uci_moves("a1a2" if undo == "undo_move" else "a1a2 e8d8")
+            getattr(self.game, undo)()
+            self.assertEqual(self.game.get_fen(), fen)
+        # Near the 50-move limit, the clock after an undo still counts toward the draw
+        self.game = Game.from_fen("4k3/8/8/8/8/8/8/R3K3 w - - 99 80").play_uci_moves("a1a2")
+        self.assertEqual(self.game.game_status, "draw 50-move")
+        self.game.undo_move()
+        self.game.play_uci_moves("a1a3")
+        self.assertEqual(self.game.game_status, "draw 50-move")
+
+    def test_from_fen_rejects_malformed(self):
+        for fen in ("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq",
+                    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR x KQkq - 0 1",
+                    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQxq - 0 1",
+                    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq e4 0 1",
+                    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - a 1",
+                    "rnbq1bnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQ - 0 1",
+                    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP w KQkq - 0 1"):
+            with self.assertRaises(ValueError):
+                Game.from_fen(fen)
+
+    def test_promotion_moves(self):
+        self.initialize([King("white", (0, 4)), Pawn("white", (6, 0)), King("black", (7, 7)), Rook("black", (7, 1))])
+        promotions = [move for move in self.game.generate_moves() if is_promotion(move)]
+        self.assertEqual(sorted(move_to_uci(move) for move in promotions),
+                         ["a7a8b", "a7a8n", "a7a8q", "a7a8r", "a7b8b", "a7b8n", "a7b8q", "a7b8r"])
+        self.assertEqual(sum(1 for move in promotions if is_capture(move)), 4)
+
+        knight_capture = encode_move(48, 57, PROMOTION_CAPTURE | PROMOTION_PIECES.index("N"))
+        self.assertTrue(self.game.play_move(knight_capture))
+        self.assertIsInstance(self.game.board.get_piece((7, 1)), Knight)
+        self.assertEqual(self.game.current_turn, "black")
+
+    def test_push_pop_restores_position(self):
+        self.initialize()
+        fen = self.game.get_fen()
+
+        def perft(depth):
+            if depth == 0:
+                return 1
+            count = 0
+            for move in self.game.generate_moves():
+                self.game.push(move)
+                count += perft(depth - 1)
+                self.game.pop()
+            return count
+
+        self.assertEqual(perft(3), 8902)
+        self.assertEqual(self.game.get_fen(), fen)
+        self.assertEqual(self.game.search_stack, [])
+
+    def test_push_pop_special_moves(self):
+        self.initialize([King("white", (0, 4)), Rook("white", (0, 7)), Pawn("white", (6, 0)), Pawn("white", (4, 4)),
+                         King("black", (7, 7)), Knight("black", (7, 1)), Pawn("black", (6, 3))])
+        fen = self.game.get_fen()
+
+        # Promotion with capture
+        self.game.push(encode_move(48, 57, PROMOTION_CAPTURE | PROMOTION_PIECES.index("Q")))
+        self.assertIsInstance(self.game.board.get_piece((7, 1)), Queen)
+        self.assertEqual(self.game.current_turn, "black")
+        self.game.pop()
+        self.assertEqual(self.game.get_fen(), fen)
+
+        # Castling moves the rook and clears the rights
+        self.game.push(encode_move(4, 6, KINGSIDE_CASTLE))
+        self.assertIsInstance(self.game.board.get_piece((0, 5)), Rook)
+        self.assertFalse(self.game.castling_rights["white"]["queenside"])
+        self.game.pop()
+        self.assertTrue(self.game.castling_rights["white"]["kingside"])
+        self.assertEqual(self.game.get_fen(), fen)
+
+        # Double push followed by an en passant capture
+        self.game.push(encode_move(4, 12))  # Any white move so black can push
+        self.game.push(encode_move(51, 35, DOUBLE_PAWN_PUSH))
+        self.assertEqual(self.game.en_passant_target, ("black", 5, 3))
+        self.game.push(encode_move(36, 43, EN_PASSANT))
+        self.assertIsNone(self.game.board.get_piece((4, 3)))
+        for i in range(3):
+            self.game.pop()
+        self.assertEqual(self.game.get_fen(), fen)
+
+    def test_hash_transpositions_and_undo(self):
+        self.initialize()
+        self.game.debug_hash = True
+        start_hash = self.game.hash
+        for start, end in [((0, 6), (2, 5)), ((7, 6), (5, 5)), ((0, 1), (2, 2))]:
+            self.game.select_piece(start)
+            self.game.make_move(end)
+        one_order = self.game.hash
+
+        for i in range(3):
+            self.game.undo_move()
+        self.assertEqual(self.game.hash, start_hash)
+
+        for start, end in [((0, 1), (2, 2)), ((7, 6), (5, 5)), ((0, 6), (2, 5))]:
+            self.game.select_piece(start)
+            self.game.make_move(end)
+        self.assertEqual(self.game.hash, one_order)
+        self.assertEqual(self.game.hash, self.game.compute_hash())
+
+    def test_play_uci_moves(self):
+        self.initialize()
+        self.assertIs(self.game.play_uci_moves("e2e4 e7e5 g1f3"), self.game)
+        self.assertEqual(self.game.get_fen(), "rnbqkbnr/pppp1ppp/8/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R b KQkq - 1 2")
+        with self.assertRaises(ValueError):
+            self.game.play_uci_moves("e1e2") # Not white's turn
+        with self.assertRaises(ValueError):
+            self.game.play_uci_moves("e5e4")
+
+    def test_threefold_repetition(self):
+        self.initialize()
+        shuffle = [((0, 6), (2, 5)), ((7, 6), (5, 5)), ((2, 5), (0, 6)), ((5, 5), (7, 6))]
+        for start, end in shuffle * 2:
+            self.assertNotEqual(self.game.game_status, "draw threefold repetition")
+            self.game.select_piece(start)
+            self.game.make_move(end)
+        # The start position has now been reached three times
+        self.assertEqual(self.game.repetition_count[self.game.hash], 3)
+        self.assertEqual(self.game.game_status, "draw threefold repetition")
+
+        self.game.undo_move()
+        self.assertEqual(self.game.repetition_count[self.game.hash], 2)
+
+    def test_is_repetition(self):
+        self.initialize()
+        self.game.play_uci_moves("g1f3 g8f6")
+        self.assertFalse(self.game.is_repetition())
+        self.game.play_uci_moves("f3g1")
+        self.game.push(next(move for move in self.game.generate_moves() if move_to_uci(move) == "f6g8"))
+        self.assertTrue(self.game.is_repetition()) # Start position again, white to move
+        self.game.pop()
+        self.assertFalse(self.game.is_repetition())
+        # A pawn move in between makes the earlier positions unreachable
+        game = Game().play_uci_moves("g1f3 g8f6 e2e4 e7e5 f3g1 f6g8")
+        self.assertFalse(game.is_repetition())
+        game.play_uci_moves("g1f3 g8f6 f3g1 f6g8")
+        self.assertTrue(game.is_repetition())
+        # A game rebuilt from the FEN with the recent hashes still sees the repetition
+        self.assertEqual(game.recent_hashes(), game.hash_history[-7:]) # Back to the position after e7e5
+        self.assertTrue(Game.from_fen(game.get_fen(), game.recent_hashes()).is_repetition())
+        self.assertFalse(Game.from_fen(game.get_fen()).is_repetition())
+
+    def test_position_cache(self):
+        self.initialize()
+        generate = mock.Mock(wraps = game_module.generate_legal_moves)
+        check = mock.Mock(wraps = self.game.is_in_check)
+        with mock.patch("game.generate_legal_moves", generate), mock.patch.object(self.game, "is_in_check", check):
+            self.assertTrue(self.game.select_piece((1, 4)))
+            self.assertEqual(generate.call_count, 1)
+            self.assertTrue(self.game.make_move((3, 4))) # The status check stops at black's first legal move
+            self.assertEqual(generate.call_count, 1)
+            self.assertTrue(self.game.select_piece((6, 4))) # Full generation once, shared by selection and highlighting
+            self.assertEqual(len(self.game.get_all_legal_moves()), 16)
+            self.assertEqual(self.game.get_legal_moves(self.game.board.get_piece((7, 6))), [(5, 5), (5, 7)])
+            self.assertEqual(generate.call_count, 2)
+            self.assertEqual(check.call_count, 2) # Once per position and color
+
+            # Undo returns to a position that is still cached
+            self.game.undo_move()
+            self.assertTrue(self.game.select_piece((1, 3)))
+            self.assertEqual(generate.call_count, 2)
+
+        # A board edited directly gets a fresh entry
+        self.game.board.remove_piece((1, 3))
+        self.assertTrue(self.game.select_piece((0, 3)))
+        self.assertIn((3, 3), self.game.possible_moves)
+
+        # The cache keeps a bounded number of positions
+        with mock.patch("game.POSITION_CACHE_SIZE", 4):
+            self.initialize()
+            for ply in range(10):
+                self.game.play_move(self.game.generate_moves()[0])
+            self.assertLessEqual(len(self.game.position_cache), 4)
+
+    def test_position_status(self):
+        self.game = Game.from_fen("6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1")
+        self.assertEqual(self.game.position_status(), "active")
+        self.game.play_move(encode_move(0, 56))
+        self.assertEqual(self.game.game_status, "checkmate")
+        self.assertEqual(self.game.position_status(), "checkmate")
+
+        self.assertEqual(Game.from_fen("7k/5Q2/6K1/8/8/8/8/8 b - - 0 1").position_status(), "stalemate")
+        self.assertEqual(Game.from_fen("4k3/8/8/8/8/8/8/4K2R b K - 100 80").position_status(), "draw 50-move")
+        self.assertEqual(Game.from_fen("4k3/8/8/8/8/8/8/2B1K3 w - - 0 1").position_status(), "draw insufficient material")
+        self.assertEqual(Game.from_fen("4k3/8/8/8/8/8/8/4K2r w - - 0 1").position_status(), "check")
+
+    def test_promotion_reuses_pieces(self):
+        self.game = Game.from_fen("4k3/P7/8/8/8/8/8/4K3 w - - 0 1")
+        pawn = self.game.board.get_piece((6, 0))
+        self.assertFalse(hasattr(pawn, "__dict__"))
+        # The FEN character belongs to the per-color class, each piece only stores color and position
+        self.assertEqual((pawn.FEN, Pawn("black", (6, 0)).FEN), ("P", "p"))
+        self.assertIsInstance(pawn, Pawn)
+        self.assertNotIn("FEN", Piece.__slots__)
+        self.assertEqual(copy.deepcopy(pawn).FEN, "P")
+        promotion = encode_move(48, 56, PROMOTION | PROMOTION_PIECES.index("Q"))
+
+        # Undoing a promotion puts the original pawn back
+        self.assertTrue(self.game.play_move(promotion))
+        self.assertIsInstance(self.game.board.get_piece((7, 0)), Queen)
+        self.game.undo_move()
+        self.assertIs(self.game.board.get_piece((6, 0)), pawn)
+        self.assertIsNone(self.game.board.get_piece((7, 0)))
+
+        # Search promotions reuse the promoted piece taken back by pop()
+        self.game.push(promotion)
+        queen = self.game.board.get_piece((7, 0))
+        self.game.pop()
+        self.assertIs(self.game.board.get_piece((6, 0)), pawn)
+        self.game.push(promotion)
+        self.assertIs(self.game.board.get_piece((7, 0)), queen)
+        self.assertEqual(queen.current_pos, (7, 0))
+        self.game.pop()
+        self.assertEqual(self.game.get_fen(), "4k3/P7/8/8/8/8/8/4K3 w - - 0 1")
+
+# Running the tests
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+import sys
+import os
+
+src_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../src'))
+sys.path.append(src_path)
+from lazy_smp import *
+from game import Game
+from chess_ai import ChessAI
+from transposition_table import TranspositionTable
+
+ITALIAN = "r1bqkb1r/pppp1ppp/2n2n2/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R w KQkq - 4 4"
+
+# Creating a test case
+class TestLazySMP(unittest.TestCase):
+    def test_helper_depth_skipping(self):
+        self.assertEqual([helper_skips_depth(0, depth) for depth in range(1, 5)], [True, False, True, False])
+        self.assertEqual([helper_skips_depth(1, depth) for depth in range(1, 5)], [False, True, False, True])
+
+    def test_shared_table_search(self):
+        search = LazySMPSearch(workers = 2, hash_size_mb = 1)
+        try:
+            game = Game.from_fen(ITALIAN)
+            move, value = search.search(game, time_limit = 0, max_depth = 3)
+            self.assertIn(move, game.generate_moves())
+            self.assertEqual(search.search_info["depth"], 3)
+            self.assertGreater(search.search_info["nodes"], 0)
+
+            # The workers' results are in the shared memory, visible from this process
+            table = TranspositionTable(1, search.memory.buf[CONTROL_BYTES:])
+            table.age = search.age
+            entry = table.probe(game.hash)
+            self.assertIsNotNone(entry)
+            self.assertEqual(entry[3], move)
+            del table
+        finally:
+            search.close()
+
+    def test_table_kept_when_side_to_move_changes(self):
+        # One worker makes the search deterministic: a table filled by white's search gives black the fresh result
+        search, fresh_search = LazySMPSearch(workers = 1, hash_size_mb = 1), LazySMPSearch(workers = 1, hash_size_mb = 1)
+        try:
+            game = Game.from_fen(ITALIAN)
+            search.search(game, time_limit = 0, max_depth = 3)
+            game.play_uci_moves("d2d3")
+            self.assertEqual(search.search(game, time_limit = 0, max_depth = 2),
+                             fresh_search.search(game, time_limit = 0, max_depth = 2))
+        finally:
+            search.close()
+            fresh_search.close()
+
+    def test_repetition_seen_by_workers(self):
+        # f6g8 repeats an earlier position, a draw that saves black from being a queen down
+        game = Game.from_fen("4k1n1/8/8/8/8/8/8/3QK1N1 w - - 0 1").play_uci_moves("g1f3 g8f6 f3g1")
+        search = LazySMPSearch(workers = 1, hash_size_mb = 1)
+        try:
+            result = search.search(game, time_limit = 0, max_depth = 3)
+        finally:
+            search.close()
+        self.assertEqual(result, ChessAI(game, "black", hash_size_mb = 1).search(time_limit = 0, max_depth = 3))
+        self.assertEqual(result[1], 0)
+
+    def test_ai_lazy_smp_mode(self):
+        game = Game()
+        with ChessAI(game, "white", hash_size_mb = 1, time_limit = 0.5, workers = 2, parallel_mode = "lazy_smp") as ai:
+            ai.make_move()
+            memory_name = ai.parallel_search.memory.name
+        self.assertIsNone(ai.parallel_search) # Worker processes shut down on leaving the with block
+        with self.assertRaises(FileNotFoundError):
+            shared_memory.SharedMemory(name = memory_name) # Shared table freed as well
+        self.assertEqual(game.current_turn, "black")
+        self.assertEqual(ai.search_info["workers"], 2)
+
+# Running the tests
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+import sys
+import os
+
+src_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../src'))
+sys.path.append(src_path)
+from match_runner import *
+
+FAST = parse_engine("time_limit=0,max_depth=2,hash_size_mb=1")
+MATE_IN_ONE = "6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1"
+
+# Creating a test case
+class TestMatchRunner(unittest.TestCase):
+    def test_parse_engine(self):
+        config = parse_engine("time_limit=0.5, max_depth=3,move_ordering=false,node_limit=none")
+        self.assertEqual(config["time_limit"], 0.5)
+        self.assertEqual(config["max_depth"], 3)
+        self.assertFalse(config["move_ordering"])
+        self.assertIsNone(config["node_limit"])
+        self.assertEqual(config["hash_size_mb"], ENGINE_DEFAULTS["hash_size_mb"])
+        self.assertEqual(parse_engine(""), ENGINE_DEFAULTS)
+        with self.assertRaises(ValueError):
+            parse_engine("depth=3")
+
+    def test_elo_difference(self):
+        self.assertEqual(elo_difference(5, 0, 5)[0], 0)
+        elo, margin = elo_difference(60, 30, 10)
+        self.assertAlmostEqual(elo, 190.85, places = 2) # 75% score
+        self.assertGreater(margin, 0)
+        self.assertLess(elo_difference(600, 300, 100)[1], margin) # More games, smaller error
+        self.assertEqual(elo_difference(3, 0, 0)[0], math.inf)
+
+    def test_play_game(self):
+        result = play_game(MATE_IN_ONE, FAST, FAST, True)
+        self.assertEqual((result["score"], result["reason"], result["plies"]), (1, "checkmate", 1))
+        self.assertEqual(result["stats"]["a"]["moves"], 1)
+        self.assertEqual(result["stats"]["b"]["moves"], 0)
+
+        result = play_game(MATE_IN_ONE, FAST, FAST, False)
+        self.assertEqual(result["score"], 0)
+
+        result = play_game("4k3/8/8/8/8/8/8/4K3 w - - 0 1", FAST, FAST, True)
+        self.assertEqual((result["score"], result["reason"], result["plies"]), (0.5, "draw insufficient material", 0))
+        result = play_game("4k3/8/8/8/8/8/8/R3K3 w - - 0 1", FAST, FAST, True, max_plies = 6)
+        self.assertEqual((result["reason"], result["plies"]), ("max plies", 6))
+
+    def test_run_match(self):
+        book = [(MATE_IN_ONE, "mate")] + load_book()[:1]
+        results = run_match(FAST, FAST, book, games = 4, workers = 2, max_plies = 10)
+        self.assertEqual([result["a_is_white"] for result in results], [True, False, True, False])
+        self.assertEqual([result["score"] for result in results[:2]], [1, 0])
+        self.assertEqual(results[2]["opening"], "Ruy Lopez")
+
+        summary = summarize(results)
+        self.assertEqual(summary["games"], 4)
+        self.assertEqual(summary["wins"] + summary["draws"] + summary["losses"], 4)
+        self.assertGreater(summary["a"]["average_depth"], 0)
+
+# Running the tests
+if __name__ == '__main__':
+    unittest.main()
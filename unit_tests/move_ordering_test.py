@@ -0,0 +1,55 @@
+import unittest
+import sys
+import os
+
+src_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../src'))
+sys.path.append(src_path)
+from move_ordering import *
+from chess_ai import ChessAI
+from game import Game
+from pieces import *
+from moves import *
+from search_benchmark import search_benchmark, POSITIONS
+
+# Creating a test case
+class TestMoveOrdering(unittest.TestCase):
+    def initialize(self, pieces):
+        self.game = Game()
+        for rank in range(8):
+            for file in range(8):
+                self.game.board.remove_piece((rank, file))
+        for piece in pieces:
+            self.game.board.place_piece(piece)
+        self.orderer = MoveOrderer(ChessAI(self.game, "white", hash_size_mb = 1).piece_values)
+
+    def test_captures_by_mvv_lva(self):
+        # The white pawn and queen can both take the black queen, the queen can also take a pawn
+        self.initialize([King("white", (0, 0)), King("black", (7, 7)), Queen("white", (1, 0)),
+                         Pawn("white", (3, 4)), Queen("black", (4, 3)), Pawn("black", (4, 0))])
+        moves = self.orderer.order_moves(self.game, self.game.generate_moves())
+        pawn_takes_queen = encode_move(28, 35, CAPTURE)
+        queen_takes_queen = encode_move(8, 35, CAPTURE)
+        queen_takes_pawn = encode_move(8, 32, CAPTURE)
+        self.assertEqual(moves[:3], [pawn_takes_queen, queen_takes_queen, queen_takes_pawn])
+
+    def test_hash_move_killers_and_history(self):
+        self.game = Game()
+        self.orderer = MoveOrderer(ChessAI(self.game, "white", hash_size_mb = 1).piece_values)
+        hash_move = encode_move(12, 28, DOUBLE_PAWN_PUSH) # e2e4
+        killer = encode_move(6, 21) # g1f3
+        history_move = encode_move(1, 18) # b1c3
+        self.orderer.record_cutoff(killer, "white", 3, 2)
+        self.orderer.record_cutoff(history_move, "white", 4, 5) # Killer at another ply, only history counts here
+        moves = self.orderer.order_moves(self.game, self.game.generate_moves(), hash_move, 2)
+        self.assertEqual(moves[:3], [hash_move, killer, history_move])
+        self.assertEqual(len(moves), 20)
+
+    def test_ordering_prunes_more(self):
+        without_ordering = search_benchmark(POSITIONS["italian"], 3, move_ordering = False)
+        with_ordering = search_benchmark(POSITIONS["italian"], 3, move_ordering = True)
+        self.assertLess(with_ordering["nodes"], without_ordering["nodes"])
+        self.assertGreater(with_ordering["first_move_cutoffs"] / with_ordering["cutoffs"], 0.6)
+
+# Running the tests
+if __name__ == '__main__':
+    unittest.main()
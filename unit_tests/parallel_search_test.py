@@ -0,0 +1,67 @@
+import unittest
+import sys
+import os
+
+src_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../src'))
+sys.path.append(src_path)
+from parallel_search import *
+from chess_ai import ChessAI
+from game import Game
+
+ITALIAN = "r1bqkb1r/pppp1ppp/2n2n2/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R w KQkq - 4 4"
+
+# Creating a test case
+class TestParallelSearch(unittest.TestCase):
+    def test_same_result_as_single_process(self):
+        results = []
+        for workers in (1, 2, 3):
+            game = Game.from_fen(ITALIAN)
+            search = ParallelSearch(ChessAI(game, "white", hash_size_mb = 1), workers, hash_size_mb = 1)
+            results.append(search.search_depth(3))
+            search.close()
+            self.assertEqual(game.get_fen(), ITALIAN) # The live game is never touched by the workers
+        self.assertEqual(results[0], results[1])
+        self.assertEqual(results[0], results[2])
+
+        # Same best move and score as the regular single-process search
+        game = Game.from_fen(ITALIAN)
+        self.assertEqual(ChessAI(game, "white", hash_size_mb = 1).search(time_limit = 0, max_depth = 3), results[0][:2])
+
+    def test_repetition_seen_by_workers(self):
+        # Black is a queen down and f6g8 repeats an earlier position: workers must score it as a draw too
+        results = []
+        for workers in (1, 2):
+            game = Game.from_fen("4k1n1/8/8/8/8/8/8/3QK1N1 w - - 0 1").play_uci_moves("g1f3 g8f6 f3g1")
+            search = ParallelSearch(ChessAI(game, "black", hash_size_mb = 1), workers, hash_size_mb = 1)
+            results.append(search.search_depth(3)[:2])
+            search.close()
+        self.assertEqual(results[0], results[1])
+        self.assertEqual(results[0], ChessAI(game, "black", hash_size_mb = 1).search(time_limit = 0, max_depth = 3))
+        self.assertEqual(results[0][1], 0)
+
+    def test_worker_task(self):
+        game = Game.from_fen(ITALIAN)
+        move = game.generate_moves()[0]
+        value, nodes, finished = search_root_move(ITALIAN, move, 2, float("-inf"), hash_size_mb = 1)
+        self.assertTrue(finished)
+        self.assertGreater(nodes, 1)
+
+    def test_ai_parallel_mode(self):
+        game = Game()
+        with ChessAI(game, "white", hash_size_mb = 1, time_limit = 0.5, workers = 2) as ai:
+            ai.make_move()
+            self.assertIsNotNone(ai.parallel_search)
+        self.assertIsNone(ai.parallel_search) # Worker processes shut down on leaving the with block
+        self.assertEqual(game.current_turn, "black")
+        self.assertGreaterEqual(ai.search_info["depth"], 1)
+        self.assertEqual(ai.search_info["workers"], 2)
+
+    def test_ai_parallel_mode_depth_limit(self):
+        game = Game.from_fen(ITALIAN)
+        with ChessAI(game, "white", hash_size_mb = 1, time_limit = 5, max_depth = 2, workers = 2) as ai:
+            ai.make_move()
+        self.assertEqual(ai.search_info["depth"], 2)
+
+# Running the tests
+if __name__ == '__main__':
+    unittest.main()
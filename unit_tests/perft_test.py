@@ -0,0 +1,39 @@
+import unittest
+import sys
+import os
+
+src_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../src'))
+sys.path.append(src_path)
+from move_generation_test import *
+from game import Game
+
+# Creating a test case
+class TestPerft(unittest.TestCase):
+    def test_suite_positions(self):
+        positions = load_epd(PERFT_SUITE)
+        self.assertGreaterEqual(len(positions), 20)
+        self.assertEqual(positions[0][1][3], 8902) # Start position, depth 3
+
+        # Every position at small depths, the full suite runs from the command line
+        results = run_suite(PERFT_SUITE, max_nodes = 3000)
+        self.assertEqual(len(set(result["fen"] for result in results)), len(positions))
+        for result in results:
+            self.assertTrue(result["passed"], result)
+
+    def test_divide(self):
+        game = Game.from_fen("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1")
+        counts = divide(game, 2)
+        self.assertEqual(len(counts), 48)
+        self.assertEqual(sum(counts.values()), 2039)
+        self.assertEqual(counts["e1g1"], 43) # Castling
+
+    def test_baseline_check(self):
+        summary = summarize([{"positions": 1000, "time": 1.0, "passed": True}])
+        self.assertEqual(summary["nps"], 1000)
+        passed, minimum = check_baseline({"nps": 0}, PERFT_BASELINE)
+        self.assertFalse(passed)
+        self.assertGreater(minimum, 0)
+
+# Running the tests
+if __name__ == '__main__':
+    unittest.main()
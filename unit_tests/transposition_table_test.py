@@ -0,0 +1,78 @@
+import unittest
+import sys
+import os
+
+src_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../src'))
+sys.path.append(src_path)
+from transposition_table import *
+from chess_ai import ChessAI
+from game import Game
+
+# Creating a test case
+class TestTranspositionTable(unittest.TestCase):
+    def test_store_and_probe(self):
+        table = TranspositionTable(1)
+        table.store(12345, 4, -250, LOWER_BOUND, 1025)
+        self.assertEqual(table.probe(12345), (4, -250, LOWER_BOUND, 1025))
+        self.assertIsNone(table.probe(54321)) # Position never stored
+
+    def test_torn_entry_is_a_miss(self):
+        table = TranspositionTable(1, bytearray(table_bytes(1)))
+        table.store(12345, 4, 80, EXACT, 1025)
+        self.assertEqual(table.probe(12345), (4, 80, EXACT, 1025))
+        # Another process overwriting only the data word leaves an entry that no longer verifies
+        index = (12345 % table.bucket_count) * 2
+        table.data[index] ^= 1 << 40
+        self.assertIsNone(table.probe(12345))
+
+    def test_memory_cap(self):
+        table = TranspositionTable(1)
+        self.assertLessEqual(len(table.keys) * table.keys.itemsize + len(table.data) * table.data.itemsize, 1024 * 1024)
+
+    def test_replacement_policy(self):
+        table = TranspositionTable(1)
+        count = table.bucket_count
+        # Three keys that share a bucket
+        deep, shallow, newer = 7, 7 + count, 7 + (2 * count)
+        table.store(deep, 6, 10, EXACT, 1)
+        table.store(shallow, 2, 20, EXACT, 2)
+        self.assertIsNotNone(table.probe(deep)) # Deep entry keeps the depth-preferred slot
+        self.assertIsNotNone(table.probe(shallow))
+        table.store(newer, 1, 30, EXACT, 3)
+        self.assertIsNotNone(table.probe(deep))
+        self.assertIsNone(table.probe(shallow)) # Always-replace slot was overwritten
+        # Entries from an earlier search give way to new results
+        table.new_search()
+        table.store(shallow, 1, 40, EXACT, 4)
+        self.assertIsNone(table.probe(deep))
+        self.assertEqual(table.probe(shallow), (1, 40, EXACT, 4))
+
+    def test_table_kept_between_moves(self):
+        game = Game()
+        ai = ChessAI(game, "black", hash_size_mb = 1, time_limit = 0.2)
+        table = ai.transposition_table
+        game.play_move(game.generate_moves()[0])
+        ai.make_move()
+        self.assertGreater(table.probes, 0)
+        probes = table.probes
+        game.play_move(game.generate_moves()[0])
+        ai.make_move()
+        self.assertIs(ai.transposition_table, table)
+        self.assertGreater(table.hits, 0)
+        self.assertGreater(table.probes, probes)
+
+    def test_table_shared_by_both_colors(self):
+        # Entries stored while white searches must give black the same result as an empty table
+        for fen, move in [("r1bqkb1r/pppp1ppp/2n2n2/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R w KQkq - 4 4", "d2d3"),
+                          ("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1", "e2a6")]:
+            game = Game.from_fen(fen)
+            table = TranspositionTable(1)
+            ChessAI(game, "white", transposition_table = table).search(time_limit = 0, max_depth = 3)
+            game.play_uci_moves(move)
+            reused = ChessAI(game, "black", transposition_table = table).search(time_limit = 0, max_depth = 2)
+            fresh = ChessAI(game, "black", hash_size_mb = 1).search(time_limit = 0, max_depth = 2)
+            self.assertEqual(reused, fresh)
+
+# Running the tests
+if __name__ == '__main__':
+    unittest.main()
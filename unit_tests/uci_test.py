@@ -0,0 +1,107 @@
+import unittest
+import sys
+import os
+import io
+import time
+
+src_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../src'))
+sys.path.append(src_path)
+from uci import *
+
+# Creating a test case
+class TestUCI(unittest.TestCase):
+    def initialize(self):
+        self.output = io.StringIO()
+        self.engine = UCIEngine(self.output)
+        self.engine.options["Hash"] = 1
+        self.engine.new_game()
+
+    def lines(self):
+        return self.output.getvalue().splitlines()
+
+    def run_commands(self, *commands):
+        for command in commands:
+            self.engine.handle(command)
+
+    def test_handshake(self):
+        self.initialize()
+        self.run_commands("uci", "isready")
+        lines = self.lines()
+        self.assertEqual(lines[0], f"id name {ENGINE_NAME}")
+        self.assertIn("option name Hash type spin default 16 min 1 max 1024", lines)
+        self.assertEqual(lines[-2:], ["uciok", "readyok"])
+
+    def test_position(self):
+        self.initialize()
+        self.run_commands("position startpos moves e2e4 e7e5 g1f3")
+        self.assertEqual(self.engine.game.get_fen(), "rnbqkbnr/pppp1ppp/8/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R b KQkq - 1 2")
+        self.run_commands("position fen 4k3/8/8/8/8/8/8/4K2R w K - 0 1 moves e1g1")
+        self.assertEqual(self.engine.game.get_fen(), "4k3/8/8/8/8/8/8/5RK1 b - - 1 1")
+        self.run_commands("position startpos moves e2e5")
+        self.assertTrue(self.lines()[-1].startswith("info string"))
+
+    def test_go_depth(self):
+        self.initialize()
+        self.run_commands("position fen 6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1", "go depth 3")
+        self.engine.thread.join()
+        lines = self.lines()
+        self.assertEqual(lines[-1], "bestmove a1a8")
+        self.assertIn("score mate 1", lines[-2])
+        self.assertTrue(lines[-2].endswith("pv a1a8"))
+
+        self.run_commands("position startpos", "go depth 3")
+        self.engine.thread.join()
+        info = self.lines()[-2].split()
+        self.assertEqual(info[:3], ["info", "depth", "3"])
+        self.assertEqual(len(info[info.index("pv") + 1:]), 3)
+        self.assertEqual(self.engine.game.get_fen(), START_FEN) # The search leaves the position as it was
+
+    def test_search_after_side_to_move_changes(self):
+        # The table kept from white's search must not change black's result
+        commands = ["position fen r1bqkb1r/pppp1ppp/2n2n2/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R w KQkq - 4 4", "go depth 3"]
+        reply = ["position fen r1bqkb1r/pppp1ppp/2n2n2/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R w KQkq - 4 4 moves d2d3", "go depth 2"]
+        self.initialize()
+        for command in commands + reply:
+            self.run_commands(command)
+            if command.startswith("go"):
+                self.engine.thread.join()
+        reused = self.lines()[-2:]
+        self.initialize()
+        self.run_commands(*reply)
+        self.engine.thread.join()
+        fresh = self.lines()[-2:]
+        self.assertEqual(reused[1], fresh[1])
+        self.assertEqual(reused[0].split(" nodes")[0], fresh[0].split(" nodes")[0]) # Same depth and score
+        self.assertEqual(reused[0].split(" pv ")[1], fresh[0].split(" pv ")[1])
+
+    def test_stop_infinite(self):
+        self.initialize()
+        self.run_commands("position startpos", "go infinite")
+        time.sleep(0.2)
+        self.run_commands("isready")
+        self.assertIn("readyok", self.lines()) # Answered while searching
+        self.assertFalse(any(line.startswith("bestmove") for line in self.lines()))
+        start_time = time.perf_counter()
+        self.run_commands("stop")
+        self.assertLess(time.perf_counter() - start_time, 1)
+        self.assertTrue(self.lines()[-1].startswith("bestmove"))
+
+    def test_limits(self):
+        self.assertEqual(parse_go("wtime 60000 btime 30000 winc 1000 movestogo 20".split()),
+                         {"wtime": 60000, "btime": 30000, "winc": 1000, "movestogo": 20})
+        self.assertEqual(parse_go(["infinite"]), {"infinite": True})
+        self.assertAlmostEqual(time_budget(60000, 0, 20), 3 - MOVE_OVERHEAD)
+        self.assertLessEqual(time_budget(1000, 5000), 0.5)
+        self.assertEqual(format_score(35), "cp 35")
+        self.assertEqual(format_score(CHECKMATE_SCORE - 3), "mate 2")
+        self.assertEqual(format_score(-(CHECKMATE_SCORE - 2)), "mate -1")
+
+        self.initialize()
+        self.run_commands("position startpos", "go nodes 2000")
+        self.engine.thread.join()
+        self.assertTrue(self.lines()[-1].startswith("bestmove"))
+        self.assertLess(self.engine.ai.nodes, 2000 + 1024)
+
+# Running the tests
+if __name__ == '__main__':
+    unittest.main()